@@ -15,6 +15,8 @@ from pathlib import Path
 from typing import Dict, List
 import re
 
+from components.transcript import Transcript
+
 
 class EvalAgent:
     """面试评估Agent - 基于专业评估标准进行候选人评估"""
@@ -908,19 +910,12 @@ class EvalAgent:
 
         Args:
             dialogue: 对话列表，格式 [{"interviewer": "...", "candidate": "..."}, ...]
+                也接受 {"role", "content"} 或 {"name", "timestamp", "content"} 形式
 
         Returns:
-            str: 格式化的对话内容
+            str: 格式化的对话内容，按条目编号，同一条目的一问一答共用一个编号
         """
-        formatted_lines = []
-
-        for i, turn in enumerate(dialogue, 1):
-            if "interviewer" in turn and turn["interviewer"].strip():
-                formatted_lines.append(f"面试官-{i}: {turn['interviewer']}")
-            if "candidate" in turn and turn["candidate"].strip():
-                formatted_lines.append(f"候选人-{i}: {turn['candidate']}")
-
-        return "\n\n".join(formatted_lines)
+        return Transcript.format_topic_dialogue(dialogue)
 
     def evaluate_topics(
         self,
@@ -12,18 +12,44 @@
 
 from menglong import Model
 from menglong.ml_model.schema.ml_request import UserMessage as user
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import json
+import os
+
+from manager.map_reduce import DEFAULT_CACHE_DIR, SummaryCache, tree_reduce
 
 
 class ExperienceAgent:
     """经验提取Agent - 从面试数据中抽取通用经验"""
 
-    def __init__(self):
-        """初始化经验Agent"""
-        self.model = Model()
+    # 一次整合请求最多放入的经验条数，超出时先分组摘要
+    MAX_CONSOLIDATE_ITEMS = 12
+
+    # 分组摘要提示词版本，修改 _summarize_group 的提示词后递增，使旧缓存失效
+    SUMMARY_PROMPT_VERSION = 1
+
+    def __init__(
+        self,
+        model_id: Optional[str] = None,
+        enable_cache: bool = True,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+    ):
+        """
+        初始化经验Agent
+
+        Args:
+            model_id: 模型 ID，默认使用 Model 的默认模型
+            enable_cache: 是否缓存分组摘要
+            cache_dir: 分组摘要缓存根目录，摘要写在其下的 experience_agent 子目录，
+                与 manager 的经验整合缓存分开（两者提示词不同）
+        """
+        self.model = Model(default_model_id=model_id) if model_id else Model()
+        self.model_id = model_id or getattr(self.model, "default_model_id", None) or "default"
         self.experiences = []  # 存储提取的经验
+        self.summary_cache = (
+            SummaryCache(os.path.join(cache_dir, "experience_agent")) if enable_cache else None
+        )  # 分组摘要缓存
 
     def extract_experience(
         self,
@@ -149,11 +175,22 @@ class ExperienceAgent:
                 "content": "请先提取一些面试经验",
             }
 
+        try:
+            # 经验较多时先分组摘要，逐层合并到一次请求放得下
+            sections = self._reduce_experiences(target_experiences)
+        except Exception as e:
+            return {
+                "id": f"guide_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                "error": str(e),
+                "content": f"整合经验时出错: {str(e)}",
+                "created_at": datetime.now().isoformat(),
+            }
+
         # 准备整合文本
         experiences_text = "\n\n---\n\n".join(
             [
-                f"## 经验 {i + 1} ({exp['position']})\n{exp['content']}"
-                for i, exp in enumerate(target_experiences)
+                f"## 经验 {i + 1} ({position})\n{content}"
+                for i, (position, content) in enumerate(sections)
             ]
         )
 
@@ -236,6 +273,45 @@ class ExperienceAgent:
                 "created_at": datetime.now().isoformat(),
             }
 
+    def _reduce_experiences(self, experiences: List[Dict]) -> List[Tuple[str, str]]:
+        """
+        分层归并经验
+
+        Returns:
+            [(岗位, 内容)]，经验不多时就是原经验，否则是覆盖连续若干条经验的摘要
+        """
+        partials = tree_reduce(
+            [exp["content"] for exp in experiences],
+            self._summarize_group,
+            max_items=self.MAX_CONSOLIDATE_ITEMS,
+            cache=self.summary_cache,
+            namespace=f"{self.model_id}:{self.SUMMARY_PROMPT_VERSION}",
+        )
+        sections = []
+        for partial in partials:
+            covered = experiences[partial.start : partial.end]
+            positions = "、".join(dict.fromkeys(exp["position"] for exp in covered))
+            sections.append((positions, partial.text))
+        return sections
+
+    def _summarize_group(self, contents: List[str]) -> str:
+        """把一组经验合并为一段要点摘要"""
+        experiences_text = "\n\n---\n\n".join(
+            f"## 经验 {i + 1}\n{content}" for i, content in enumerate(contents)
+        )
+        summary_prompt = f"""
+请把以下多个面试案例的经验合并为一份要点摘要，供后续整合为通用面试指南：
+
+{experiences_text}
+
+要求：
+- 保留有效的考察问题、追问技巧和评估标准，合并重复内容
+- 保留不同岗位、不同候选人之间的差异
+- 控制在1500字以内
+"""
+        response = self.model.chat([user(content=summary_prompt)])
+        return str(self._extract_response_text(response))
+
     def save_experience(self, experience: Dict, filepath: str = None):
         """
         保存经验到文件
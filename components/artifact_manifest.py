@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(value: Any) -> str:
+    """Returns a stable sha256 hex digest for bytes, text or JSON-serializable data."""
+    if value is None:
+        data = b""
+    elif isinstance(value, bytes):
+        data = value
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+    else:
+        data = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """Returns the sha256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactManifest:
+    """
+    Records the hashes of the inputs a generated artifact was built from.
+
+    The manifest is stored next to the artifact as `<artifact>.manifest.json`.
+    An artifact is fresh when it exists and its stored inputs equal the current
+    inputs, so reruns only rebuild what actually changed. Dependent artifacts
+    include the hash of their upstream artifact as one of their inputs, which
+    makes staleness propagate like in a build system.
+    """
+
+    def __init__(self, inputs: Dict[str, Any]):
+        self.inputs = {name: content_hash(value) for name, value in inputs.items()}
+
+    @staticmethod
+    def path_for(artifact_path: str) -> str:
+        return f"{artifact_path}.manifest.json"
+
+    @staticmethod
+    def load(artifact_path: str) -> Optional[Dict[str, Any]]:
+        """Loads the stored manifest of an artifact, or None if there is none."""
+        manifest_path = ArtifactManifest.path_for(artifact_path)
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def changed_inputs(self, artifact_path: str) -> List[str]:
+        """
+        Lists the inputs that differ from the stored manifest.
+
+        Returns an empty list when the artifact is fresh. A missing artifact
+        reports ["artifact"], a missing or unreadable manifest ["manifest"].
+        """
+        if not os.path.exists(artifact_path):
+            return ["artifact"]
+
+        stored = self.load(artifact_path)
+        if stored is None or stored.get("version") != MANIFEST_VERSION:
+            return ["manifest"]
+
+        stored_inputs = stored.get("inputs", {})
+        names = sorted(set(stored_inputs) | set(self.inputs))
+        return [name for name in names if stored_inputs.get(name) != self.inputs.get(name)]
+
+    def is_fresh(self, artifact_path: str) -> bool:
+        return not self.changed_inputs(artifact_path)
+
+    def save(self, artifact_path: str, artifact: Any = None):
+        """Writes the manifest next to the artifact, optionally hashing the artifact itself."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "inputs": self.inputs,
+        }
+        if artifact is not None:
+            data["output"] = content_hash(artifact)
+
+        manifest_path = self.path_for(artifact_path)
+        os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,152 @@
+import math
+import re
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Price per 1K tokens in USD
+PRICING = {
+    "default": {"input": 0.003, "output": 0.015},
+    "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
+    "us.anthropic.claude-sonnet-4-20250514-v1:0": {"input": 0.003, "output": 0.015},
+    "anthropic/global.anthropic.claude-sonnet-4-5-20250929-v1:0": {"input": 0.003, "output": 0.015},
+}
+
+# Rough latency model for one streamed call: fixed overhead plus output generation.
+BASE_LATENCY_SECONDS = 2.0
+OUTPUT_TOKENS_PER_SECOND = 60.0
+
+# A page sent as a PDF document part costs roughly this many input tokens.
+PDF_TOKENS_PER_PAGE = 1600
+
+_CJK_PATTERN = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Approximates the token count of a prompt without calling the model.
+
+    CJK characters are counted as one token each, everything else as one token
+    per four characters. This tracks the Claude tokenizer closely enough for
+    capacity planning on mixed Chinese/English interview data.
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    other = len(text) - cjk
+    return cjk + math.ceil(other / 4)
+
+
+class CostEstimator:
+    """
+    Accumulates the requests a run would send and reports the expected
+    request count, tokens, cost and wall time at a given concurrency.
+    """
+
+    def __init__(self, model_id: str = "default", concurrency: int = 1):
+        self.model_id = model_id
+        self.concurrency = max(1, concurrency)
+        self.stages: Dict[str, Dict[str, float]] = OrderedDict()
+
+    def _stage(self, stage: str) -> Dict[str, float]:
+        if stage not in self.stages:
+            self.stages[stage] = {
+                "requests": 0,
+                "skipped": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "latency": 0.0,
+            }
+        return self.stages[stage]
+
+    def add_request(
+        self, stage: str, input_tokens: int, output_tokens: int, count: int = 1
+    ):
+        """Records `count` requests of the given size for a stage."""
+        entry = self._stage(stage)
+        entry["requests"] += count
+        entry["input_tokens"] += input_tokens * count
+        entry["output_tokens"] += output_tokens * count
+        entry["latency"] += count * (
+            BASE_LATENCY_SECONDS + output_tokens / OUTPUT_TOKENS_PER_SECOND
+        )
+
+    def add_prompt(self, stage: str, prompt: str, output_tokens: int, count: int = 1):
+        """Records requests whose prompt text is known."""
+        self.add_request(stage, estimate_tokens(prompt), output_tokens, count)
+
+    def add_skipped(self, stage: str, count: int = 1):
+        """Records work that would be served from a cache or an existing artifact."""
+        self._stage(stage)["skipped"] += count
+
+    def _price(self) -> Dict[str, float]:
+        return PRICING.get(self.model_id, PRICING["default"])
+
+    def summary(self) -> Dict:
+        price = self._price()
+        stages = {}
+        totals = {"requests": 0, "skipped": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+        total_latency = 0.0
+
+        for stage, entry in self.stages.items():
+            cost = (
+                entry["input_tokens"] / 1000 * price["input"]
+                + entry["output_tokens"] / 1000 * price["output"]
+            )
+            stages[stage] = {
+                "requests": int(entry["requests"]),
+                "skipped": int(entry["skipped"]),
+                "input_tokens": int(entry["input_tokens"]),
+                "output_tokens": int(entry["output_tokens"]),
+                "cost": round(cost, 4),
+            }
+            for key in ("requests", "skipped", "input_tokens", "output_tokens"):
+                totals[key] += int(entry[key])
+            totals["cost"] += cost
+            total_latency += entry["latency"]
+
+        totals["cost"] = round(totals["cost"], 4)
+        return {
+            "model": self.model_id,
+            "concurrency": self.concurrency,
+            "stages": stages,
+            "totals": totals,
+            "serial_seconds": round(total_latency, 1),
+            "wall_seconds": round(total_latency / self.concurrency, 1),
+        }
+
+    def format_report(self) -> str:
+        data = self.summary()
+        lines = [
+            f"Dry run estimate (model: {data['model']}, concurrency: {data['concurrency']})",
+            f"{'Stage':<20} {'Requests':>9} {'Skipped':>8} {'In tokens':>11} {'Out tokens':>11} {'Cost $':>9}",
+            "-" * 72,
+        ]
+        for stage, entry in data["stages"].items():
+            lines.append(
+                f"{stage:<20} {entry['requests']:>9} {entry['skipped']:>8} "
+                f"{entry['input_tokens']:>11,} {entry['output_tokens']:>11,} {entry['cost']:>9.4f}"
+            )
+        totals = data["totals"]
+        lines.append("-" * 72)
+        lines.append(
+            f"{'Total':<20} {totals['requests']:>9} {totals['skipped']:>8} "
+            f"{totals['input_tokens']:>11,} {totals['output_tokens']:>11,} {totals['cost']:>9.4f}"
+        )
+        lines.append(
+            f"Expected wall time: {_format_duration(data['wall_seconds'])} "
+            f"(serial: {_format_duration(data['serial_seconds'])})"
+        )
+        return "\n".join(lines)
+
+    def print_report(self):
+        print(self.format_report())
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{secs:02d}s"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from components.artifact_manifest import file_hash
+
+DEFAULT_CACHE_DIR = "data/cache/documents"
+
+
+class DocumentCache:
+    """
+    Cache of extracted document text keyed by file content.
+
+    An entry is identified by the sha256 of the source file's bytes, the kind
+    of document (transcript, resume, jd) and the version of the parser that
+    produced it. Renaming or moving a file still hits the cache. Editing it, or
+    bumping the parser version, misses. Entries are written atomically, so
+    several workers can share the cache directory.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (path, size, mtime) -> sha256, so unchanged files are hashed once per process
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def content_key(self, path: str) -> str:
+        stat = os.stat(path)
+        fingerprint = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._hashes.get(fingerprint)
+        if digest is None:
+            digest = file_hash(path)
+            with self._lock:
+                self._hashes[fingerprint] = digest
+        return digest
+
+    def _entry_path(self, digest: str, kind: str, version: str) -> str:
+        return os.path.join(self.cache_dir, kind, f"{digest}.v{version}.json")
+
+    def get(self, path: str, kind: str, version: str) -> Optional[str]:
+        entry_path = self._entry_path(self.content_key(path), kind, version)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                text = json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, path: str, kind: str, version: str, text: str):
+        digest = self.content_key(path)
+        entry_path = self._entry_path(digest, kind, version)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"sha256": digest, "kind": kind, "version": version, "source": path, "text": text},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, entry_path)
+
+    def get_or_parse(self, path: str, kind: str, version: str, parse: Callable[[str], Optional[str]]) -> Optional[str]:
+        """Returns the cached text for a file, parsing and storing it on a miss."""
+        text = self.get(path, kind, version)
+        if text is not None:
+            return text
+        text = parse(path)
+        if text is not None:
+            self.put(path, kind, version, text)
+        return text
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -1,9 +1,13 @@
 import traceback
+import io
 import os
 import json
 import pdfplumber
 import re
-from typing import Optional, Dict, Any, Union
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Union
 
 from menglong.models import Model
 from menglong.schemas.chat import User, DocumentPart, TextPart
@@ -11,11 +15,51 @@ from menglong.schemas.chat import User, DocumentPart, TextPart
 import base64
 import httpx
 
+from components.document_cache import DocumentCache
+from components.transcript import iter_clean_transcript
+
+# Bump a version when that parser's output changes, so cached documents are re-extracted
+PARSER_VERSIONS = {"transcript": "1", "jd": "1", "resume": "1"}
+
+# Below this many pages in total, a process pool costs more than it saves
+PDF_PARALLEL_MIN_PAGES = 16
+# Pages handed to one worker task; small enough to balance pages across a batch
+PDF_PAGES_PER_TASK = 8
+
+# A resume text layer below this density is treated as scanned
+RESUME_MIN_CHARS_PER_PAGE = 200
+# Share of undecodable glyphs ((cid:N), U+FFFD, private use) above which text is garbled
+RESUME_MAX_GARBLED_RATIO = 0.02
+
+_CID_PATTERN = re.compile(r'\(cid:\d+\)')
+
+def _iter_page_lines(pages: Iterable[str]) -> Iterator[str]:
+    for page in pages:
+        if page:
+            yield from io.StringIO(page)
+
+
+def _extract_page_texts(file_path: str, start: int, end: int) -> List[str]:
+    """Extracts the text of pages [start, end) of a PDF. Runs in pool workers."""
+    with pdfplumber.open(file_path) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, end)]
+
+
 class FileParser:
     """
     Component for parsing various file formats (txt, json, pdf).
+
+    Extracted PDF text is stored in a DocumentCache keyed by file content and
+    parser version, so a PDF is only extracted (or sent to the model) once.
+    Text formats are read directly; hashing them would cost as much as reading.
     """
 
+    # Set to None to always re-parse
+    document_cache: Optional[DocumentCache] = DocumentCache()
+
+    # Resumes parsed per tier in this process: "text_layer" or "llm"
+    resume_tiers: Counter = Counter()
+
     @staticmethod
     def read_file(file_path: str) -> Union[str, Dict[str, Any], None]:
         """
@@ -68,26 +112,134 @@ class FileParser:
             return json.load(f)
 
     @staticmethod
-    def _read_pdf(file_path: str) -> str:
+    def _pdf_kind(file_path: str) -> str:
         if "transcript" in file_path:
-            return FileParser._read_pdf_transcript(file_path)
+            return "transcript"
         elif "jd" in file_path:
-            return FileParser._read_pdf_jd(file_path)
+            return "jd"
         elif "resume" in file_path:
-            return FileParser._read_pdf_resume(file_path)
+            return "resume"
         else:
             raise ValueError("未预期的PDF,请遵循命名规范,文件名携带 transcript, jd or resume")
+
+    @staticmethod
+    def _read_pdf(file_path: str) -> str:
+        kind = FileParser._pdf_kind(file_path)
+        reader = {
+            "transcript": FileParser._read_pdf_transcript,
+            "jd": FileParser._read_pdf_jd,
+            "resume": FileParser._read_pdf_resume,
+        }[kind]
+
+        cache = FileParser.document_cache
+        if cache is None:
+            return reader(file_path)
+        return cache.get_or_parse(file_path, kind, PARSER_VERSIONS[kind], reader)
+
+    @staticmethod
+    def cached_text(file_path: str) -> Optional[str]:
+        """Returns the cached extraction of a PDF without parsing it, or None."""
+        cache = FileParser.document_cache
+        if cache is None or not os.path.exists(file_path):
+            return None
+        kind = FileParser._pdf_kind(file_path)
+        return cache.get(file_path, kind, PARSER_VERSIONS[kind])
         
     @staticmethod
     def _read_pdf_transcript(file_path):
-        text_content = []
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    text_content.append(text)
-        raw_text = "\n".join(text_content)
-        return FileParser._clean_transcript(raw_text)
+        pages = FileParser._extract_pdf_pages([file_path])[file_path]
+        return FileParser._transcript_from_pages(pages)
+
+    @staticmethod
+    def _transcript_from_pages(pages: Iterable[str]) -> str:
+        return "\n".join(iter_clean_transcript(_iter_page_lines(pages)))
+
+    @staticmethod
+    def clean_transcript_file(source_path: str, output_path: str) -> int:
+        """Cleans a raw transcript text file into another file line by line; returns the turn count."""
+        turns = 0
+        with open(source_path, 'r', encoding='utf-8') as src, open(output_path, 'w', encoding='utf-8') as dst:
+            for turn in iter_clean_transcript(src):
+                if turns:
+                    dst.write("\n")
+                dst.write(turn)
+                turns += 1
+        return turns
+
+    @staticmethod
+    def read_transcripts_parallel(file_paths: List[str], max_workers: Optional[int] = None) -> Dict[str, str]:
+        """
+        Reads several transcript PDFs at once, spreading their pages over one process pool.
+
+        Returns a dict of file path -> cleaned transcript. Cached transcripts are
+        not extracted again. Files that cannot be opened are reported and left out.
+        """
+        cache = FileParser.document_cache
+        version = PARSER_VERSIONS["transcript"]
+        contents = {}
+        if cache is not None:
+            for path in file_paths:
+                text = cache.get(path, "transcript", version) if os.path.exists(path) else None
+                if text is not None:
+                    contents[path] = text
+
+        missing = [path for path in file_paths if path not in contents]
+        if missing:
+            pages = FileParser._extract_pdf_pages(missing, max_workers, skip_unreadable=True)
+            for path, texts in pages.items():
+                contents[path] = FileParser._transcript_from_pages(texts)
+                if cache is not None:
+                    cache.put(path, "transcript", version, contents[path])
+        return contents
+
+    @staticmethod
+    def _extract_pdf_pages(
+        file_paths: List[str], max_workers: Optional[int] = None, skip_unreadable: bool = False
+    ) -> Dict[str, List[str]]:
+        """
+        Extracts the page texts of PDFs in page order.
+
+        Large jobs are split into page ranges that run on a process pool, both
+        within one PDF and across PDFs. Throughput is reported in pages/s.
+        """
+        started = time.time()
+        page_counts = {}
+        for path in dict.fromkeys(file_paths):
+            try:
+                with pdfplumber.open(path) as pdf:
+                    page_counts[path] = len(pdf.pages)
+            except Exception as e:
+                if not skip_unreadable:
+                    raise
+                print(f"Error reading file {path}: {e}")
+        total_pages = sum(page_counts.values())
+
+        workers = max_workers or os.cpu_count() or 1
+        if total_pages < PDF_PARALLEL_MIN_PAGES or workers <= 1:
+            workers = 1
+            tasks = [(path, 0, count) for path, count in page_counts.items()]
+            results = [_extract_page_texts(*task) for task in tasks]
+        else:
+            tasks = [
+                (path, start, min(start + PDF_PAGES_PER_TASK, count))
+                for path, count in page_counts.items()
+                for start in range(0, count, PDF_PAGES_PER_TASK)
+            ]
+            workers = min(workers, len(tasks))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map keeps task order, so pages are reassembled in order
+                results = list(pool.map(_extract_page_texts, *zip(*tasks)))
+
+        pages = {path: [] for path in page_counts}
+        for (path, _, _), texts in zip(tasks, results):
+            pages[path].extend(texts)
+
+        elapsed = max(time.time() - started, 1e-6)
+        print(
+            f"Extracted {total_pages} PDF pages from {len(page_counts)} file(s) in {elapsed:.1f}s "
+            f"({total_pages / elapsed:.1f} pages/s, {workers} worker(s))"
+        )
+        return pages
     
     @staticmethod
     def _read_pdf_jd(file_path):
@@ -95,7 +247,98 @@ class FileParser:
 
     @staticmethod
     def _read_pdf_resume(file_path):
+        """
+        Tiered resume parsing.
+
+        The local text layer (text plus tables) is used when it scores well.
+        Scanned or garbled PDFs fall back to sending the document to the model.
+        """
+        text, quality = FileParser.resume_text_layer(file_path)
+        if quality["usable"]:
+            FileParser.resume_tiers["text_layer"] += 1
+            print(
+                f"Resume parsed from text layer: {file_path} "
+                f"({quality['chars_per_page']:.0f} chars/page, garbled {quality['garbled_ratio']:.1%})"
+            )
+            return text
+
+        FileParser.resume_tiers["llm"] += 1
+        print(
+            f"Resume text layer unusable, parsing with model: {file_path} "
+            f"({quality['chars_per_page']:.0f} chars/page, garbled {quality['garbled_ratio']:.1%})"
+        )
+        return FileParser._read_pdf_resume_llm(file_path)
+
+    @staticmethod
+    def resume_text_layer(file_path) -> tuple:
+        """Extracts a resume's text layer locally; returns (text, quality)."""
+        text, page_count = FileParser._extract_resume_text_layer(file_path)
+        return text, FileParser._text_layer_quality(text, page_count)
+
+    @staticmethod
+    def _extract_resume_text_layer(file_path) -> tuple:
+        """Returns (text, page_count); tables are rendered as markdown after the page text."""
+        parts = []
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+            for page in pdf.pages:
+                tables = page.find_tables()
+                text_page = page
+                for table in tables:
+                    try:
+                        text_page = text_page.outside_bbox(table.bbox)
+                    except ValueError:
+                        # Table box reaches past the page; keep its text inline
+                        pass
+                text = text_page.extract_text()
+                if text:
+                    parts.append(text)
+                for table in tables:
+                    rendered = FileParser._markdown_table(table.extract())
+                    if rendered:
+                        parts.append(rendered)
+        return "\n\n".join(parts), page_count
 
+    @staticmethod
+    def _markdown_table(rows) -> str:
+        rows = [
+            [(cell or "").replace("\n", " ").strip() for cell in row]
+            for row in rows
+            if row and any(cell for cell in row)
+        ]
+        if not rows:
+            return ""
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + " --- |" * width]
+        lines.extend("| " + " | ".join(row) + " |" for row in rows[1:])
+        return "\n".join(lines)
+
+    @staticmethod
+    def _text_layer_quality(text: str, page_count: int) -> Dict[str, Any]:
+        """Scores an extracted text layer by density and share of undecodable glyphs."""
+        visible = len(re.sub(r'\s', '', text))
+        garbled = (
+            len(_CID_PATTERN.findall(text))
+            + text.count('\ufffd')
+            + sum(1 for ch in text if '\ue000' <= ch <= '\uf8ff')
+        )
+        chars_per_page = visible / max(page_count, 1)
+        garbled_ratio = garbled / max(visible, 1)
+        return {
+            "pages": page_count,
+            "chars_per_page": chars_per_page,
+            "garbled_ratio": garbled_ratio,
+            "usable": chars_per_page >= RESUME_MIN_CHARS_PER_PAGE and garbled_ratio <= RESUME_MAX_GARBLED_RATIO,
+        }
+
+    @staticmethod
+    def resume_tier_report() -> str:
+        tiers = FileParser.resume_tiers
+        return f"Resumes parsed: {tiers['text_layer']} from text layer, {tiers['llm']} by model"
+
+    @staticmethod
+    def _read_pdf_resume_llm(file_path):
 
         pdf_data = None
         # First, load and encode the PDF 
@@ -119,13 +362,7 @@ class FileParser:
         ]
         
         response = client.chat(messages=messages)
-        content = response.text
-
-        # save
-        with open(f"{file_path[:-4]}.md", "w") as f:
-            f.write(content)
-
-        return content
+        return response.text
         
 
 
@@ -136,38 +373,4 @@ class FileParser:
         Merges lines that do not start with a speaker timestamp pattern into the previous line.
         Ensures strict "Name (Time): Content" format per line.
         """
-        import re
-        
-        # Pattern to match the start of a speaker line: "Name (Time):"
-        # Supports:
-        # - Brackets: (), （）, [], 【】
-        # - Time: MM:SS, HH:MM:SS, H:MM:SS
-        # - Separators: :, ：
-        # regex: Start -> non-greedy text -> open bracket -> time -> close bracket -> colon
-        header_pattern = re.compile(r'^.*?[\(\[\（【]\s*\d{1,2}:\d{2}(?::\d{2})?\s*[\)\]\）】][:：]')
-        
-        lines = text.split('\n')
-        merged_lines = []
-        current_line = ""
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if header_pattern.match(line):
-                if current_line:
-                    merged_lines.append(current_line)
-                current_line = line
-            else:
-                # This is a continuation of the previous line
-                if current_line:
-                    current_line += " " + line
-                else:
-                    # Case where text starts without a header, treat as new line
-                    current_line = line
-                    
-        if current_line:
-            merged_lines.append(current_line)
-            
-        return "\n".join(merged_lines)
+        return "\n".join(iter_clean_transcript(io.StringIO(text)))
@@ -0,0 +1,73 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional
+
+DEFAULT_SERVICE_URL = "http://127.0.0.1:8765"
+
+# Lower runs first; interactive jobs overtake queued batch work
+PRIORITIES = {"interactive": 0, "normal": 5, "batch": 10}
+
+
+class JobClient:
+    """
+    Thin client for the local evaluation service (service.py).
+
+    Only uses the standard library, so CLIs that forward work to the warm
+    service start without importing pandas, pdfplumber or menglong.
+    """
+
+    def __init__(self, url: str = DEFAULT_SERVICE_URL, timeout: float = 30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, body: Optional[Dict] = None) -> Dict[str, Any]:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"Service error {e.code}: {detail}") from e
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("GET", "/health")
+
+    def is_available(self) -> bool:
+        try:
+            self.health()
+            return True
+        except (OSError, RuntimeError):
+            return False
+
+    def submit(self, job_type: str, params: Dict[str, Any], priority: str = "interactive") -> str:
+        """Submits a job and returns its id."""
+        response = self._request(
+            "POST", "/jobs", {"type": job_type, "params": params, "priority": priority}
+        )
+        return response["id"]
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def wait(self, job_id: str, poll_interval: float = 1.0, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Polls a job until it finishes and returns its final state."""
+        started = time.time()
+        while True:
+            job = self.get(job_id)
+            if job["status"] in ("done", "failed"):
+                return job
+            if timeout is not None and time.time() - started > timeout:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+            time.sleep(poll_interval)
+
+    def run(self, job_type: str, params: Dict[str, Any], priority: str = "interactive") -> Dict[str, Any]:
+        """Submits a job and waits for it."""
+        return self.wait(self.submit(job_type, params, priority))
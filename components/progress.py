@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _usage_tokens(response) -> tuple:
+    """Pulls (input_tokens, output_tokens) from a chat response if it reports usage."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    input_tokens = getattr(usage, "input_tokens", 0) or getattr(usage, "prompt_tokens", 0) or 0
+    output_tokens = getattr(usage, "output_tokens", 0) or getattr(usage, "completion_tokens", 0) or 0
+    return int(input_tokens), int(output_tokens)
+
+
+class InstrumentedModel:
+    """Wraps a model client so every chat call is timed and counted by a tracker."""
+
+    def __init__(self, model, tracker: "ProgressTracker"):
+        self._model = model
+        self._tracker = tracker
+
+    def chat(self, *args, **kwargs):
+        with self._tracker.call() as call:
+            response = self._model.chat(*args, **kwargs)
+            call["input_tokens"], call["output_tokens"] = _usage_tokens(response)
+            return response
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+class ProgressTracker:
+    """
+    Live progress for long batch runs.
+
+    Tracks in-flight units per stage, completed units per second, token
+    throughput, p50/p95 model call latency, error rate and ETA. Every update
+    can be printed as one status line and written to a JSON status file that a
+    supervising process can poll. All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        label: str = "batch",
+        status_path: Optional[str] = None,
+        printer: Callable[[str], Any] = print,
+        min_interval: float = 1.0,
+        latency_window: int = 2000,
+    ):
+        self.total = total
+        self.label = label
+        self.status_path = status_path
+        self.printer = printer
+        self.min_interval = min_interval
+
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._last_report = 0.0
+        self._in_flight: Dict[str, str] = {}
+        self._completed = 0
+        self._failed = 0
+        self._calls = 0
+        self._call_errors = 0
+        self._input_tokens = 0
+        self._output_tokens = 0
+        self._latencies = deque(maxlen=latency_window)
+
+    # ==================== Units ====================
+
+    def start(self, unit: str, stage: str = "running"):
+        with self._lock:
+            self._in_flight[unit] = stage
+        self.report()
+
+    def set_stage(self, unit: str, stage: str):
+        with self._lock:
+            self._in_flight[unit] = stage
+        self.report()
+
+    def finish(self, unit: str, error: Optional[str] = None):
+        with self._lock:
+            self._in_flight.pop(unit, None)
+            if error:
+                self._failed += 1
+            else:
+                self._completed += 1
+        self.report(force=True)
+
+    @contextmanager
+    def step(self, unit: str, stage: str):
+        """Shows work as in flight without counting it towards the unit total."""
+        self.start(unit, stage)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight.pop(unit, None)
+
+    # ==================== Model calls ====================
+
+    @contextmanager
+    def call(self):
+        """Times one model call; the block may fill in input/output token counts."""
+        call = {"input_tokens": 0, "output_tokens": 0}
+        started = time.time()
+        try:
+            yield call
+        except Exception:
+            self._record_call(time.time() - started, call, error=True)
+            raise
+        else:
+            self._record_call(time.time() - started, call, error=False)
+
+    def _record_call(self, latency: float, call: Dict[str, int], error: bool):
+        with self._lock:
+            self._calls += 1
+            self._latencies.append(latency)
+            self._input_tokens += call.get("input_tokens", 0)
+            self._output_tokens += call.get("output_tokens", 0)
+            if error:
+                self._call_errors += 1
+        self.report()
+
+    def instrument(self, model):
+        """Returns a proxy of a model client whose chat calls feed this tracker."""
+        if isinstance(model, InstrumentedModel):
+            return model
+        return InstrumentedModel(model, self)
+
+    # ==================== Reporting ====================
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.time() - self._started_at, 1e-6)
+            done = self._completed + self._failed
+            rate = done / elapsed
+            remaining = max(self.total - done, 0)
+            latencies = list(self._latencies)
+            stages = Counter(self._in_flight.values())
+            return {
+                "label": self.label,
+                "total": self.total,
+                "completed": self._completed,
+                "failed": self._failed,
+                "in_flight": dict(stages),
+                "elapsed_seconds": round(elapsed, 1),
+                "units_per_second": round(rate, 4),
+                "eta_seconds": round(remaining / rate, 1) if rate > 0 else None,
+                "calls": self._calls,
+                "call_error_rate": round(self._call_errors / self._calls, 4) if self._calls else 0.0,
+                "error_rate": round(self._failed / done, 4) if done else 0.0,
+                "input_tokens": self._input_tokens,
+                "output_tokens": self._output_tokens,
+                "tokens_per_second": round((self._input_tokens + self._output_tokens) / elapsed, 1),
+                "latency_p50": round(_percentile(latencies, 50), 2),
+                "latency_p95": round(_percentile(latencies, 95), 2),
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+
+    def format_line(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
+        s = snapshot or self.snapshot()
+        stages = ", ".join(f"{k}:{v}" for k, v in s["in_flight"].items()) or "-"
+        eta = f"{s['eta_seconds']:.0f}s" if s["eta_seconds"] is not None else "?"
+        return (
+            f"[{s['label']}] 进度: {s['completed'] + s['failed']}/{s['total']} "
+            f"(失败 {s['failed']}) | 进行中 {stages} | {s['units_per_second']:.3f}/s | "
+            f"{s['tokens_per_second']:.0f} tok/s | p50 {s['latency_p50']:.1f}s p95 {s['latency_p95']:.1f}s | "
+            f"错误率 {s['error_rate']:.0%} | ETA {eta}"
+        )
+
+    def report(self, force: bool = False):
+        """Prints a status line and refreshes the status file, at most every min_interval seconds."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_report < self.min_interval:
+                return
+            self._last_report = now
+
+        snapshot = self.snapshot()
+        if self.printer:
+            self.printer(self.format_line(snapshot))
+        if self.status_path:
+            self.write_status(snapshot)
+
+    def write_status(self, snapshot: Optional[Dict[str, Any]] = None):
+        """Atomically writes the JSON status file."""
+        snapshot = snapshot or self.snapshot()
+        directory = os.path.dirname(self.status_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.status_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.status_path)
@@ -0,0 +1,392 @@
+import json
+import os
+import re
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from components.artifact_manifest import content_hash
+
+INTERVIEWER = "interviewer"
+CANDIDATE = "candidate"
+UNKNOWN = "unknown"
+
+DEFAULT_CACHE_DIR = "data/cache/transcripts"
+CACHE_VERSION = 2
+
+# Start of a speaker line: "Name (Time):"
+# Supports:
+# - Brackets: (), （）, [], 【】
+# - Time: MM:SS, HH:MM:SS, H:MM:SS
+# - Separators: :, ：
+# regex: Start -> non-greedy text -> open bracket -> time -> close bracket -> colon
+TRANSCRIPT_HEADER_PATTERN = re.compile(r'^.*?[\(\[\（【]\s*\d{1,2}:\d{2}(?::\d{2})?\s*[\)\]\）】][:：]')
+
+# Same header, split into speaker / time / content
+_TURN_PATTERN = re.compile(
+    r'^(?P<speaker>.*?)\s*[\(\[\（【]\s*(?P<time>\d{1,2}:\d{2}(?::\d{2})?)\s*[\)\]\）】][:：]\s*(?P<content>.*)$',
+    re.DOTALL,
+)
+
+_ROLE_NAMES = {
+    "面试官": INTERVIEWER,
+    "interviewer": INTERVIEWER,
+    "候选人": CANDIDATE,
+    "candidate": CANDIDATE,
+}
+_ASCII_NAME = re.compile(r'^[A-Za-z\s]+$')
+
+_ROLE_CODES = {INTERVIEWER: "i", CANDIDATE: "c", UNKNOWN: "u"}
+_CODE_ROLES = {code: role for role, code in _ROLE_CODES.items()}
+
+
+def iter_clean_transcript(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Streams "Name (Time): Content" turns out of transcript lines.
+
+    Lines that do not start with a speaker header are merged into the previous
+    turn. Any line iterator works (a file object, page texts split lazily), and
+    only the current turn is held in memory.
+    """
+    is_header = TRANSCRIPT_HEADER_PATTERN.match
+    turn: List[str] = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if is_header(line):
+            if turn:
+                yield " ".join(turn)
+            turn = [line]
+        else:
+            # Continuation of the previous turn, or text before the first header
+            turn.append(line)
+
+    if turn:
+        yield " ".join(turn)
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[int]:
+    """Converts "MM:SS" / "H:MM:SS" to seconds; returns None for anything else."""
+    if not value:
+        return None
+    parts = str(value).strip().split(":")
+    if not 2 <= len(parts) <= 3 or not all(p.isdigit() for p in parts):
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def format_timestamp(seconds: Optional[int], always_hours: bool = False) -> str:
+    if seconds is None:
+        return ""
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours or always_hours:
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def guess_role(speaker: str) -> str:
+    """
+    Maps a speaker name to a role.
+
+    Explicit role names win. Otherwise the recording convention applies:
+    interviewers appear under English names, candidates under Chinese ones.
+    """
+    if not speaker:
+        return UNKNOWN
+    role = _ROLE_NAMES.get(speaker.strip().lower())
+    if role:
+        return role
+    return INTERVIEWER if _ASCII_NAME.match(speaker) else CANDIDATE
+
+
+def estimated_duration(content: str) -> int:
+    """Simulated speaking time of a message: 30s plus 30s per 100 characters."""
+    return max(30, len(content) // 100 * 30 + 30)
+
+
+class Turn:
+    """
+    One utterance of a transcript.
+
+    Speaker and role strings are interned, so a corpus of transcripts shares
+    one copy of each name. Turns can be read like the {"role", "content"}
+    message dicts the agents consume. The timestamp is kept as written in the
+    source (time_text) next to its value in seconds, so rendering does not
+    rewrite "00:01:05" or drop times that do not parse.
+    """
+
+    __slots__ = ("speaker", "role", "seconds", "content", "time_text")
+
+    def __init__(
+        self,
+        speaker: str,
+        role: str,
+        content: str,
+        seconds: Optional[int] = None,
+        time_text: Optional[str] = None,
+    ):
+        self.speaker = sys.intern(speaker or "")
+        self.role = sys.intern(role or UNKNOWN)
+        self.seconds = seconds
+        self.content = content
+        self.time_text = time_text or None
+
+    @property
+    def timestamp(self) -> str:
+        """The source timestamp if there was one, otherwise the formatted seconds."""
+        return self.time_text or format_timestamp(self.seconds)
+
+    def __getitem__(self, key: str):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def to_message(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Turn):
+            return NotImplemented
+        return (self.speaker, self.role, self.seconds, self.content, self.time_text) == (
+            other.speaker, other.role, other.seconds, other.content, other.time_text
+        )
+
+    def __repr__(self) -> str:
+        preview = self.content if len(self.content) <= 30 else self.content[:30] + "..."
+        return f"Turn({self.speaker!r}, {self.role!r}, {self.timestamp!r}, {preview!r})"
+
+
+class Transcript:
+    """
+    Ordered list of turns shared by every stage that handles dialogue.
+
+    Builds from raw transcript text, simulator/agent messages or topic
+    dialogue, and renders back to the text formats each stage expects. Parsed
+    transcripts can be cached as compact JSONL keyed by the source text hash.
+    """
+
+    __slots__ = ("turns",)
+
+    def __init__(self, turns: Optional[Iterable[Turn]] = None):
+        self.turns: List[Turn] = list(turns or [])
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def __iter__(self) -> Iterator[Turn]:
+        return iter(self.turns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Transcript(self.turns[index])
+        return self.turns[index]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Transcript):
+            return NotImplemented
+        return self.turns == other.turns
+
+    def append(self, role: str, content: str, speaker: Optional[str] = None, seconds: Optional[int] = None) -> Turn:
+        turn = Turn(speaker if speaker is not None else role, role, content, seconds)
+        self.turns.append(turn)
+        return turn
+
+    # ==================== Builders ====================
+
+    @classmethod
+    def parse(cls, text_or_lines, role_of: Callable[[str], str] = guess_role) -> "Transcript":
+        """
+        Parses raw "Name (Time): Content" transcript text or lines.
+
+        Continuation lines are merged into their turn. Text before the first
+        speaker header becomes a turn with an unknown role.
+        """
+        lines = text_or_lines.split("\n") if isinstance(text_or_lines, str) else text_or_lines
+        turns = []
+        for line in iter_clean_transcript(lines):
+            match = _TURN_PATTERN.match(line)
+            if match:
+                speaker = match.group("speaker").strip()
+                time_text = match.group("time")
+                turns.append(Turn(speaker, role_of(speaker), match.group("content").strip(),
+                                  parse_timestamp(time_text), time_text))
+            else:
+                turns.append(Turn("", UNKNOWN, line))
+        return cls(turns)
+
+    @classmethod
+    def from_messages(
+        cls,
+        messages: Iterable[Dict[str, Any]],
+        names: Optional[Dict[str, str]] = None,
+        estimate_times: bool = False,
+    ) -> "Transcript":
+        """
+        Builds a transcript from {"role", "content"} messages.
+
+        names maps roles to display names. With estimate_times, turns get
+        simulated timestamps derived from the length of what was said.
+        """
+        names = names or {}
+        transcript = cls()
+        offset = 0
+        for msg in messages:
+            role = msg.get("role", UNKNOWN)
+            content = msg.get("content", "")
+            transcript.append(role, content, speaker=names.get(role, role),
+                              seconds=offset if estimate_times else None)
+            offset += estimated_duration(content)
+        return transcript
+
+    @classmethod
+    def from_topic_dialogue(cls, dialogue: Iterable[Dict[str, Any]]) -> "Transcript":
+        """
+        Builds a transcript from the dialogue of a topic.
+
+        Accepts the shapes the topic prompts produce: {"interviewer", "candidate"}
+        pairs or single-key dicts, {"name", "timestamp", "content"} entries, and
+        {"role", "content"} messages. Entries with neither a name nor a role
+        are attributed to "Unknown", and timestamps keep their original text.
+        """
+        transcript = cls()
+        for entry in dialogue or []:
+            if not isinstance(entry, dict):
+                continue
+            if "content" in entry:
+                speaker = str(entry.get("name", entry.get("role", "Unknown")) or "")
+                role = entry.get("role") or (guess_role(speaker) if "name" in entry else UNKNOWN)
+                time_text = entry.get("timestamp")
+                time_text = str(time_text) if time_text else None
+                transcript.turns.append(
+                    Turn(speaker, role, str(entry.get("content", "")), parse_timestamp(time_text), time_text)
+                )
+                continue
+            for role in (INTERVIEWER, CANDIDATE):
+                content = entry.get(role)
+                if isinstance(content, str) and content.strip():
+                    transcript.append(role, content)
+        return transcript
+
+    # ==================== Renderers ====================
+
+    def to_messages(self) -> List[Dict[str, str]]:
+        return [turn.to_message() for turn in self.turns]
+
+    def iter_text_lines(self) -> Iterator[str]:
+        """Yields "Name(HH:MM:SS): content" lines, one line per turn."""
+        for turn in self.turns:
+            content = turn.content.replace("\n", " ").replace("\r", "")
+            yield f"{turn.speaker}({format_timestamp(turn.seconds or 0, always_hours=True)}): {content}"
+
+    def to_text(self) -> str:
+        return "\n".join(self.iter_text_lines())
+
+    def to_prompt(self) -> str:
+        """Renders "Name (time): content" lines for prompts; turns without time omit it."""
+        lines = []
+        for turn in self.turns:
+            sender = turn.speaker or turn.role
+            timestamp = f" ({turn.timestamp})" if turn.timestamp else ""
+            lines.append(f"{sender}{timestamp}: {turn.content}")
+        return "\n".join(lines)
+
+    @classmethod
+    def format_topic_dialogue(
+        cls, dialogue: Iterable[Dict[str, Any]], labels: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Renders numbered "面试官-1" / "候选人-1" blocks for the dialogue of a topic.
+
+        Blocks are numbered by their entry in the dialogue list, so the question
+        and answer of one {"interviewer", "candidate"} pair share a number.
+        """
+        labels = labels or {INTERVIEWER: "面试官", CANDIDATE: "候选人"}
+        blocks = []
+        for number, entry in enumerate(dialogue or [], 1):
+            for turn in cls.from_topic_dialogue([entry]):
+                if turn.role in labels:
+                    blocks.append(f"{labels[turn.role]}-{number}: {turn.content}")
+        return "\n\n".join(blocks)
+
+    # ==================== Transforms ====================
+
+    def merge_consecutive(self) -> "Transcript":
+        """Joins consecutive turns of the same role into one turn."""
+        merged: List[Turn] = []
+        for turn in self.turns:
+            if merged and merged[-1].role == turn.role:
+                last = merged[-1]
+                merged[-1] = Turn(last.speaker, last.role, f"{last.content} {turn.content}",
+                                  last.seconds, last.time_text)
+            else:
+                merged.append(turn)
+        return Transcript(merged)
+
+    def with_roles(self, *roles: str) -> "Transcript":
+        return Transcript(turn for turn in self.turns if turn.role in roles)
+
+    # ==================== Cache ====================
+
+    def save_jsonl(self, path: str):
+        """
+        Writes a compact JSONL cache.
+
+        The first line holds the speaker table. Each turn is written as
+        [speaker_index, role_code, seconds, content], followed by the source
+        timestamp text when it differs from the formatted seconds.
+        """
+        speakers: Dict[str, int] = {}
+        rows = []
+        for turn in self.turns:
+            index = speakers.setdefault(turn.speaker, len(speakers))
+            row = [index, _ROLE_CODES.get(turn.role, turn.role), turn.seconds, turn.content]
+            if (turn.time_text or "") != format_timestamp(turn.seconds):
+                row.append(turn.time_text)
+            rows.append(row)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CACHE_VERSION, "speakers": list(speakers)}, ensure_ascii=False))
+            for row in rows:
+                f.write("\n")
+                f.write(json.dumps(row, ensure_ascii=False))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_jsonl(cls, path: str) -> "Transcript":
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CACHE_VERSION:
+                raise ValueError(f"Unsupported transcript cache version: {header.get('version')}")
+            speakers = header["speakers"]
+            turns = []
+            for line in f:
+                index, role_code, seconds, content, *time_text = json.loads(line)
+                time_text = time_text[0] if time_text else format_timestamp(seconds)
+                turns.append(Turn(speakers[index], _CODE_ROLES.get(role_code, role_code), content, seconds, time_text))
+        return cls(turns)
+
+    @classmethod
+    def cached_parse(cls, text: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> "Transcript":
+        """Parses raw transcript text once; later calls with the same text load the JSONL cache."""
+        if not cache_dir:
+            return cls.parse(text)
+        path = os.path.join(cache_dir, f"{content_hash(text)}.v{CACHE_VERSION}.jsonl")
+        try:
+            return cls.load_jsonl(path)
+        except (OSError, ValueError, KeyError, IndexError):
+            transcript = cls.parse(text)
+            transcript.save_jsonl(path)
+            return transcript
@@ -0,0 +1,211 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    Lease-based work queue stored in a SQLite file.
+
+    Several processes, possibly on different machines sharing the data
+    directory, can pull units from the same queue. A claimed unit is leased to
+    one worker until its lease expires. Workers extend the lease with
+    heartbeats while they run. A unit whose worker died becomes claimable
+    again once its lease runs out, and it is marked failed after max_attempts.
+
+    The journal stays in the default rollback mode because SQLite's WAL mode
+    does not work on network filesystems.
+    """
+
+    def __init__(self, db_path: str, lease_seconds: float = 600, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS units (
+                    unit TEXT PRIMARY KEY,
+                    payload TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_units_status ON units(status)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 60000")
+        return conn
+
+    def enqueue(self, units: Iterable[Tuple[str, Optional[Dict[str, Any]]]]) -> int:
+        """Adds (unit, payload) pairs and returns how many became pending.
+
+        Units that are already done are queued again, so a re-run picks up
+        changed inputs; the artifact manifests keep unchanged units cheap.
+        Pending, leased and failed units are left untouched.
+        """
+        now = time.time()
+        rows = [
+            (unit, json.dumps(payload, ensure_ascii=False) if payload is not None else None, now)
+            for unit, payload in units
+        ]
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO units (unit, payload, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(unit) DO UPDATE SET payload = excluded.payload, status = ?, owner = NULL, "
+                "attempts = 0, last_error = NULL, updated_at = excluded.updated_at "
+                "WHERE units.status = ?",
+                [row + (PENDING, DONE) for row in rows],
+            )
+            queued = conn.total_changes - before
+            conn.execute("COMMIT")
+            return queued
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, worker_id: str) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Leases the next pending or expired unit to a worker, or returns None when drained."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases that used up their attempts will not be retried
+            conn.execute(
+                "UPDATE units SET status = ?, last_error = COALESCE(last_error, 'lease expired'), updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT unit, payload FROM units "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY rowid LIMIT 1",
+                (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE units SET status = ?, owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE unit = ?",
+                (LEASED, worker_id, now + self.lease_seconds, now, row[0]),
+            )
+            conn.execute("COMMIT")
+            return row[0], json.loads(row[1]) if row[1] else None
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _update_owned(self, unit: str, worker_id: str, sql: str, params: tuple) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"{sql} WHERE unit = ? AND owner = ? AND status = ?",
+                params + (unit, worker_id, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, unit: str, worker_id: str) -> bool:
+        """Extends the lease; returns False if the worker no longer owns the unit."""
+        now = time.time()
+        return self._update_owned(
+            unit, worker_id,
+            "UPDATE units SET lease_expires = ?, updated_at = ?",
+            (now + self.lease_seconds, now),
+        )
+
+    def complete(self, unit: str, worker_id: str) -> bool:
+        return self._update_owned(
+            unit, worker_id,
+            "UPDATE units SET status = ?, lease_expires = NULL, last_error = NULL, updated_at = ?",
+            (DONE, time.time()),
+        )
+
+    def fail(self, unit: str, worker_id: str, error: str) -> bool:
+        """Releases a unit after an error; it is retried until max_attempts is reached."""
+        return self._update_owned(
+            unit, worker_id,
+            "UPDATE units SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "lease_expires = NULL, last_error = ?, updated_at = ?",
+            (self.max_attempts, FAILED, PENDING, error, time.time()),
+        )
+
+    def retry_failed(self) -> int:
+        """Puts failed units back into the queue with a fresh attempt budget."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE units SET status = ?, attempts = 0, updated_at = ? WHERE status = ?",
+                (PENDING, time.time(), FAILED),
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+
+class LeaseHeartbeat:
+    """Keeps a claimed unit's lease alive from a background thread while the unit is processed."""
+
+    def __init__(self, queue: WorkQueue, unit: str, worker_id: str, interval: Optional[float] = None):
+        self.queue = queue
+        self.unit = unit
+        self.worker_id = worker_id
+        self.interval = interval or max(queue.lease_seconds / 3, 1)
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.unit, self.worker_id):
+                    self.lost = True
+                    return
+            except sqlite3.Error:
+                # Transient lock/network errors; the next beat tries again
+                continue
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
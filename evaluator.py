@@ -8,10 +8,30 @@ import datetime
 import sys
 from pathlib import Path
 
-from agents.eval_agent import EvalAgent
-from components.file_parser import FileParser
+# EvalAgent (model client) and FileParser (pdfplumber) are imported where they
+# are used, so forwarding jobs with --server only loads the job client.
 from components.data_manager import DataManager
 from components.selector import InterviewSelector
+from components.artifact_manifest import ArtifactManifest
+from components.cost_estimator import CostEstimator, estimate_tokens, PDF_TOKENS_PER_PAGE
+from components.progress import ProgressTracker
+from components.work_queue import WorkQueue, LeaseHeartbeat, default_worker_id
+from components.job_client import JobClient
+from components.transcript import Transcript
+
+# Bump these when the prompt templates behind analyze_topics / evaluate_interview
+# change, so existing artifacts are recognised as stale.
+TOPIC_PROMPT_VERSION = "1"
+REPORT_PROMPT_VERSION = "1"
+
+# Transcripts whose PDFs are extracted together before evaluation in batch mode
+PREFETCH_WINDOW = 8
+
+# Dry-run sizing of the prompt templates and responses (tokens)
+TOPIC_PROMPT_OVERHEAD_TOKENS = 800
+REPORT_PROMPT_OVERHEAD_TOKENS = 1500
+REPORT_OUTPUT_TOKENS = 3000
+RESUME_OUTPUT_TOKENS = 1500
 
 def load_transcript(transcript_name, resource_path=None):
     """Loads transcript from PDF or falls back to text."""
@@ -28,6 +48,7 @@ def load_transcript(transcript_name, resource_path=None):
         f"{transcript_name}.txt" if not transcript_name.endswith('.txt') else transcript_name
     ]
     
+    from components.file_parser import FileParser
     parser = FileParser()
     
     for f in candidates:
@@ -43,6 +64,7 @@ def load_jd(jd_name, resource_path=None):
         resource_path = "data/resources/jd"
 
     md_file = os.path.join(resource_path, f"{jd_name}.txt")
+    from components.file_parser import FileParser
     parser = FileParser()
     
     if os.path.exists(md_file):
@@ -59,6 +81,7 @@ def load_resume(resume_name, resource_path=None):
 
     md_file = os.path.join(resource_path, f"{resume_name}.md")
     pdf_file = os.path.join(resource_path, f"{resume_name}.pdf")
+    from components.file_parser import FileParser
     parser = FileParser()
     
     if os.path.exists(md_file):
@@ -97,25 +120,91 @@ def get_output_paths(transcript_name, temp=False):
     
     return topic_path, os.path.join(report_dir, report_filename)
 
+def get_model_id(agent):
+    """Best-effort identifier of the model an agent calls, used in artifact manifests."""
+    model = getattr(agent, "model", None)
+    for attr in ("default_model_id", "model_id"):
+        value = getattr(model, attr, None)
+        if value:
+            return str(value)
+    return "default"
+
+
+def topic_manifest(agent, transcript_content, info):
+    """Inputs that determine a topic analysis artifact."""
+    return ArtifactManifest({
+        "transcript": transcript_content,
+        "jd": info.get("jd"),
+        "resume": info.get("resume"),
+        "prompt_version": TOPIC_PROMPT_VERSION,
+        "model": get_model_id(agent),
+    })
+
+
+def report_manifest(agent, topic_analysis, transcript_content, info, stage, prev_report=None):
+    """Inputs that determine an evaluation report, including its upstream artifacts."""
+    return ArtifactManifest({
+        "topic_analysis": topic_analysis,
+        "transcript": transcript_content,
+        "jd": info.get("jd"),
+        "resume": info.get("resume"),
+        "criteria": getattr(agent, "evaluation_criteria", None),
+        "stage": stage,
+        "previous_report": prev_report,
+        "prompt_version": REPORT_PROMPT_VERSION,
+        "model": get_model_id(agent),
+    })
+
+
+def is_up_to_date(manifest, output_path, force, label):
+    """Decides whether an existing artifact can be reused.
+
+    Artifacts written before manifests existed are adopted as-is (their manifest
+    is written from the current inputs) instead of forcing a full corpus rerun.
+    """
+    if force:
+        return False
+
+    changed = manifest.changed_inputs(output_path)
+    if not changed:
+        print(f"{label} is up to date at {output_path}")
+        return True
+
+    if changed == ["manifest"]:
+        print(f"{label} exists without manifest, adopting {output_path}")
+        manifest.save(output_path)
+        return True
+
+    if changed != ["artifact"]:
+        print(f"{label} is stale ({', '.join(changed)} changed), rebuilding")
+    return False
+
+
 def run_topic_analysis(agent, transcript_content, info, output_path, data_manager, force=False):
-    """Runs or retrieves topic analysis."""
-    
-    if not force and os.path.exists(output_path):
-        print(f"Topic analysis already exists at {output_path}")
+    """Runs topic analysis unless an artifact built from the same inputs exists."""
+
+    manifest = topic_manifest(agent, transcript_content, info)
+    if is_up_to_date(manifest, output_path, force, "Topic analysis"):
         return data_manager.load_json(output_path)
     
     print("\nRunning Analyze Topics...")
     topic_analysis = agent.analyze_topics(transcript_content, info)
     data_manager.save_json(topic_analysis, output_path)
+    manifest.save(output_path, topic_analysis)
     print(f"Saved topic analysis to {output_path}")
     return topic_analysis
 
 def run_evaluation(agent, topic_analysis, transcript_content, info, output_path, data_manager, force=False,stage="1"):
-    """Runs or retrieves evaluation report."""
-    
-    if not force and os.path.exists(output_path):
-        print(f"Evaluation report already exists at {output_path}")
-        return
+    """Runs the evaluation report unless it is up to date with its inputs and upstream artifacts."""
+
+    prev_report = None
+    if stage != "1":
+        prev_report_path = f"{output_path[:-6]}{int(stage)-1}.json"
+        prev_report = data_manager.load_json(prev_report_path)
+
+    manifest = report_manifest(agent, topic_analysis, transcript_content, info, stage, prev_report)
+    if is_up_to_date(manifest, output_path, force, "Evaluation report"):
+        return data_manager.load_json(output_path)
         
     print("\nRunning Evaluation...")
     
@@ -124,11 +213,9 @@ def run_evaluation(agent, topic_analysis, transcript_content, info, output_path,
     if topic_analysis and "topics" in topic_analysis:
         for topic in topic_analysis["topics"]:
             topics_content += f"## 主题: {topic.get('topic_name', 'Unknown')}\n"
-            for msg in topic.get("dialogue", []):
-                sender = msg.get('name', msg.get('role', 'Unknown'))
-                timestamp = f" ({msg.get('timestamp')})" if msg.get('timestamp') else ""
-                content = msg.get('content', '')
-                topics_content += f"{sender}{timestamp}: {content}\n"
+            dialogue = Transcript.from_topic_dialogue(topic.get("dialogue", []))
+            if len(dialogue):
+                topics_content += dialogue.to_prompt() + "\n"
             topics_content += "\n\n"
             
     if not topics_content:
@@ -137,9 +224,7 @@ def run_evaluation(agent, topic_analysis, transcript_content, info, output_path,
 
     summary = None
     if stage != "1":
-        prev_report_path = f"{output_path[:-6]}{int(stage)-1}.json"
         try:
-            prev_report = data_manager.load_json(prev_report_path)
             prev_res = prev_report.get("response")
             summary = prev_res.get('summary', '没有获取到上一次评价总结，直接开始二面')
         except:
@@ -147,14 +232,58 @@ def run_evaluation(agent, topic_analysis, transcript_content, info, output_path,
 
     evaluation_report = agent.evaluate_interview(topics_content, info,True,stage,summary)
     data_manager.save_json(evaluation_report, output_path)
+    manifest.save(output_path, evaluation_report)
     print(f"Saved evaluation report to {output_path}")
+    return evaluation_report
 
-def process_interview(transcript_name, args, data_manager, path_override=None):
-    """Processes a single interview: loads data, runs topic analysis, runs evaluation."""
+def prefetch_transcripts(items):
+    """Extracts the transcript PDFs of a batch together, spreading pages over a process pool.
+
+    Returns a dict of transcript name -> content; text transcripts and PDFs
+    that fail are left to process_interview's own loading.
+    """
+    pdf_items = [item for item in items if item.get('path', '').endswith('.pdf')]
+    if not pdf_items:
+        return {}
+    from components.file_parser import FileParser
+    try:
+        contents = FileParser.read_transcripts_parallel([item['path'] for item in pdf_items])
+    except Exception as e:
+        print(f"Batch transcript extraction failed, loading one by one: {e}")
+        return {}
+    return {item['name']: contents[item['path']] for item in pdf_items if contents.get(item['path'])}
+
+def parse_transcript_name(basename):
+    """Splits `name_desc_transcript_x` into (candidate_name, job_desc, stage)."""
+    parts = basename.split('_')
+    candidate_name = parts[0]
+    job_desc = parts[1] if len(parts) > 1 else "unknown"
+    # Avoid 'transcript' being the job description if format is name_transcript_x
+    if job_desc == 'transcript':
+        job_desc = "unknown"
+
+    stage = parts[3] if len(parts) > 3 else "unknown"
+    return candidate_name, job_desc, stage
+
+def process_interview(transcript_name, args, data_manager, path_override=None, progress=None, agent=None,
+                      transcript_content=None):
+    """Processes a single interview: loads data, runs topic analysis, runs evaluation.
+
+    If a ProgressTracker is given, the interview is tracked as one unit moving
+    through the load/topic/report stages and the agent's model calls are timed.
+    A long-running caller such as service.py can pass a warm EvalAgent instead
+    of building a new one per interview, and batch runs can pass transcript
+    content that was already extracted.
+
+    Returns True on success and False if processing failed.
+    """
     print(f"\n{'='*50}")
     print(f"Processing: {transcript_name}")
     print(f"{'='*50}")
 
+    if progress:
+        progress.start(transcript_name, "load")
+
     try:
         # 2. Load Transcript
         # If path_override is provided (e.g. valid file path), use directory of that file
@@ -163,22 +292,14 @@ def process_interview(transcript_name, args, data_manager, path_override=None):
         # Determine actual file name for loading if full path is passed
         load_name = transcript_name
         
-        transcript_content = load_transcript(load_name, resource_path)
+        if transcript_content is None:
+            transcript_content = load_transcript(load_name, resource_path)
         print(f"Transcript read, length: {len(transcript_content)} chars")
 
         # Parse transcript_name
-        # Rule: name_desc_transcript_x
         # We need the basename without extension for split logic if transcript_name is full path
         basename = os.path.splitext(os.path.basename(transcript_name))[0]
-        
-        parts = basename.split('_')
-        candidate_name = parts[0]
-        job_desc = parts[1] if len(parts) > 1 else "unknown"
-        # Avoid 'transcript' being the job description if format is name_transcript_x
-        if job_desc == 'transcript': 
-             job_desc = "unknown"
-             
-        stage = parts[3] if len(parts) > 3 else "unknown"
+        candidate_name, job_desc, stage = parse_transcript_name(basename)
 
         # 2.1 Load JD
         jd_name = f"{job_desc}_jd"
@@ -208,7 +329,11 @@ def process_interview(transcript_name, args, data_manager, path_override=None):
         }
         
         topic_analysis = None
-        agent = EvalAgent()
+        if agent is None:
+            from agents.eval_agent import EvalAgent
+            agent = EvalAgent()
+        if progress:
+            agent.model = progress.instrument(agent.model)
         
         # Determine paths using basename (clean id)
         topic_path, report_path = get_output_paths(basename, args.temp)
@@ -218,11 +343,15 @@ def process_interview(transcript_name, args, data_manager, path_override=None):
 
         # Execute Pipeline
         if args.step in ["all", "topic"]:
+            if progress:
+                progress.set_stage(transcript_name, "topic")
             topic_analysis = run_topic_analysis(
                 agent, transcript_content, info, topic_path, data_manager, force=force_topic
             )
             
         if args.step in ["all", "report"]:
+            if progress:
+                progress.set_stage(transcript_name, "report")
             if not topic_analysis:
                 if os.path.exists(topic_path):
                      topic_analysis = data_manager.load_json(topic_path)
@@ -238,17 +367,211 @@ def process_interview(transcript_name, args, data_manager, path_override=None):
             run_evaluation(
                 agent, topic_analysis, transcript_content, info, report_path, data_manager, force=force_report,stage=stage
             )
+
+        if progress:
+            progress.finish(transcript_name)
+        return True
             
     except Exception as e:
         print(f"Error processing {transcript_name}: {e}")
         traceback.print_exc()
+        if progress:
+            progress.finish(transcript_name, error=str(e))
+        return False
+
+def estimate_interview(transcript_name, args, agent, data_manager, estimator):
+    """Adds the requests process_interview would send for one transcript to the estimator.
+
+    Only local work is done: the transcript and JD are read, resume PDFs
+    missing from the document cache are read from their text layer or, if that
+    is unusable, sized by page count instead of being sent to the model, and
+    existing artifacts are checked against their manifests.
+    """
+    from components.file_parser import FileParser
+
+    transcript_content = load_transcript(transcript_name, args.path)
+    basename = os.path.splitext(os.path.basename(transcript_name))[0]
+    candidate_name, job_desc, stage = parse_transcript_name(basename)
+
+    try:
+        jd_content = load_jd(f"{job_desc}_jd", "data/resources/jd")
+    except FileNotFoundError:
+        jd_content = None
+
+    resume_dir = "data/resources/candidate_resumes"
+    resume_md = os.path.join(resume_dir, f"{candidate_name}_resume.md")
+    resume_pdf = os.path.join(resume_dir, f"{candidate_name}_resume.pdf")
+    resume_content = None
+    resume_tokens = 0
+    if os.path.exists(resume_md):
+        resume_content = FileParser.read_file(resume_md)
+    elif os.path.exists(resume_pdf):
+        resume_content = FileParser.cached_text(resume_pdf)
+
+    if resume_content is None and os.path.exists(resume_pdf):
+        text, quality = FileParser.resume_text_layer(resume_pdf)
+        if quality["usable"]:
+            resume_content = text
+        else:
+            estimator.add_request("resume_parse", quality["pages"] * PDF_TOKENS_PER_PAGE, RESUME_OUTPUT_TOKENS)
+            resume_tokens = RESUME_OUTPUT_TOKENS
+
+    info = {
+        "jd": jd_content if jd_content else "通用岗位面试（未提供详细JD）",
+        "resume": resume_content if resume_content else "未提供简历"
+    }
+    context_tokens = (
+        estimate_tokens(transcript_content)
+        + estimate_tokens(info["jd"])
+        + (resume_tokens or estimate_tokens(info["resume"]))
+    )
+
+    topic_path, report_path = get_output_paths(basename, args.temp)
+    # An unparsed resume PDF means the manifest inputs are not known yet
+    inputs_known = not resume_tokens
+
+    topic_rebuilt = False
+    if args.step in ["all", "topic"]:
+        manifest = topic_manifest(agent, transcript_content, info)
+        force = args.force or args.force_topic
+        if inputs_known and not force and manifest.changed_inputs(topic_path) in ([], ["manifest"]):
+            estimator.add_skipped("topic_analysis")
+        else:
+            topic_rebuilt = True
+            estimator.add_request(
+                "topic_analysis",
+                context_tokens + TOPIC_PROMPT_OVERHEAD_TOKENS,
+                estimate_tokens(transcript_content),
+            )
+
+    if args.step in ["all", "report"]:
+        force = args.force or args.force_report
+        fresh = False
+        if inputs_known and not topic_rebuilt and not force:
+            topic_analysis = data_manager.load_json(topic_path)
+            prev_report = None
+            if stage != "1":
+                prev_report = data_manager.load_json(f"{report_path[:-6]}{int(stage)-1}.json")
+            manifest = report_manifest(agent, topic_analysis, transcript_content, info, stage, prev_report)
+            fresh = manifest.changed_inputs(report_path) in ([], ["manifest"])
+
+        if fresh:
+            estimator.add_skipped("evaluation")
+        else:
+            criteria_tokens = estimate_tokens(getattr(agent, "evaluation_criteria", ""))
+            estimator.add_request(
+                "evaluation",
+                context_tokens + criteria_tokens + REPORT_PROMPT_OVERHEAD_TOKENS,
+                REPORT_OUTPUT_TOKENS,
+            )
+
+def estimate_run(transcripts, args, data_manager):
+    """Prints the dry-run estimate for a list of selected transcripts."""
+    from agents.eval_agent import EvalAgent
+
+    agent = EvalAgent()
+    estimator = CostEstimator(model_id=get_model_id(agent), concurrency=args.concurrency)
+    for item in transcripts:
+        try:
+            estimate_interview(item['name'], args, agent, data_manager, estimator)
+        except Exception as e:
+            print(f"Error estimating {item['name']}: {e}")
+    print()
+    estimator.print_report()
+
+def run_worker(args, worker_id=None):
+    """Pulls transcripts from the shared work queue until it is drained.
+
+    Any number of workers, on this machine or on others sharing the data
+    directory, can run against the same queue file. Artifacts go to the
+    standard data/generated/ layout, so a unit retried after an expired lease
+    reuses whatever its previous worker already finished.
+    """
+    worker_id = worker_id or default_worker_id()
+    queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds)
+    data_manager = DataManager()
+    progress = ProgressTracker(
+        queue.stats()["pending"], label=f"worker {worker_id}", status_path=args.status_file
+    )
+
+    while True:
+        claimed = queue.claim(worker_id)
+        if claimed is None:
+            break
+        unit, _ = claimed
+
+        with LeaseHeartbeat(queue, unit, worker_id) as heartbeat:
+            ok = process_interview(unit, args, data_manager, progress=progress)
+
+        if heartbeat.lost:
+            print(f"Lease on {unit} was lost, leaving it to its new owner")
+        elif ok:
+            queue.complete(unit, worker_id)
+        else:
+            queue.fail(unit, worker_id, "process_interview failed")
+
+    progress.report(force=True)
+    print(f"Worker {worker_id} finished, queue: {queue.stats()}")
+
+def run_queue(transcripts, args):
+    """Enqueues the selected transcripts and drains the queue with local worker processes."""
+    queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds)
+    queued = queue.enqueue((item['name'], None) for item in transcripts)
+    print(f"Queued {queued} transcripts ({len(transcripts) - queued} already pending, running or failed), queue: {queue.stats()}")
+
+    if args.workers <= 1:
+        run_worker(args)
+        return
+
+    import multiprocessing
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(args, f"{default_worker_id()}-{i}"))
+        for i in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    print(f"All workers finished, queue: {queue.stats()}")
+
+def run_remote(transcript_names, args):
+    """Submits the selected transcripts to the warm evaluation service and waits for them.
+
+    A single transcript goes in as an interactive job. Batch runs are split into
+    one job per transcript at batch priority, so interactive jobs submitted
+    meanwhile run between them.
+    """
+    client = JobClient(args.server)
+    priority = "interactive" if len(transcript_names) == 1 else "batch"
+    params = {
+        "path": args.path,
+        "step": args.step,
+        "force": args.force,
+        "force_topic": args.force_topic,
+        "force_report": args.force_report,
+        "temp": args.temp,
+    }
+
+    jobs = [(name, client.submit("evaluate", {**params, "name": name}, priority)) for name in transcript_names]
+    print(f"Submitted {len(jobs)} jobs to {args.server} ({priority})")
+
+    failed = 0
+    for name, job_id in jobs:
+        job = client.wait(job_id)
+        if job["status"] == "done":
+            print(f"Done: {name} ({job['run_seconds']}s, waited {job['wait_seconds']}s)")
+        else:
+            failed += 1
+            print(f"Failed: {name}: {job['error']}")
+    print(f"Remote evaluation finished: {len(jobs) - failed}/{len(jobs)} succeeded")
 
 def main():
     parser = argparse.ArgumentParser(description="Interview Evaluation Pipeline")
     parser.add_argument("--name", help="Base name of the transcript (without extension)")
     parser.add_argument("--path", default=f"data/resources/conversations/", help="Path to transcript directory")
     parser.add_argument("--step", choices=["all", "topic", "report"], default="all", help="Pipeline step to run")
-    parser.add_argument("--force", action="store_true", help="Force overwrite all steps")
+    parser.add_argument("--force", action="store_true", help="Force overwrite all steps (default: rebuild only stale artifacts)")
     parser.add_argument("--force-topic", action="store_true", help="Force overwrite topic analysis")
     parser.add_argument("--force-report", action="store_true", help="Force overwrite evaluation report")
     parser.add_argument("--temp", action="store_true", help="Save output to temp dir with timestamp")
@@ -256,6 +579,21 @@ def main():
     # Filter arguments
     parser.add_argument("--jd", help="Filter by JD (for batch selector)")
     parser.add_argument("--candidate", help="Filter by Candidate Name (for batch selector)")
+
+    # Capacity planning
+    parser.add_argument("--dry-run", action="store_true", help="Estimate requests, tokens, cost and wall time without calling the model")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrency assumed by the dry-run wall time estimate")
+
+    # Monitoring
+    parser.add_argument("--status-file", help="JSON file refreshed with live progress of batch runs")
+
+    # Sharded batch processing
+    parser.add_argument("--queue", help="SQLite work queue shared by workers (e.g. data/generated/queue.db)")
+    parser.add_argument("--workers", type=int, default=1, help="Local worker processes pulling from --queue")
+    parser.add_argument("--lease-seconds", type=float, default=600, help="Lease duration of a claimed transcript")
+
+    # Warm service
+    parser.add_argument("--server", help="Forward jobs to a running evaluation service (e.g. http://127.0.0.1:8765)")
     
     args = parser.parse_args()
     
@@ -263,7 +601,11 @@ def main():
     selector = InterviewSelector(args.path)
 
     try:
-        if args.name:
+        if args.name and args.dry_run:
+            estimate_run([{"name": args.name}], args, data_manager)
+        elif args.name and args.server:
+            run_remote([args.name], args)
+        elif args.name:
             # Single file mode (legacy compatible)
             process_interview(args.name, args, data_manager)
         else:
@@ -283,6 +625,9 @@ def main():
                      print(f"No transcripts matched filters: {filters}")
                      return
                 print(f"Found {len(selected_transcripts)} matching transcripts.")
+            elif args.queue:
+                # Workers on several machines must not block on a prompt
+                selected_transcripts = selector.transcripts
             else:
                 # Interactive mode
                 selected_transcripts = selector.interactive_select()
@@ -291,9 +636,34 @@ def main():
                 print("No transcripts selected.")
                 return
 
+            if args.dry_run:
+                estimate_run(selected_transcripts, args, data_manager)
+                return
+
+            if args.queue:
+                run_queue(selected_transcripts, args)
+                return
+
+            if args.server:
+                run_remote([item['name'] for item in selected_transcripts], args)
+                return
+
             print(f"\nStarting batch processing for {len(selected_transcripts)} interviews...")
-            for item in selected_transcripts:
-                process_interview(item['name'], args, data_manager)
+            progress = ProgressTracker(
+                len(selected_transcripts), label="evaluator", status_path=args.status_file
+            )
+            for offset in range(0, len(selected_transcripts), PREFETCH_WINDOW):
+                window = selected_transcripts[offset:offset + PREFETCH_WINDOW]
+                prefetched = prefetch_transcripts(window)
+                for item in window:
+                    process_interview(
+                        item['name'], args, data_manager, progress=progress,
+                        transcript_content=prefetched.get(item['name'])
+                    )
+            progress.report(force=True)
+            from components.file_parser import FileParser
+            if sum(FileParser.resume_tiers.values()):
+                print(FileParser.resume_tier_report())
 
     except Exception as e:
         print(f"Global Error: {e}")
@@ -0,0 +1,340 @@
+"""
+列式缓存模块
+
+把清洗后的面试数据保存为 Arrow IPC（Feather v2）文件，之后的加载直接内存映射读取，
+不再重新解析 CSV。pyarrow 为可选依赖，未安装时缓存不生效。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from components.artifact_manifest import file_hash
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+
+class ColumnarStore:
+    """
+    列式数据缓存
+
+    功能:
+    - 按数据源和布局保存清洗后的 DataFrame 和有效行标记
+    - 通过文件大小/修改时间判断缓存是否有效，修改时间变化但内容未变时用 sha256 确认
+    - 内存映射读取，并且只读取调用方需要的列
+
+    布局（layout）描述写入缓存的加载方式：完整加载保留全部行、删除全空的列并压缩类型，
+    分块加载只保留有效行、按 chunk_dtypes 读取并可能只读取部分列。
+    不同布局写入不同的文件，读取时布局不一致的缓存视为无效。
+    """
+
+    VERSION = 2
+
+    # 缓存中保存有效行标记的列，读取时总会带上
+    VALID_COLUMN = "__valid__"
+
+    def __init__(self, cache_dir: str):
+        """
+        初始化列式缓存
+
+        Args:
+            cache_dir: 缓存目录
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @property
+    def available(self) -> bool:
+        return HAS_PYARROW
+
+    @staticmethod
+    def _layout_json(layout: Dict[str, Any]) -> str:
+        return json.dumps(layout, sort_keys=True, ensure_ascii=False, default=str)
+
+    def _paths(self, source: Path, layout: Dict[str, Any]) -> Tuple[Path, Path]:
+        key = hashlib.sha256(str(source.resolve()).encode("utf-8")).hexdigest()[:16]
+        layout_key = hashlib.sha256(self._layout_json(layout).encode("utf-8")).hexdigest()[:8]
+        stem = f"{source.stem}_{key}.{layout_key}"
+        return self.cache_dir / f"{stem}.arrow", self.cache_dir / f"{stem}.meta.json"
+
+    def load_meta(self, source: Path, layout: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        读取仍然有效的缓存元数据
+
+        Args:
+            source: 原始 CSV 路径
+            layout: 缓存布局（加载方式、列类型、读取的列）
+
+        Returns:
+            元数据字典，缓存不存在、已失效或布局不一致时返回None
+        """
+        data_path, meta_path = self._paths(source, layout)
+        if not data_path.exists() or not meta_path.exists():
+            return None
+
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("version") != self.VERSION:
+            return None
+
+        if self._layout_json(meta.get("layout", {})) != self._layout_json(layout):
+            return None
+
+        stat = source.stat()
+        if meta.get("size") != stat.st_size:
+            return None
+
+        if meta.get("mtime_ns") != stat.st_mtime_ns:
+            # 修改时间变了，内容可能没变（如重新拷贝），用哈希确认
+            if meta.get("sha256") != file_hash(str(source)):
+                return None
+            meta["mtime_ns"] = stat.st_mtime_ns
+            self._write_meta(meta_path, meta)
+
+        return meta
+
+    def open_table(
+        self,
+        source: Path,
+        layout: Dict[str, Any],
+        columns: Optional[List[str]] = None,
+    ) -> Optional[Tuple["pa.Table", Dict[str, Any]]]:
+        """
+        内存映射打开缓存，不转换成 DataFrame
+
+        Args:
+            source: 原始 CSV 路径
+            layout: 缓存布局
+            columns: 需要的列，None 表示全部（有效行标记列总会带上）
+
+        Returns:
+            (Arrow Table, 元数据)，缓存不可用时返回None
+        """
+        if not HAS_PYARROW:
+            return None
+
+        meta = self.load_meta(source, layout)
+        if meta is None:
+            return None
+
+        data_path, _ = self._paths(source, layout)
+        read_columns = None
+        if columns is not None:
+            read_columns = [col for col in columns if col in meta["columns"]]
+            read_columns.append(self.VALID_COLUMN)
+
+        try:
+            table = feather.read_table(str(data_path), columns=read_columns, memory_map=True)
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"列式缓存读取失败，将重新解析 CSV: {e}")
+            return None
+
+        return table, meta
+
+    def read(
+        self,
+        source: Path,
+        layout: Dict[str, Any],
+        columns: Optional[List[str]] = None,
+    ) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        从缓存读取数据
+
+        Args:
+            source: 原始 CSV 路径
+            layout: 缓存布局
+            columns: 需要的列，None 表示全部
+
+        Returns:
+            (DataFrame, 元数据)，缓存不可用时返回None
+        """
+        opened = self.open_table(source, layout, columns)
+        if opened is None:
+            return None
+        table, meta = opened
+        return table.to_pandas(), meta
+
+    def writer(self, source: Path, layout: Dict[str, Any]) -> "ColumnarWriter":
+        """创建逐块写入的写入器"""
+        return ColumnarWriter(self, source, layout)
+
+    def write(
+        self,
+        source: Path,
+        layout: Dict[str, Any],
+        df: pd.DataFrame,
+        valid_mask: pd.Series,
+        meta: Dict[str, Any],
+    ) -> bool:
+        """
+        写入缓存
+
+        Args:
+            source: 原始 CSV 路径
+            layout: 缓存布局
+            df: 清洗后的 DataFrame
+            valid_mask: 有效行标记
+            meta: 附加元数据（编码、清洗警告、验证结果等）
+
+        Returns:
+            是否写入成功
+        """
+        if not HAS_PYARROW:
+            return False
+
+        writer = self.writer(source, layout)
+        return writer.write(df, valid_mask) and writer.commit(meta)
+
+    def _build_meta(
+        self,
+        source: Path,
+        layout: Dict[str, Any],
+        columns: List[str],
+        rows: int,
+        meta: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        stat = source.stat()
+        return {
+            **meta,
+            "version": self.VERSION,
+            "layout": json.loads(self._layout_json(layout)),
+            "source": str(source.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(str(source)),
+            "columns": columns,
+            "rows": rows,
+        }
+
+    def _write_meta(self, meta_path: Path, meta: Dict[str, Any]):
+        tmp_path = meta_path.with_suffix(_tmp_suffix())
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, meta_path)
+
+
+class ColumnarWriter:
+    """
+    逐块写入列式缓存
+
+    所有数据块写入同一个 Arrow IPC 文件，commit 之后才替换正式缓存，
+    中途失败或 abort 不会留下不完整的缓存。
+    """
+
+    def __init__(self, store: ColumnarStore, source: Path, layout: Dict[str, Any]):
+        self.store = store
+        self.source = source
+        self.layout = layout
+        self.data_path, self.meta_path = store._paths(source, layout)
+        self.tmp_path = self.data_path.with_suffix(_tmp_suffix())
+        self.rows = 0
+        self._schema = None
+        self._sink = None
+        self._writer = None
+        self._failed = False
+
+    def write(self, df: pd.DataFrame, valid_mask: pd.Series) -> bool:
+        """写入一个数据块，列与类型以第一个数据块为准"""
+        if self._failed:
+            return False
+        try:
+            table = pa.Table.from_pandas(
+                df.assign(**{ColumnarStore.VALID_COLUMN: valid_mask.to_numpy(dtype=bool)}),
+                preserve_index=False,
+            )
+            if self._writer is None:
+                self.store.cache_dir.mkdir(parents=True, exist_ok=True)
+                # 第一个数据块中全空的列推断不出类型，按字符串处理，后续数据块才能写入
+                self._schema = pa.schema(
+                    [
+                        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                        for field in table.schema
+                    ],
+                    metadata=table.schema.metadata,
+                )
+                table = table.cast(self._schema)
+                # 不压缩才能内存映射读取
+                self._sink = pa.OSFile(str(self.tmp_path), "wb")
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+            elif table.schema != self._schema:
+                table = table.select(self._schema.names).cast(self._schema)
+            self._writer.write_table(table)
+        except (OSError, KeyError, pa.ArrowException) as e:
+            logger.warning(f"列式缓存写入失败: {e}")
+            self.abort()
+            return False
+        self.rows += len(df)
+        return True
+
+    def commit(self, meta: Dict[str, Any]) -> bool:
+        """完成写入并替换正式缓存"""
+        if self._failed or self._writer is None:
+            self.abort()
+            return False
+        try:
+            self._writer.close()
+            self._sink.close()
+            os.replace(self.tmp_path, self.data_path)
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"列式缓存写入失败: {e}")
+            self.abort()
+            return False
+
+        columns = [name for name in self._schema.names if name != ColumnarStore.VALID_COLUMN]
+        self.store._write_meta(
+            self.meta_path,
+            self.store._build_meta(self.source, self.layout, columns, self.rows, meta),
+        )
+        logger.info(f"已写入列式缓存: {self.data_path} ({self.rows} 行)")
+        return True
+
+    def abort(self):
+        self._failed = True
+        for handle in (self._writer, self._sink):
+            if handle is not None:
+                try:
+                    handle.close()
+                except (OSError, pa.ArrowException):
+                    pass
+        if self.tmp_path.exists():
+            self.tmp_path.unlink()
+
+
+def _tmp_suffix() -> str:
+    """临时文件后缀，同一进程的多个线程同时写入同一缓存时也不冲突"""
+    return f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def valid_row_positions(table: "pa.Table") -> np.ndarray:
+    """有效行在表中的位置"""
+    return np.flatnonzero(table.column(ColumnarStore.VALID_COLUMN).to_numpy(zero_copy_only=False))
+
+
+def take_rows(table: "pa.Table", positions) -> pd.DataFrame:
+    """按位置取出若干行，转换为 DataFrame（不含有效行标记列）"""
+    frame = table.take(pa.array(positions, type=pa.int64())).to_pandas()
+    return frame.drop(columns=[ColumnarStore.VALID_COLUMN], errors="ignore")
+
+
+def iter_frames(table: "pa.Table", batch_size: int) -> Iterator[pd.DataFrame]:
+    """按批次把表转换为 DataFrame，一次只物化一个批次"""
+    for batch in table.to_batches(max_chunksize=batch_size):
+        yield batch.to_pandas()
@@ -4,12 +4,27 @@
 负责从各种数据源加载面试数据，支持多种编码格式
 """
 
+import codecs
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import time
 import logging
-from typing import Optional, List
-from manager.models import DataLoadResult, ValidationResult, ManagerConfig, Record
+from typing import Any, Dict, Iterator, Optional, List, Tuple
+from manager.models import (
+    DataLoadResult,
+    ValidationResult,
+    ManagerConfig,
+    RecordLike,
+    RecordView,
+)
+from manager.columnar_store import (
+    HAS_PYARROW,
+    ColumnarStore,
+    iter_frames,
+    take_rows,
+    valid_row_positions,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +38,9 @@ class DataLoader:
     - 自动检测和处理编码问题
     - 数据验证
     - 数据清洗
+    - 列式缓存（清洗后的数据内存映射读取，可只读取需要的列）
+    - 分块读取（逐块清洗验证后写入列式缓存，记录按需迭代，不把整个数据集放进内存）
+    - 列类型压缩（分类、Arrow 字符串、可空小整数），并报告各列内存占用
     """
 
     # 必需的列名
@@ -36,6 +54,18 @@ class DataLoader:
     # 支持的编码列表
     SUPPORTED_ENCODINGS = ["utf-8", "gbk", "gb2312", "utf-8-sig", "latin1"]
 
+    # 编码探测读取的样本大小（字节）
+    ENCODING_SAMPLE_BYTES = 4 * 1024 * 1024
+
+    # 能解码任何字节序列的编码，只作为最后手段
+    FALLBACK_ENCODINGS = {"latin1"}
+
+    # 唯一值占比不超过该比例的文本列转为分类类型
+    CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+    # 文件指纹 (路径, 大小, 修改时间) -> 成功使用的编码
+    _encoding_cache: Dict[Tuple[str, int, int], str] = {}
+
     def __init__(self, config: ManagerConfig):
         """
         初始化数据加载器
@@ -46,13 +76,33 @@ class DataLoader:
         self.config = config
         self.df: Optional[pd.DataFrame] = None
         self.encoding_used: Optional[str] = None
-
-    def load_from_csv(self, file_path: Optional[str] = None) -> DataLoadResult:
+        # 有效行在 df 中的位置，加载时计算一次（按列选择加载时必需列可能不在 df 中）
+        self._valid_positions: Optional[np.ndarray] = None
+        # 有效数据视图，第一次使用时创建，之后直接复用
+        self._valid_view: Optional[pd.DataFrame] = None
+        self.store = ColumnarStore(config.columnar_cache_dir) if config.enable_cache else None
+        # 分块加载时内存映射的列式表，DataFrame 只在需要时物化
+        self._table = None
+        # 每次加载递增，依赖数据的缓存（如搜索索引）据此判断是否失效
+        self.data_version = 0
+        # 数据源文件指纹 (路径, 大小, 修改时间)
+        self.source_fingerprint: Optional[Tuple[str, int, int]] = None
+
+    def load_from_csv(
+        self,
+        file_path: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        chunksize: Optional[int] = None,
+    ) -> DataLoadResult:
         """
         从CSV文件加载数据
 
+        清洗后的数据会写入列式缓存，CSV 未变化时直接从缓存读取。
+
         Args:
             file_path: CSV文件路径，如果为None则使用配置中的路径
+            columns: 只加载这些列，None 表示全部列
+            chunksize: 分块读取的行数，None 时使用配置中的 chunk_size
 
         Returns:
             DataLoadResult: 加载结果
@@ -75,24 +125,34 @@ class DataLoader:
 
         logger.info(f"开始加载数据: {file_path}")
 
+        self._reset()
+        self.source_fingerprint = self._file_fingerprint(csv_path)
+        chunksize = chunksize or self.config.chunk_size
+        lazy = bool(chunksize) and self.store is not None and self.store.available
+
+        layout = self._cache_layout(bool(chunksize), columns)
+        cached = self._load_from_cache(csv_path, layout, columns, start_time, lazy=lazy)
+        if cached is not None:
+            return cached
+
         # 尝试使用不同编码加载
         df = None
         encoding_used = None
         errors = []
 
-        # 确定要尝试的编码列表
-        if self.config.encoding == "auto":
-            encodings_to_try = self.SUPPORTED_ENCODINGS
-        else:
-            encodings_to_try = [self.config.encoding] + [
-                enc for enc in self.SUPPORTED_ENCODINGS if enc != self.config.encoding
-            ]
+        encodings_to_try = self._encodings_to_try(csv_path)
 
-        # 尝试不同编码
+        if chunksize:
+            return self._load_chunked(
+                csv_path, layout, columns, chunksize, encodings_to_try, start_time
+            )
+
+        # 探测结果在样本之后解码失败时，再回退到逐个尝试
         for encoding in encodings_to_try:
             try:
                 df = pd.read_csv(csv_path, encoding=encoding)
                 encoding_used = encoding
+                self._encoding_cache[self._file_fingerprint(csv_path)] = encoding
                 logger.info(f"✅ 成功使用 {encoding} 编码加载数据")
                 break
             except UnicodeDecodeError:
@@ -118,10 +178,36 @@ class DataLoader:
         df, warnings = self._clean_data(df)
 
         # 验证数据
-        validation = self._validate_data(df)
+        valid_mask = self._compute_valid_mask(df)
+        validation = self._validate_data(df, valid_mask)
+
+        memory_report = {}
+        if self.config.compact_dtypes:
+            df, memory_report = self._compact_dtypes(df)
+
+        if validation.is_valid and self.store is not None:
+            self.store.write(
+                csv_path,
+                layout,
+                df,
+                valid_mask,
+                {
+                    "encoding": encoding_used,
+                    "clean_warnings": warnings,
+                    "memory_report": memory_report,
+                    "validation": {
+                        "valid_records": int(validation.valid_records),
+                        "errors": validation.errors,
+                        "warnings": validation.warnings,
+                    },
+                },
+            )
+
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
 
         # 保存数据
-        self.df = df
+        self._set_data(df, valid_mask)
         self.encoding_used = encoding_used
 
         load_time = time.time() - start_time
@@ -139,14 +225,392 @@ class DataLoader:
             errors=validation.errors,
             warnings=warnings + validation.warnings,
             load_time=load_time,
+            memory_report=memory_report,
         )
 
-    def _clean_data(self, df: pd.DataFrame) -> tuple[pd.DataFrame, List[str]]:
+    def _load_chunked(
+        self,
+        csv_path: Path,
+        layout: Dict[str, Any],
+        columns: Optional[List[str]],
+        chunksize: int,
+        encodings_to_try: List[str],
+        start_time: float,
+    ) -> DataLoadResult:
+        """
+        分块读取 CSV
+
+        每个数据块单独清洗和验证，有效行逐块写入列式缓存，之后按需内存映射读取。
+        全部列按配置的 chunk_dtypes（默认字符串）读取，保证各数据块的列类型一致。
+        未安装 pyarrow 或缓存关闭时，把各块的有效行拼接在内存中。
+
+        Args:
+            csv_path: CSV文件路径
+            layout: 列式缓存布局
+            columns: 只读取这些列（必需列总会读取，用于验证）
+            chunksize: 每块的行数
+            encodings_to_try: 按优先级排列的编码
+            start_time: 加载开始时间
+
+        Returns:
+            DataLoadResult: 加载结果
+        """
+        usecols = None
+        if columns is not None:
+            wanted = set(columns) | set(self.REQUIRED_COLUMNS)
+            usecols = lambda col: col.strip() in wanted
+        dtypes = self.config.chunk_dtypes or str
+        streaming = self.store is not None and self.store.available
+        if not streaming:
+            logger.warning("列式缓存不可用，分块读取的有效行将保存在内存中")
+
+        errors = []
+        for encoding in encodings_to_try:
+            writer = self.store.writer(csv_path, layout) if streaming else None
+            frames = []
+            total_rows = valid_rows = removed_rows = chunk_count = 0
+            missing_columns = None
+            try:
+                reader = pd.read_csv(
+                    csv_path,
+                    encoding=encoding,
+                    usecols=usecols,
+                    dtype=dtypes,
+                    chunksize=chunksize,
+                )
+                for chunk in reader:
+                    chunk_count += 1
+                    before = len(chunk)
+                    chunk, _ = self._clean_data(chunk, drop_empty_columns=False)
+                    removed_rows += before - len(chunk)
+
+                    if missing_columns is None:
+                        missing_columns = [
+                            col for col in self.REQUIRED_COLUMNS if col not in chunk.columns
+                        ]
+                        if missing_columns:
+                            break
+
+                    valid_mask = self._compute_valid_mask(chunk)
+                    total_rows += len(chunk)
+                    valid_rows += int(valid_mask.sum())
+                    valid_chunk = chunk[valid_mask]
+                    if writer is not None:
+                        if not writer.write(valid_chunk, valid_mask[valid_mask]):
+                            raise OSError("列式缓存写入失败")
+                    else:
+                        frames.append(valid_chunk)
+            except UnicodeDecodeError:
+                logger.debug(f"尝试 {encoding} 编码失败")
+                if writer is not None:
+                    writer.abort()
+                continue
+            except Exception as e:
+                error_msg = f"使用 {encoding} 编码分块加载失败: {str(e)}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+                if writer is not None:
+                    writer.abort()
+                continue
+            break
+        else:
+            return DataLoadResult(
+                success=False,
+                total_records=0,
+                valid_records=0,
+                encoding_used="",
+                errors=errors if errors else ["无法使用任何编码方式读取文件"],
+                load_time=time.time() - start_time,
+            )
+
+        self._encoding_cache[self._file_fingerprint(csv_path)] = encoding
+        self.encoding_used = encoding
+
+        if missing_columns:
+            if writer is not None:
+                writer.abort()
+            return DataLoadResult(
+                success=False,
+                total_records=0,
+                valid_records=0,
+                encoding_used=encoding,
+                errors=[f"缺少必需列: {', '.join(missing_columns)}"],
+                load_time=time.time() - start_time,
+            )
+
+        warnings = []
+        if removed_rows > 0:
+            warnings.append(f"移除了 {removed_rows} 个完全空的行")
+        invalid_rows = total_rows - valid_rows
+        if invalid_rows > 0:
+            warnings.append(f"发现 {invalid_rows} 条不完整的记录（缺少必需字段），已在分块读取时丢弃")
+
+        if writer is not None and valid_rows > 0:
+            meta = {
+                "encoding": encoding,
+                "clean_warnings": warnings,
+                "total_records": total_rows,
+                "validation": {"valid_records": valid_rows, "errors": [], "warnings": []},
+            }
+            if writer.commit(meta):
+                opened = self.store.open_table(csv_path, layout, columns)
+                if opened is not None:
+                    self._table = opened[0]
+        elif writer is not None:
+            writer.abort()
+
+        memory_report = {}
+        if self._table is None:
+            frames = frames or [pd.DataFrame(columns=self.REQUIRED_COLUMNS)]
+            df = pd.concat(frames, ignore_index=True)
+            if columns is not None:
+                df = df[[col for col in columns if col in df.columns]]
+            if self.config.compact_dtypes:
+                df, memory_report = self._compact_dtypes(df)
+            self._set_data(df, pd.Series(True, index=df.index))
+            result_columns = list(df.columns)
+        else:
+            result_columns = self._table_columns()
+
+        load_time = time.time() - start_time
+        logger.info(
+            f"分块加载完成: {chunk_count} 块, {total_rows} 行, 有效 {valid_rows} 行, 耗时 {load_time:.2f}秒"
+        )
+
+        return DataLoadResult(
+            success=valid_rows > 0,
+            total_records=total_rows,
+            valid_records=valid_rows,
+            encoding_used=encoding,
+            columns=result_columns,
+            errors=[] if valid_rows > 0 else ["没有有效记录"],
+            warnings=warnings,
+            load_time=load_time,
+            memory_report=memory_report,
+        )
+
+    def _reset(self):
+        self.data_version += 1
+        self.source_fingerprint = None
+        self.df = None
+        self._table = None
+        self._valid_positions = None
+        self._valid_view = None
+
+    def _set_data(self, df: pd.DataFrame, valid_mask: pd.Series):
+        """保存数据，并一次性计算有效行位置"""
+        self.df = df
+        self._valid_positions = np.flatnonzero(valid_mask.to_numpy(dtype=bool))
+        self._valid_view = None
+
+    def _table_columns(self) -> List[str]:
+        return [name for name in self._table.column_names if name != ColumnarStore.VALID_COLUMN]
+
+    def _materialize(self):
+        """把内存映射的列式表转换为 DataFrame（大数据集会占用大量内存）"""
+        if self.df is not None or self._table is None:
+            return
+        logger.warning("正在把列式缓存整体转换为 DataFrame，大数据集请改用 iter_records")
+        df = self._table.to_pandas()
+        valid_mask = df.pop(ColumnarStore.VALID_COLUMN).astype(bool)
+        self._set_data(df, valid_mask)
+
+    def _encodings_to_try(self, csv_path: Path) -> List[str]:
+        """按优先级排列的编码，探测到的编码排在最前"""
+        # 确定要尝试的编码列表
+        if self.config.encoding == "auto":
+            encodings_to_try = self.SUPPORTED_ENCODINGS
+        else:
+            encodings_to_try = [self.config.encoding] + [
+                enc for enc in self.SUPPORTED_ENCODINGS if enc != self.config.encoding
+            ]
+
+        # 先在字节样本上探测编码，正常情况下只需解析一次
+        detected = self._detect_encoding(csv_path, encodings_to_try)
+        if detected:
+            encodings_to_try = [detected] + [
+                enc for enc in encodings_to_try if enc != detected
+            ]
+        return encodings_to_try
+
+    def detect_encoding(self, file_path: str) -> str:
+        """探测文件编码"""
+        return self._encodings_to_try(Path(file_path))[0]
+
+    def iter_valid_chunks(
+        self, file_path: str, chunksize: int, encoding: Optional[str] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        逐块读取并清洗 CSV，只产出有效行
+
+        供 SQLite 等外部存储导入使用，不在加载器中保留数据。
+
+        Args:
+            file_path: CSV文件路径
+            chunksize: 每块的行数
+            encoding: 文件编码，None 时自动探测
+
+        Yields:
+            清洗后的有效行
+
+        Raises:
+            ValueError: 缺少必需列
+        """
+        csv_path = Path(file_path)
+        encoding = encoding or self.detect_encoding(file_path)
+        self.encoding_used = encoding
+        reader = pd.read_csv(
+            csv_path,
+            encoding=encoding,
+            dtype=self.config.chunk_dtypes or str,
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            chunk, _ = self._clean_data(chunk, drop_empty_columns=False)
+            missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in chunk.columns]
+            if missing_columns:
+                raise ValueError(f"缺少必需列: {', '.join(missing_columns)}")
+            yield chunk[self._compute_valid_mask(chunk)]
+
+    @staticmethod
+    def _file_fingerprint(csv_path: Path) -> Tuple[str, int, int]:
+        stat = csv_path.stat()
+        return (str(csv_path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    def _detect_encoding(self, csv_path: Path, candidates: List[str]) -> Optional[str]:
+        """
+        在字节样本上探测文件编码
+
+        先检查 BOM，再对文件开头的样本按候选顺序做严格解码。
+        latin1 能解码任何字节，只有其他编码都失败时才使用。
+        结果按文件指纹缓存，文件不变时不再探测。
+
+        Args:
+            csv_path: CSV文件路径
+            candidates: 按优先级排列的候选编码
+
+        Returns:
+            探测到的编码，无法确定时返回None
+        """
+        fingerprint = self._file_fingerprint(csv_path)
+        cached = self._encoding_cache.get(fingerprint)
+        if cached:
+            logger.debug(f"使用缓存的编码: {cached}")
+            return cached
+
+        with open(csv_path, "rb") as f:
+            sample = f.read(self.ENCODING_SAMPLE_BYTES)
+        truncated = len(sample) == self.ENCODING_SAMPLE_BYTES
+
+        if sample.startswith(codecs.BOM_UTF8):
+            logger.info("检测到 UTF-8 BOM")
+            return "utf-8-sig"
+
+        strict = [enc for enc in candidates if enc not in self.FALLBACK_ENCODINGS]
+        fallback = [enc for enc in candidates if enc in self.FALLBACK_ENCODINGS]
+
+        for encoding in strict:
+            # 增量解码器允许样本末尾截断的多字节字符
+            decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+            try:
+                decoder.decode(sample, final=not truncated)
+            except UnicodeDecodeError:
+                logger.debug(f"样本无法用 {encoding} 解码")
+                continue
+            logger.info(f"探测到文件编码: {encoding}")
+            return encoding
+
+        if fallback:
+            logger.warning(f"样本无法用 {', '.join(strict)} 解码，回退到 {fallback[0]}")
+            return fallback[0]
+        return None
+
+    def _cache_layout(self, chunked: bool, columns: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        列式缓存布局
+
+        完整加载缓存全部列（按列选择在读取时进行），分块加载的内容取决于读取的列和列类型，
+        两种方式写入不同的缓存，互不覆盖。
+        """
+        if not chunked:
+            return {"mode": "full", "compact_dtypes": self.config.compact_dtypes}
+        return {
+            "mode": "chunked",
+            "dtypes": self.config.chunk_dtypes or "str",
+            "usecols": (
+                sorted(set(columns) | set(self.REQUIRED_COLUMNS)) if columns is not None else None
+            ),
+        }
+
+    def _load_from_cache(
+        self,
+        csv_path: Path,
+        layout: Dict[str, Any],
+        columns: Optional[List[str]],
+        start_time: float,
+        lazy: bool = False,
+    ) -> Optional[DataLoadResult]:
+        """
+        从列式缓存加载数据
+
+        Args:
+            layout: 缓存布局，与写入时不一致的缓存不使用
+            lazy: 只内存映射打开，不转换为 DataFrame（分块模式）
+
+        Returns:
+            DataLoadResult，缓存不可用时返回None
+        """
+        if self.store is None:
+            return None
+
+        opened = self.store.open_table(csv_path, layout, columns)
+        if opened is None:
+            return None
+
+        table, meta = opened
+        if lazy:
+            self._table = table
+            result_columns = self._table_columns()
+        else:
+            df = table.to_pandas()
+            valid_mask = df.pop(ColumnarStore.VALID_COLUMN).astype(bool)
+            self._set_data(df, valid_mask)
+            result_columns = list(df.columns)
+        self.encoding_used = meta.get("encoding")
+
+        validation = meta.get("validation", {})
+        load_time = time.time() - start_time
+        logger.info(
+            f"✅ 从列式缓存加载数据: {table.num_rows} 行 × {len(result_columns)} 列, 耗时 {load_time:.2f}秒"
+        )
+
+        return DataLoadResult(
+            success=not validation.get("errors") and validation.get("valid_records", 0) > 0,
+            total_records=meta.get("total_records", table.num_rows),
+            valid_records=validation.get("valid_records", 0),
+            encoding_used=self.encoding_used or "",
+            columns=result_columns,
+            errors=validation.get("errors", []),
+            warnings=meta.get("clean_warnings", []) + validation.get("warnings", []),
+            load_time=load_time,
+            memory_report=meta.get("memory_report", {}),
+        )
+
+    def _compute_valid_mask(self, df: pd.DataFrame) -> pd.Series:
+        """必需字段都不为空的行"""
+        if any(col not in df.columns for col in self.REQUIRED_COLUMNS):
+            return pd.Series(False, index=df.index)
+        return df[self.REQUIRED_COLUMNS].notna().all(axis=1)
+
+    def _clean_data(
+        self, df: pd.DataFrame, drop_empty_columns: bool = True
+    ) -> tuple[pd.DataFrame, List[str]]:
         """
         清洗数据
 
         Args:
             df: 原始DataFrame
+            drop_empty_columns: 是否移除完全空的列（分块读取时单个数据块不能决定）
 
         Returns:
             (清洗后的DataFrame, 警告信息列表)
@@ -162,10 +626,11 @@ class DataLoader:
             warnings.append(f"移除了 {removed_rows} 个完全空的行")
 
         # 移除完全空的列
-        df = df.dropna(axis=1, how="all")
-        removed_cols = original_cols - len(df.columns)
-        if removed_cols > 0:
-            warnings.append(f"移除了 {removed_cols} 个完全空的列")
+        if drop_empty_columns:
+            df = df.dropna(axis=1, how="all")
+            removed_cols = original_cols - len(df.columns)
+            if removed_cols > 0:
+                warnings.append(f"移除了 {removed_cols} 个完全空的列")
 
         # 标准化列名（去除首尾空格）
         df.columns = [col.strip() for col in df.columns]
@@ -173,16 +638,90 @@ class DataLoader:
         # 重置索引
         df = df.reset_index(drop=True)
 
-        logger.info(f"数据清洗完成: {len(df)} 行 × {len(df.columns)} 列")
+        logger.debug(f"数据清洗完成: {len(df)} 行 × {len(df.columns)} 列")
 
         return df, warnings
 
-    def _validate_data(self, df: pd.DataFrame) -> ValidationResult:
+    def _compact_dtypes(
+        self, df: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, Dict[str, Dict[str, object]]]:
+        """
+        把各列转换为更省内存的类型
+
+        - 重复值多的文本列（岗位、面试结果等）转为分类类型
+        - 其他文本列转为 Arrow 字符串（需要 pyarrow，否则保持不变）
+        - 取值都是整数的数值列（如聪明度要求）转为最小的可空整数类型
+
+        Args:
+            df: 清洗后的DataFrame
+
+        Returns:
+            (转换后的DataFrame, {列名: {"dtype", "before", "after"}}，内存单位为字节)
+        """
+        before = df.memory_usage(deep=True, index=False)
+
+        converted = {}
+        for col in df.columns:
+            compact = self._compact_series(df[col])
+            if compact is not None:
+                converted[col] = compact
+        if converted:
+            df = df.assign(**converted)
+
+        after = df.memory_usage(deep=True, index=False)
+        report = {
+            col: {
+                "dtype": str(df[col].dtype),
+                "before": int(before[col]),
+                "after": int(after[col]),
+            }
+            for col in df.columns
+        }
+
+        total_before = int(before.sum())
+        total_after = int(after.sum())
+        logger.info(
+            f"列类型压缩: {total_before / 1024 / 1024:.1f}MB -> {total_after / 1024 / 1024:.1f}MB"
+        )
+        return df, report
+
+    def _compact_series(self, series: pd.Series) -> Optional[pd.Series]:
+        """单列的紧凑类型，无需转换时返回None"""
+        non_null = series.dropna()
+        if non_null.empty:
+            return None
+
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return None
+
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            if not (non_null % 1 == 0).all():
+                return None
+            smallest = pd.to_numeric(non_null, downcast="integer").dtype
+            if not pd.api.types.is_integer_dtype(smallest):
+                return None
+            # int8 -> Int8 等可空整数类型
+            return series.astype(smallest.name.capitalize())
+
+        if series.dtype == object:
+            if pd.api.types.infer_dtype(non_null, skipna=True) != "string":
+                return None
+            if non_null.nunique() <= len(non_null) * self.CATEGORY_MAX_UNIQUE_RATIO:
+                return series.astype("category")
+            if HAS_PYARROW:
+                return series.astype("string[pyarrow]")
+
+        return None
+
+    def _validate_data(
+        self, df: pd.DataFrame, valid_mask: Optional[pd.Series] = None
+    ) -> ValidationResult:
         """
         验证数据完整性
 
         Args:
             df: 要验证的DataFrame
+            valid_mask: 已计算好的有效行标记，None 时重新计算
 
         Returns:
             ValidationResult: 验证结果
@@ -208,8 +747,9 @@ class DataLoader:
             )
 
         # 检查有效记录数（必需字段都不为空）
-        valid_mask = df[self.REQUIRED_COLUMNS].notna().all(axis=1)
-        valid_records = valid_mask.sum()
+        if valid_mask is None:
+            valid_mask = self._compute_valid_mask(df)
+        valid_records = int(valid_mask.sum())
         invalid_records = len(df) - valid_records
 
         if invalid_records > 0:
@@ -236,52 +776,190 @@ class DataLoader:
         """
         获取有效数据（必需字段都不为空的记录）
 
+        返回加载后缓存的视图，多次调用不会重复筛选或复制。
+        视图与加载器共享，调用方只能读取，需要修改时请自行 copy()。
+
         Returns:
             包含有效记录的DataFrame
         """
+        self._materialize()
         if self.df is None:
             return pd.DataFrame()
 
-        # 筛选有效数据
-        valid_mask = self.df[self.REQUIRED_COLUMNS].notna().all(axis=1)
-        return self.df[valid_mask].copy()
+        if self._valid_view is None:
+            if len(self._valid_positions) == len(self.df):
+                # 全部有效时直接复用原 DataFrame
+                self._valid_view = self.df
+            else:
+                self._valid_view = self.df.take(self._valid_positions)
+        return self._valid_view
 
-    def get_records(self, record_ids: Optional[List[int]] = None) -> List[Record]:
+    def dataset_fingerprint(self) -> Optional[Tuple]:
+        """
+        当前有效数据的指纹
+
+        由数据源文件指纹、加载的列和有效记录数组成，用于缓存派生结果（如统计指标）。
+
+        Returns:
+            指纹元组，数据未加载时返回None
+        """
+        if self.source_fingerprint is None:
+            return None
+        if self.df is not None:
+            columns = tuple(self.df.columns)
+        elif self._table is not None:
+            columns = tuple(self._table_columns())
+        else:
+            return None
+        return (self.source_fingerprint, columns, self.valid_count())
+
+    def valid_count(self) -> int:
+        """有效记录数，不创建有效数据视图，分块模式下也不物化 DataFrame"""
+        if self.df is None and self._table is not None:
+            return len(self._get_valid_positions())
+        if self._valid_positions is None:
+            return 0
+        return len(self._valid_positions)
+
+    def _get_valid_positions(self):
+        if self._valid_positions is None:
+            self._valid_positions = valid_row_positions(self._table)
+        return self._valid_positions
+
+    def iter_records(self, batch_size: int = 1000) -> Iterator[RecordLike]:
         """
-        获取Record对象列表
+        逐条迭代有效记录
+
+        分块模式下按批次从内存映射的列式表读取，一次只物化一个批次。
+        记录ID为该记录在有效数据中的位置，与 get_records(record_ids) 一致。
+
+        Args:
+            batch_size: 每批转换的行数
+
+        Yields:
+            RecordView对象
+        """
+        record_id = 0
+        for valid_frame in self.iter_valid_frames(batch_size=batch_size):
+            ids = range(record_id, record_id + len(valid_frame))
+            yield from RecordView.from_frame(valid_frame, ids)
+            record_id += len(valid_frame)
+
+    def iter_valid_frames(
+        self, columns: Optional[List[str]] = None, batch_size: int = 1000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        按批次迭代有效数据
+
+        分块模式下从内存映射的列式表中只读取需要的列，一次只物化一个批次，不转换整个表。
+
+        Args:
+            columns: 需要的列，None 表示全部
+            batch_size: 每批的行数
+
+        Yields:
+            有效行组成的 DataFrame，按有效数据中的顺序
+        """
+        if self.df is None and self._table is not None:
+            table = self._table
+            if columns is not None:
+                table = table.select(
+                    [col for col in columns if col in table.column_names]
+                    + [ColumnarStore.VALID_COLUMN]
+                )
+            for frame in iter_frames(table, batch_size):
+                valid_mask = frame.pop(ColumnarStore.VALID_COLUMN).astype(bool)
+                yield frame[valid_mask]
+            return
+
+        valid_df = self.get_valid_data()
+        if columns is not None:
+            valid_df = valid_df[[col for col in columns if col in valid_df.columns]]
+        for start in range(0, len(valid_df), batch_size):
+            yield valid_df.iloc[start : start + batch_size]
+
+    def get_columns(self) -> List[str]:
+        """已加载的列，分块模式下不物化 DataFrame"""
+        if self.df is not None:
+            return list(self.df.columns)
+        if self._table is not None:
+            return self._table_columns()
+        return []
+
+    def valid_labels(self, positions: List[int]) -> np.ndarray:
+        """valid_positions_of 的逆运算：有效数据中的位置 -> query() 返回的记录ID（行标签）"""
+        if self.df is None and self._table is not None:
+            valid_positions = self._get_valid_positions()
+        else:
+            valid_positions = self._valid_positions
+        return valid_positions[np.asarray(positions, dtype=np.int64)]
+
+    def valid_positions_of(self, labels: List[int]) -> np.ndarray:
+        """
+        把 query() 返回的记录ID（行标签）转换为在有效数据中的位置
+
+        Returns:
+            位置数组，不是有效记录的标签对应 -1
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        if self.df is None and self._table is not None:
+            positions = self._get_valid_positions()
+        else:
+            positions = self._valid_positions
+        if positions is None or len(positions) == 0:
+            return np.full(len(labels), -1, dtype=np.int64)
+        # 行标签即行号（清洗和读取缓存时都会重置索引），有效行位置升序
+        found = np.minimum(np.searchsorted(positions, labels), len(positions) - 1)
+        return np.where(positions[found] == labels, found, -1)
+
+    def get_records(self, record_ids: Optional[List[int]] = None) -> List[RecordLike]:
+        """
+        获取记录列表
+
+        返回共享列数组的 RecordView，不逐行复制数据。
 
         Args:
             record_ids: 要获取的记录ID列表，如果为None则返回所有有效记录
 
         Returns:
-            Record对象列表
+            RecordView对象列表
         """
+        if self.df is None and self._table is not None:
+            if record_ids is None:
+                return list(self.iter_records())
+            positions = self._get_valid_positions()
+            wanted = []
+            for record_id in record_ids:
+                if 0 <= record_id < len(positions):
+                    wanted.append(record_id)
+                else:
+                    logger.warning(f"记录ID {record_id} 超出范围")
+            if not wanted:
+                return []
+            return RecordView.from_frame(take_rows(self._table, positions[wanted]), wanted)
+
         valid_df = self.get_valid_data()
 
         if valid_df.empty:
             return []
 
-        records = []
-
         if record_ids is None:
             # 返回所有有效记录
-            for idx, row in valid_df.iterrows():
-                record = Record.from_dataframe_row(idx, row.to_dict())
-                records.append(record)
-        else:
-            # 返回指定ID的记录
-            for record_id in record_ids:
-                if record_id < len(valid_df):
-                    row = valid_df.iloc[record_id]
-                    record = Record.from_dataframe_row(record_id, row.to_dict())
-                    records.append(record)
-                else:
-                    logger.warning(f"记录ID {record_id} 超出范围")
+            return RecordView.from_frame(valid_df)
 
-        return records
+        # 返回指定ID的记录
+        wanted = []
+        for record_id in record_ids:
+            if record_id < len(valid_df):
+                wanted.append(record_id)
+            else:
+                logger.warning(f"记录ID {record_id} 超出范围")
+
+        return RecordView.from_frame(valid_df.iloc[wanted], wanted)
 
     def get_dataframe(self) -> Optional[pd.DataFrame]:
         """获取原始DataFrame"""
+        self._materialize()
         return self.df
 
     def get_summary(self) -> dict:
@@ -291,15 +969,16 @@ class DataLoader:
         Returns:
             包含摘要信息的字典
         """
+        self._materialize()
         if self.df is None:
             return {"error": "数据未加载"}
 
-        valid_df = self.get_valid_data()
+        valid_count = self.valid_count()
 
         summary = {
             "total_records": len(self.df),
-            "valid_records": len(valid_df),
-            "invalid_records": len(self.df) - len(valid_df),
+            "valid_records": valid_count,
+            "invalid_records": len(self.df) - valid_count,
             "total_columns": len(self.df.columns),
             "columns": list(self.df.columns),
             "encoding_used": self.encoding_used,
@@ -7,10 +7,12 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import logging
-from typing import Dict, Optional
+from typing import Dict, Hashable, Optional
 import re
 
-from manager.models import StatisticsResult, SearchQuery, QueryResult, Record
+from manager.models import StatisticsResult, SearchQuery, QueryResult, RecordView
+from manager.search_index import SearchIndex
+from manager.statistics_engine import StatisticsEngine
 
 logger = logging.getLogger(__name__)
 
@@ -35,130 +37,103 @@ class DataProcessor:
         """初始化数据处理器"""
         pass
 
-    def analyze_positions(self, df: pd.DataFrame) -> StatisticsResult:
+    def analyze_positions(
+        self, df: pd.DataFrame, fingerprint: Optional[Hashable] = None
+    ) -> StatisticsResult:
         """
         分析岗位分布
 
         Args:
             df: 数据DataFrame
+            fingerprint: 数据集指纹，提供时复用同一数据集已计算的统计结果
 
         Returns:
             StatisticsResult: 分析结果
         """
         try:
-            # 寻找包含岗位信息的列
-            job_cols = [col for col in df.columns if "Job Title" in col]
-
-            if not job_cols:
-                logger.warning("未找到岗位信息列")
-                return StatisticsResult(metrics={}, summary="未找到岗位信息")
-
-            job_col = job_cols[0]
-            logger.info(f"使用列 '{job_col}' 进行岗位分析")
-
-            # 基本统计
-            job_counts = df[job_col].value_counts()
-
-            metrics = {
-                "job_distribution": job_counts.to_dict(),
-                "total_job": len(job_counts),
-                "total_candidates": int(job_counts.sum()),
-            }
-
-            # 如果有聪明度要求列
-            intelligence_cols = [col for col in df.columns if "Intelligence" in col]
-            if intelligence_cols:
-                intelligence_col = intelligence_cols[0]
-                avg_intelligence = (
-                    df.groupby(job_col)[intelligence_col].agg(["mean", "std"]).round(2)
-                )
-                metrics["average_intelligence"] = avg_intelligence.to_dict()
-
-            # 如果有面试结果列
-            result_cols = [col for col in df.columns if "Result" in col]
-            if result_cols:
-                pass_rates = {}
-                for result_col in result_cols[:3]:  # 最多处理3个结果列
-                    pass_count = df.groupby(job_col)[result_col].apply(
-                        lambda x: x.astype(str).str.contains("通过", na=False).sum()
-                    )
-                    total_count = df.groupby(job_col).size()
-                    pass_rate = (pass_count / total_count * 100).round(1)
-                    pass_rates[result_col] = pass_rate.to_dict()
-
-                metrics["pass_rates"] = pass_rates
-
-            # 生成摘要
-            summary = self._generate_position_summary(metrics)
-
-            return StatisticsResult(metrics=metrics, summary=summary)
+            metrics = StatisticsEngine.compute(df, fingerprint)["positions"]
+            return self.position_result(metrics)
 
         except Exception as e:
             logger.error(f"岗位分析失败: {e}")
             return StatisticsResult(metrics={}, summary=f"分析失败: {str(e)}")
 
-    def analyze_interview_results(self, df: pd.DataFrame) -> StatisticsResult:
+    def analyze_interview_results(
+        self, df: pd.DataFrame, fingerprint: Optional[Hashable] = None
+    ) -> StatisticsResult:
         """
         分析面试结果
 
         Args:
             df: 数据DataFrame
+            fingerprint: 数据集指纹，提供时复用同一数据集已计算的统计结果
 
         Returns:
             StatisticsResult: 分析结果
         """
         try:
-            metrics = {}
+            metrics = StatisticsEngine.compute(df, fingerprint)["interview_results"]
+            return self.interview_result(metrics)
 
-            # 寻找面试结果相关列
-            result_cols = [col for col in df.columns if "Result" in col]
+        except Exception as e:
+            logger.error(f"面试结果分析失败: {e}")
+            return StatisticsResult(metrics={}, summary=f"分析失败: {str(e)}")
 
-            for i, col in enumerate(result_cols[:3]):  # 最多分析3轮面试
-                round_name = f"第{i + 1}轮面试" if i < 3 else col
+    def position_result(self, metrics: Optional[Dict]) -> StatisticsResult:
+        """
+        由岗位统计指标生成分析结果
 
-                if col in df.columns:
-                    col_results = df[col].astype(str).value_counts()
-                    total = len(df[col].dropna())
-                    pass_count = (
-                        df[col].astype(str).str.contains("通过", na=False).sum()
-                    )
+        Args:
+            metrics: 岗位统计指标，None 表示没有岗位列
 
-                    metrics[round_name] = {
-                        "统计": {str(k): int(v) for k, v in dict(col_results).items()},
-                        "通过率": f"{(pass_count / total * 100):.1f}%"
-                        if total > 0
-                        else "0%",
-                        "总人数": int(total),
-                    }
+        Returns:
+            StatisticsResult: 分析结果
+        """
+        if metrics is None:
+            logger.warning("未找到岗位信息列")
+            return StatisticsResult(metrics={}, summary="未找到岗位信息")
 
-            summary = self._generate_interview_summary(metrics)
+        # 生成摘要
+        summary = self._generate_position_summary(metrics)
 
-            return StatisticsResult(metrics=metrics, summary=summary)
+        return StatisticsResult(metrics=metrics, summary=summary)
 
-        except Exception as e:
-            logger.error(f"面试结果分析失败: {e}")
-            return StatisticsResult(metrics={}, summary=f"分析失败: {str(e)}")
+    def interview_result(self, metrics: Dict) -> StatisticsResult:
+        """由各轮面试结果指标生成分析结果"""
+        summary = self._generate_interview_summary(metrics)
+
+        return StatisticsResult(metrics=metrics, summary=summary)
 
-    def search_candidates(self, df: pd.DataFrame, query: SearchQuery) -> QueryResult:
+    def search_candidates(
+        self,
+        df: pd.DataFrame,
+        query: SearchQuery,
+        index: Optional[SearchIndex] = None,
+    ) -> QueryResult:
         """
         搜索候选人
 
         Args:
             df: 数据DataFrame
             query: 搜索查询参数
+            index: 按 df 行顺序建立的倒排索引，提供且覆盖搜索字段时按相关度排序返回，
+                否则逐行扫描
 
         Returns:
             QueryResult: 查询结果
         """
         try:
-            # 应用过滤条件
-            filtered_df = df.copy()
+            filtered_df = df
 
             # 关键词搜索
-            if query.keyword:
+            index_fields = index.resolve_fields(query.fields) if index is not None else None
+            if query.keyword and index_fields is not None:
+                hits = index.search(query.keyword, index_fields)
+                filtered_df = filtered_df.iloc[[doc_id for doc_id, _ in hits]]
+            elif query.keyword:
                 if query.fields:
                     # 在指定字段中搜索
-                    mask = pd.Series([False] * len(filtered_df))
+                    mask = pd.Series(False, index=filtered_df.index)
                     for field in query.fields:
                         if field in filtered_df.columns:
                             mask |= (
@@ -169,8 +144,11 @@ class DataProcessor:
                     filtered_df = filtered_df[mask]
                 else:
                     # 在所有文本列中搜索
-                    mask = pd.Series([False] * len(filtered_df))
-                    for col in filtered_df.select_dtypes(include=["object"]).columns:
+                    mask = pd.Series(False, index=filtered_df.index)
+                    text_columns = filtered_df.select_dtypes(
+                        include=["object", "string", "category"]
+                    ).columns
+                    for col in text_columns:
                         mask |= (
                             filtered_df[col]
                             .astype(str)
@@ -193,11 +171,8 @@ class DataProcessor:
 
             paginated_df = filtered_df.iloc[start_idx:end_idx]
 
-            # 转换为Record对象
-            records = []
-            for idx, row in paginated_df.iterrows():
-                record = Record.from_dataframe_row(idx, row.to_dict())
-                records.append(record)
+            # 转换为共享列数组的记录视图
+            records = RecordView.from_frame(paginated_df)
 
             return QueryResult(
                 records=records,
@@ -0,0 +1,281 @@
+"""
+近似去重模块
+
+对简历和面试对话文本计算 MinHash 签名，用 LSH 分桶找出候选记录对，
+再按签名估计的 Jaccard 相似度确认，把近似重复的记录聚成簇。
+同一个簇只需要提取/评估一条记录，省下重复的模型调用。
+文本逐条计算签名，不需要一次放进内存；签名可以缓存到文件，数据源不变时直接复用。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from manager.models import RECORD_TEXT_COLUMNS, DuplicateClusters
+
+logger = logging.getLogger(__name__)
+
+# 比较时忽略空白，避免重新导出带来的换行/缩进差异
+_WHITESPACE = re.compile(r"\s+")
+
+# 小于 2^32 的最大素数，shingle 哈希和 a 都小于 2^32，乘积不会溢出 uint64
+_PRIME = np.uint64(4294967291)
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHINGLE_BASE = np.uint64(1000003)
+
+
+class MinHashSignatures(NamedTuple):
+    """一组记录的 MinHash 签名"""
+
+    matrix: np.ndarray  # (非空记录数, NUM_PERM)
+    record_ids: np.ndarray  # 每行签名对应的记录ID（空文本的记录没有签名）
+    total: int  # 参与检测的记录数（含空文本）
+
+
+def dedup_text_columns(columns: Sequence[str], configured: Optional[List[str]] = None) -> List[str]:
+    """
+    参与比较的文本列
+
+    Args:
+        columns: 数据中的列
+        configured: 配置的列，None 表示简历和各轮面试对话
+
+    Returns:
+        数据中存在的列
+    """
+    if configured is not None:
+        return [col for col in configured if col in columns]
+    resume = RECORD_TEXT_COLUMNS["resume"]
+    return [col for col in columns if col == resume or "Interview Dialogue" in col]
+
+
+def frame_texts(df: pd.DataFrame, columns: List[str]) -> List[str]:
+    """把每行的若干文本列拼接为一段文本"""
+    if not columns:
+        return [""] * len(df)
+    parts = [df[col].astype("string").fillna("").to_numpy(dtype=object) for col in columns]
+    return ["\n".join(values) for values in zip(*parts)]
+
+
+class NearDuplicateDetector:
+    """
+    MinHash/LSH 近似重复检测器
+
+    功能:
+    - 文本去掉空白后按字符切分为 shingle（中文文本没有单词边界），计算 MinHash 签名
+    - 签名分为若干 band，任意 band 完全相同的记录成为候选对
+    - 候选对的签名一致比例（Jaccard 相似度估计）不低于阈值时归入同一簇
+    """
+
+    NUM_PERM = 64  # 签名长度（哈希函数个数）
+    BANDS = 16  # LSH band 数，每个 band 4 行，相似度约 0.5 以上的记录大概率成为候选
+    SHINGLE_SIZE = 5  # 每个 shingle 的字符数
+
+    def __init__(self, threshold: float = 0.9, seed: int = 1):
+        """
+        初始化检测器
+
+        Args:
+            threshold: 估计的 Jaccard 相似度不低于该值视为重复
+            seed: 哈希函数的随机种子，固定后结果可复现
+        """
+        self.threshold = threshold
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 31, size=self.NUM_PERM, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=self.NUM_PERM, dtype=np.uint64)
+        self._rows = self.NUM_PERM // self.BANDS
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """文本的 shingle 哈希（32 位，去重后）"""
+        normalized = _WHITESPACE.sub("", text.lower())
+        if not normalized:
+            return np.empty(0, dtype=np.uint64)
+
+        codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        k = min(self.SHINGLE_SIZE, len(codes))
+        count = len(codes) - k + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(k):
+            hashes = (hashes * _SHINGLE_BASE + codes[offset : offset + count]) & _MASK32
+        return np.unique(hashes)
+
+    @property
+    def signature_key(self) -> str:
+        """签名参数，参数变化时缓存的签名失效（阈值只影响聚类，不影响签名）"""
+        return f"minhash:{self.NUM_PERM}:{self.SHINGLE_SIZE}:{self.seed}"
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        计算 MinHash 签名
+
+        Returns:
+            长度为 NUM_PERM 的签名，空文本返回None（不参与去重）
+        """
+        shingles = self._shingles(text)
+        if len(shingles) == 0:
+            return None
+        permuted = (self._a[:, None] * shingles[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def signatures(
+        self, texts: Iterable[str], record_ids: Optional[Iterable[int]] = None
+    ) -> MinHashSignatures:
+        """
+        逐条计算签名
+
+        Args:
+            texts: 每条记录的文本，可以是生成器
+            record_ids: 记录ID，None 表示按顺序编号 0, 1, 2...
+
+        Returns:
+            MinHashSignatures
+        """
+        ids = iter(record_ids) if record_ids is not None else None
+        rows = []
+        signed_ids = []
+        total = 0
+        for i, text in enumerate(texts):
+            total += 1
+            record_id = next(ids) if ids is not None else i
+            signature = self.signature(text if isinstance(text, str) else "")
+            if signature is not None:
+                rows.append(signature)
+                signed_ids.append(record_id)
+
+        matrix = np.vstack(rows) if rows else np.empty((0, self.NUM_PERM), dtype=np.uint64)
+        return MinHashSignatures(matrix, np.asarray(signed_ids, dtype=np.int64), total)
+
+    def cluster(
+        self, texts: Iterable[str], record_ids: Optional[Sequence[int]] = None
+    ) -> DuplicateClusters:
+        """
+        聚类近似重复的记录
+
+        Args:
+            texts: 每条记录的文本
+            record_ids: 记录ID，None 表示按顺序编号 0, 1, 2...
+
+        Returns:
+            DuplicateClusters
+        """
+        return self.cluster_signatures(self.signatures(texts, record_ids))
+
+    def cluster_signatures(self, signatures: MinHashSignatures) -> DuplicateClusters:
+        """
+        按已计算的签名聚类
+
+        Args:
+            signatures: signatures() 的结果（或从缓存读取的签名）
+
+        Returns:
+            DuplicateClusters
+        """
+        total = signatures.total
+        if len(signatures.matrix) < 2:
+            return DuplicateClusters(total_records=total, threshold=self.threshold)
+
+        matrix = signatures.matrix
+        parent = np.arange(len(matrix))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.BANDS):
+            columns = np.ascontiguousarray(matrix[:, band * self._rows : (band + 1) * self._rows])
+            keys = columns.view(np.dtype((np.void, columns.dtype.itemsize * self._rows))).ravel()
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            shared = np.flatnonzero(counts[inverse] > 1)
+            if len(shared) == 0:
+                continue
+
+            # 同一个桶内的记录与桶内第一条记录比较，完全重复的大簇也只需线性次比较
+            order = shared[np.argsort(inverse[shared], kind="stable")]
+            buckets = inverse[order]
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            firsts = np.repeat(order[starts], np.diff(np.r_[starts, len(order)]))
+            pairs = firsts != order
+            left, right = firsts[pairs], order[pairs]
+            similarity = (matrix[left] == matrix[right]).mean(axis=1)
+            for i, j in zip(left[similarity >= self.threshold], right[similarity >= self.threshold]):
+                root_i, root_j = find(int(i)), find(int(j))
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups = {}
+        for i in range(len(matrix)):
+            groups.setdefault(find(i), []).append(int(signatures.record_ids[i]))
+        clusters = sorted(
+            (sorted(members) for members in groups.values() if len(members) > 1),
+            key=lambda members: members[0],
+        )
+
+        result = DuplicateClusters(clusters=clusters, total_records=total, threshold=self.threshold)
+        logger.info(
+            f"近似去重: {total} 条记录中发现 {len(clusters)} 个重复簇，"
+            f"可跳过 {result.duplicate_count} 条"
+        )
+        return result
+
+
+class SignatureStore:
+    """
+    MinHash 签名缓存
+
+    保存在列式缓存目录或 SQLite 数据库旁边，键由数据源指纹、比较的列和签名参数组成，
+    数据源不变时重新打开数据不必再读取全部文本。
+    """
+
+    def __init__(self, path: Path):
+        """
+        初始化
+
+        Args:
+            path: 缓存文件路径（.npz）
+        """
+        self.path = Path(path)
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        payload = json.dumps(parts, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[MinHashSignatures]:
+        """读取签名，文件不存在或键不一致时返回None"""
+        if not self.path.exists():
+            return None
+        try:
+            with np.load(self.path) as data:
+                if str(data["key"]) != key:
+                    return None
+                return MinHashSignatures(data["matrix"], data["record_ids"], int(data["total"]))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"签名缓存读取失败，将重新计算: {e}")
+            return None
+
+    def save(self, key: str, signatures: MinHashSignatures):
+        """保存签名（原子写入）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    key=np.array(key),
+                    matrix=signatures.matrix,
+                    record_ids=signatures.record_ids,
+                    total=np.array(signatures.total),
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"签名缓存写入失败: {e}")
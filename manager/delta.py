@@ -0,0 +1,232 @@
+"""
+增量处理模块
+
+为每条有效记录计算行指纹，与上次处理完成时提交的指纹比较，
+找出新增、变化和删除的记录，下游阶段只处理这些记录。
+"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from manager.models import DatasetDelta
+
+logger = logging.getLogger(__name__)
+
+# 行指纹的计算方式版本，修改 _row_hashes 后递增，使旧的已提交指纹失效
+FINGERPRINT_VERSION = 2
+
+# 逐列合并单元格哈希时使用的乘数（64 位无符号整数运算，溢出回绕）
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+
+def _normalized_text(series: pd.Series, present: np.ndarray) -> np.ndarray:
+    """
+    把一列的非空值转换为与 dtype 无关的文本
+
+    同一个值无论读作 float64、压缩后的 Int8 还是分块读取时的字符串，都得到相同的文本：
+    整数值写成整数，其余数字按最短表示。
+    """
+    values = series[present]
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        return values.astype(str).to_numpy(dtype=object)
+    if pd.api.types.is_integer_dtype(series):
+        return values.to_numpy(dtype="int64").astype(str).astype(object)
+    numbers = values.to_numpy(dtype="float64")
+    integral = np.isfinite(numbers) & (numbers == np.trunc(numbers)) & (np.abs(numbers) < 2**63)
+    text = numbers.astype(str).astype(object)
+    text[integral] = numbers[integral].astype("int64").astype(str)
+    return text
+
+
+def _row_hashes(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """
+    按列名顺序合并各列非空单元格的哈希
+
+    缺失值不参与计算，因此全为空的列（整表读取时会被丢弃，分块读取时保留）
+    和列的顺序都不影响结果。
+    """
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    for col in sorted(columns):
+        present = df[col].notna().to_numpy()
+        if not present.any():
+            continue
+        # 列名参与哈希，区分同一个值出现在不同列中的行
+        column_hash = pd.util.hash_array(np.array([col], dtype=object))[0]
+        cell_hashes = pd.util.hash_array(_normalized_text(df[col], present)) ^ column_hash
+        hashes[present] = hashes[present] * _HASH_MULTIPLIER + cell_hashes
+    return hashes
+
+
+class RowFingerprints:
+    """
+    有效记录的行指纹
+
+    - key: 由识别列和同 key 的出现序号计算，用于跨版本对应同一条记录
+    - content: 由全部列计算，用于判断记录内容是否变化
+    - 顺序与有效数据一致，下标即记录ID
+    """
+
+    __slots__ = ("keys", "contents")
+
+    def __init__(self, keys: np.ndarray, contents: np.ndarray):
+        self.keys = keys
+        self.contents = contents
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def compute(cls, df: pd.DataFrame, key_columns: List[str]) -> "RowFingerprints":
+        """
+        按列向量化计算指纹
+
+        Args:
+            df: 有效数据DataFrame
+            key_columns: 识别同一条记录的列（不存在的列会被忽略）
+
+        Returns:
+            RowFingerprints
+        """
+        builder = RowFingerprintBuilder(key_columns)
+        builder.add(df)
+        return builder.finish()
+
+    def without(self, record_ids: Iterable[int]) -> "RowFingerprints":
+        """去掉部分记录（如处理失败的记录），下次仍会作为待处理记录出现"""
+        mask = np.ones(len(self.keys), dtype=bool)
+        mask[list(record_ids)] = False
+        return RowFingerprints(self.keys[mask], self.contents[mask])
+
+    def diff(self, previous: Optional["RowFingerprints"], stage: str) -> DatasetDelta:
+        """
+        与上次提交的指纹比较
+
+        Args:
+            previous: 上次提交的指纹，None 表示从未处理过（全部为新增）
+            stage: 处理阶段
+
+        Returns:
+            DatasetDelta
+        """
+        if previous is None or len(previous) == 0:
+            return DatasetDelta(
+                stage=stage,
+                added=list(range(len(self))),
+                total_records=len(self),
+                fingerprints=self,
+            )
+
+        positions = pd.Index(previous.keys).get_indexer(self.keys)
+        is_new = positions < 0
+        is_changed = ~is_new & (previous.contents[np.where(is_new, 0, positions)] != self.contents)
+        removed = int((~np.isin(previous.keys, self.keys)).sum())
+
+        return DatasetDelta(
+            stage=stage,
+            added=np.flatnonzero(is_new).tolist(),
+            changed=np.flatnonzero(is_changed).tolist(),
+            removed=removed,
+            total_records=len(self),
+            fingerprints=self,
+        )
+
+
+class RowFingerprintBuilder:
+    """
+    逐块计算行指纹
+
+    分块导入（如 SQLite）时每块计算识别列和全部列的哈希，
+    同 key 的出现序号依赖全部数据，在 finish 时统一计算。
+    """
+
+    def __init__(self, key_columns: List[str]):
+        """
+        初始化
+
+        Args:
+            key_columns: 识别同一条记录的列（不存在的列会被忽略）
+        """
+        self.key_columns = key_columns
+        self._present: Optional[List[str]] = None
+        self._base_keys: List[np.ndarray] = []
+        self._contents: List[np.ndarray] = []
+
+    def add(self, df: pd.DataFrame):
+        """添加一块有效数据，各块的列相同"""
+        if self._present is None:
+            self._present = [col for col in self.key_columns if col in df.columns] or list(
+                df.columns
+            )
+        self._base_keys.append(_row_hashes(df, self._present))
+        self._contents.append(_row_hashes(df, list(df.columns)))
+
+    def finish(self) -> RowFingerprints:
+        """按全部数据计算出现序号，返回行指纹"""
+        if not self._base_keys:
+            empty = np.empty(0, dtype=np.uint64)
+            return RowFingerprints(empty, empty)
+        base_keys = pd.Series(np.concatenate(self._base_keys))
+        # 同一个 key 出现多次时（如同一份简历投了同一岗位两次）按出现顺序区分
+        occurrence = base_keys.groupby(base_keys.to_numpy()).cumcount()
+        keys = pd.util.hash_pandas_object(
+            pd.DataFrame({"key": base_keys.to_numpy(), "occurrence": occurrence.to_numpy()}),
+            index=False,
+        ).to_numpy()
+        return RowFingerprints(keys, np.concatenate(self._contents))
+
+
+class DeltaStore:
+    """
+    已提交的行指纹
+
+    与列式缓存放在同一目录，按数据源和处理阶段分别保存，
+    各阶段互不影响（经验提取完成不代表批量评估也已完成）。
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        初始化
+
+        Args:
+            cache_dir: 保存目录
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def source_key(source: Path) -> str:
+        """数据源路径的短哈希，与列式缓存的文件名一致"""
+        return hashlib.sha256(str(source.resolve()).encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, source: Path, stage: str) -> Path:
+        return (
+            self.cache_dir
+            / f"{source.stem}_{self.source_key(source)}.{stage}.rows.v{FINGERPRINT_VERSION}.npz"
+        )
+
+    def load(self, source: Path, stage: str) -> Optional[RowFingerprints]:
+        """读取上次提交的指纹，从未提交过时返回None"""
+        path = self._path(source, stage)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return RowFingerprints(data["keys"], data["contents"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"行指纹读取失败，将全部视为新增: {e}")
+            return None
+
+    def commit(self, source: Path, stage: str, fingerprints: RowFingerprints):
+        """提交指纹（原子写入）"""
+        path = self._path(source, stage)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=fingerprints.keys, contents=fingerprints.contents)
+        os.replace(tmp_path, path)
+        logger.info(f"已提交 {stage} 阶段的行指纹: {len(fingerprints)} 条")
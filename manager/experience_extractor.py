@@ -6,12 +6,17 @@
 
 import logging
 import re
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from datetime import datetime
 
 from menglong import Model
 from menglong.ml_model.schema.ml_request import UserMessage as user
 
+from components.cost_estimator import estimate_tokens
+from components.progress import ProgressTracker
+from manager.map_reduce import SummaryCache, tree_reduce
 from manager.models import (
     Experience,
     ExtractionParams,
@@ -19,11 +24,17 @@ from manager.models import (
     TokenStats,
     ManagerConfig,
     ExtractionMode,
+    IntegrationState,
     Record,
 )
 
 logger = logging.getLogger(__name__)
 
+# 打包提取响应中每条记录的输出：=== 记录 <id> 开始 === ... === 记录 <id> 结束 ===
+_PACKED_OUTPUT_PATTERN = re.compile(
+    r"=+\s*记录\s*(\S+?)\s*开始\s*=+(.*?)=+\s*记录\s*\1\s*结束\s*=+", re.DOTALL
+)
+
 
 class ExperienceExtractor:
     """
@@ -31,9 +42,11 @@ class ExperienceExtractor:
 
     功能:
     - 从单个面试记录提取经验
-    - 批量提取经验
-    - 整合多个经验
-    - Token使用统计
+    - 批量提取经验（按 max_workers 并发调用模型，结果保持记录顺序）
+    - 打包提取：多条较短的记录放进一次请求，按分隔标记拆回各条记录的经验
+    - 整合多个经验（超出一次请求的容量时分层归并）
+    - 增量整合：在上次的整合结果上只合并新经验
+    - Token使用统计（每次调用单独统计，加锁合并到批次统计）
     """
 
     # 定价表（每1K tokens的价格，单位：美元）
@@ -48,6 +61,19 @@ class ExperienceExtractor:
         },
     }
 
+    # 各整合模式一次请求最多使用的经验条数
+    INTEGRATION_LIMITS = {
+        ExtractionMode.INCREMENTAL: 5,
+        ExtractionMode.REVIEW: 8,
+        ExtractionMode.FULL_REFRESH: 10,
+    }
+
+    # 打包提取时每条记录预留的输出 tokens，与 config.max_tokens 一起决定一次请求最多放几条记录
+    PACKED_OUTPUT_TOKENS = 1000
+
+    # 分组摘要提示词版本，修改 _build_group_summary_prompt 后递增，使旧缓存失效
+    GROUP_SUMMARY_PROMPT_VERSION = 1
+
     def __init__(self, config: ManagerConfig):
         """
         初始化经验提取器
@@ -58,6 +84,10 @@ class ExperienceExtractor:
         self.config = config
         self.model = Model()
         self.token_stats = TokenStats()
+        self._stats_lock = threading.Lock()
+        self.summary_cache = (
+            SummaryCache(config.integration_cache_dir) if config.enable_cache else None
+        )
 
     def extract_single(self, record: Record) -> Optional[Experience]:
         """
@@ -87,26 +117,10 @@ class ExperienceExtractor:
             response_text = self._extract_response_text(response)
 
             # 更新Token统计
-            self._update_token_stats(response)
+            call_stats = self._update_token_stats(response)
 
             # 创建Experience对象
-            experience_id = (
-                f"exp_{record.id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]}"
-            )
-
-            experience = Experience(
-                id=experience_id,
-                record_id=record.id,
-                content=response_text,
-                timestamp=datetime.now(),
-                token_stats=self.token_stats.to_dict(),
-                metadata={
-                    "resume_summary": record.resume[:200] + "..."
-                    if len(record.resume) > 200
-                    else record.resume,
-                    "position": record.position,
-                },
-            )
+            experience = self._build_experience(record, response_text, call_stats)
 
             logger.info(f"✅ 成功提取记录 {record.id} 的经验")
             return experience
@@ -115,12 +129,110 @@ class ExperienceExtractor:
             logger.error(f"提取记录 {record.id} 的经验失败: {e}")
             return None
 
+    def extract_packed(self, records: List[Record]) -> List[Optional[Experience]]:
+        """
+        在一次请求中提取多条记录的经验
+
+        Args:
+            records: 记录列表（由 _pack_records 分组，总长度在预算内）
+
+        Returns:
+            与 records 一一对应的 Experience，请求失败或某条记录的输出缺失/无法解析时为None
+        """
+        record_ids = [record.id for record in records]
+        try:
+            logger.info(f"正在打包提取记录 {record_ids} 的经验...")
+            response = self.model.chat(
+                [user(content=self._build_packed_extraction_prompt(records))]
+            )
+            response_text = self._extract_response_text(response)
+            call_stats = self._update_token_stats(response)
+        except Exception as e:
+            logger.error(f"打包提取记录 {record_ids} 的经验失败: {e}")
+            return [None] * len(records)
+
+        outputs = self._parse_packed_response(response_text, record_ids)
+        experiences = []
+        for record in records:
+            content = outputs.get(record.id)
+            if content:
+                # 同一请求的记录共享这次调用的 token 统计
+                experiences.append(
+                    self._build_experience(
+                        record, content, call_stats, {"packed_record_ids": record_ids}
+                    )
+                )
+            else:
+                logger.warning(f"打包提取的响应中缺少记录 {record.id} 的经验")
+                experiences.append(None)
+
+        logger.info(f"✅ 打包提取完成: {len(outputs)}/{len(records)} 条记录")
+        return experiences
+
+    def _build_experience(
+        self,
+        record: Record,
+        content: str,
+        call_stats: TokenStats,
+        metadata: Optional[Dict] = None,
+    ) -> Experience:
+        """根据模型输出创建Experience对象"""
+        experience_id = f"exp_{record.id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]}"
+        return Experience(
+            id=experience_id,
+            record_id=record.id,
+            content=content,
+            timestamp=datetime.now(),
+            token_stats=call_stats.to_dict(),
+            metadata={
+                "resume_summary": record.resume[:200] + "..."
+                if len(record.resume) > 200
+                else record.resume,
+                "position": record.position,
+                **(metadata or {}),
+            },
+        )
+
+    def _pack_records(self, records: List[Record]) -> List[List[int]]:
+        """
+        按 token 预算把记录分组
+
+        每组的输入不超过 config.pack_max_tokens，条数不超过输出上限允许的数量；
+        单条就超出预算的记录单独成组（走单条提取）。
+
+        Returns:
+            各组记录在 records 中的下标
+        """
+        max_records = max(1, self.config.max_tokens // self.PACKED_OUTPUT_TOKENS)
+        budget = self.config.pack_max_tokens - estimate_tokens(self._build_packed_extraction_prompt([]))
+
+        units: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, record in enumerate(records):
+            tokens = estimate_tokens(self._format_record_block(record))
+            if tokens > budget:
+                units.append([i])
+                continue
+            if current and (current_tokens + tokens > budget or len(current) >= max_records):
+                units.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            units.append(current)
+        return units
+
     def extract_batch(
         self, records: List[Record], params: ExtractionParams
     ) -> ExtractionResult:
         """
         批量提取经验
 
+        记录按 config.batch_size 分批提交到最多 config.max_workers 个线程的线程池，
+        每批全部完成后再提交下一批；返回的经验顺序与 records 一致。
+        params.pack_records 为 True 时，先把较短的记录按 token 预算打包，每包一个请求。
+
         Args:
             records: 记录列表
             params: 提取参数
@@ -135,23 +247,74 @@ class ExperienceExtractor:
 
         experiences = []
         errors = []
-
-        for i, record in enumerate(records, 1):
-            logger.info(f"处理第 {i}/{len(records)} 条记录 (ID: {record.id})...")
-
-            experience = self.extract_single(record)
-
-            if experience:
-                experiences.append(experience)
+        batch_size = self.config.batch_size
+        workers = max(1, min(self.config.max_workers, len(records)))
+
+        progress = ProgressTracker(
+            len(records),
+            label="extract",
+            status_path=self.config.status_file,
+            printer=logger.info,
+        )
+        model = self.model
+        self.model = progress.instrument(model)
+
+        # 每个请求处理的记录下标：打包提取时一组多条，否则一条一组
+        if params.pack_records:
+            units = self._pack_records(records)
+            logger.info(f"打包提取: {len(records)} 条记录合并为 {len(units)} 个请求")
+        else:
+            units = [[i] for i in range(len(records))]
+
+        def extract(unit: List[int]) -> List[Optional[Experience]]:
+            for i in unit:
+                logger.info(f"处理第 {i + 1}/{len(records)} 条记录 (ID: {records[i].id})...")
+                progress.start(str(records[i].id), "extract")
+            if len(unit) == 1:
+                results = [self.extract_single(records[unit[0]])]
             else:
-                error_msg = f"记录 {record.id} 提取失败"
-                errors.append(error_msg)
-
-        # 如果需要自动整合
-        integrated_experience = None
-        if params.auto_integrate and experiences:
-            logger.info(f"正在整合 {len(experiences)} 条经验...")
-            integrated_experience = self.integrate_experiences(experiences, params.mode)
+                results = self.extract_packed([records[i] for i in unit])
+                # 输出缺失或无法解析的记录退回单条提取
+                results = [
+                    experience or self.extract_single(records[i])
+                    for i, experience in zip(unit, results)
+                ]
+            for i, experience in zip(unit, results):
+                record_id = str(records[i].id)
+                if experience:
+                    progress.finish(record_id)
+                else:
+                    progress.finish(record_id, error=f"记录 {record_id} 提取失败")
+            return results
+
+        extracted: List[Optional[Experience]] = [None] * len(records)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as pool:
+                for start in range(0, len(units), batch_size):
+                    batch = units[start : start + batch_size]
+                    futures = [pool.submit(extract, unit) for unit in batch]
+                    for unit, future in zip(batch, futures):
+                        for i, experience in zip(unit, future.result()):
+                            extracted[i] = experience
+
+            # 按记录顺序汇总结果
+            for record, experience in zip(records, extracted):
+                if experience:
+                    experiences.append(experience)
+                else:
+                    errors.append(f"记录 {record.id} 提取失败")
+
+            # 如果需要自动整合
+            integrated_experience = None
+            if params.auto_integrate and experiences:
+                logger.info(f"正在整合 {len(experiences)} 条经验...")
+                with progress.step("integrate", "integrate"):
+                    integrated_experience = self.integrate_experiences(
+                        experiences, params.mode
+                    )
+        finally:
+            self.model = model
+            progress.report(force=True)
 
         result = ExtractionResult(
             total_records=len(records),
@@ -186,35 +349,166 @@ class ExperienceExtractor:
         try:
             if not experiences:
                 return "暂无经验可整合"
+            return self._integrate(experiences, ExtractionMode(mode))
 
-            logger.info(f"正在整合 {len(experiences)} 条经验，模式: {mode.value}...")
-
-            # 根据模式选择不同的整合策略
-            if mode == ExtractionMode.INCREMENTAL:
-                prompt = self._build_incremental_prompt(experiences)
-            elif mode == ExtractionMode.REVIEW:
-                prompt = self._build_review_prompt(experiences)
-            elif mode == ExtractionMode.FULL_REFRESH:
-                prompt = self._build_full_refresh_prompt(experiences)
-            else:
-                logger.warning(f"未知模式 {mode}，使用默认增量模式")
-                prompt = self._build_incremental_prompt(experiences)
+        except Exception as e:
+            logger.error(f"整合经验失败: {e}")
+            return "整合经验时发生错误"
 
-            # 调用AI进行整合
-            response = self.model.chat([user(content=prompt)])
+    def update_integration(
+        self,
+        experiences: List[Experience],
+        mode: ExtractionMode = ExtractionMode.INCREMENTAL,
+        state: Optional[IntegrationState] = None,
+    ) -> Optional[IntegrationState]:
+        """
+        更新持久化的整合状态
 
-            # 提取响应文本
-            integrated_text = self._extract_response_text(response)
+        增量模式且已有整合结果时，只把上次的整合结果和尚未整合的经验发给模型，
+        每次的成本只与新经验的数量有关；其他模式或没有整合结果时用全部经验重新整合。
 
-            # 更新Token统计
-            self._update_token_stats(response)
+        Args:
+            experiences: 经验列表
+            mode: 整合模式
+            state: 上次的整合状态，None 表示从未整合过
 
-            logger.info("✅ 经验整合完成")
-            return integrated_text
+        Returns:
+            新的整合状态；没有新经验时返回原状态；整合失败返回None
+        """
+        try:
+            mode = ExtractionMode(mode)
+            if mode == ExtractionMode.INCREMENTAL and state is not None and state.summary:
+                integrated = set(state.experience_ids)
+                new_experiences = [exp for exp in experiences if exp.id not in integrated]
+                if not new_experiences:
+                    logger.info("没有新的经验，沿用上次的整合结果")
+                    return state
+                logger.info(
+                    f"增量整合: 在第 {state.version} 版整合结果上合并 {len(new_experiences)} 条新经验"
+                )
+                summary = self._integrate(new_experiences, mode, state.summary)
+                experience_ids = state.experience_ids + [exp.id for exp in new_experiences]
+            else:
+                if not experiences:
+                    return state
+                summary = self._integrate(experiences, mode)
+                experience_ids = [exp.id for exp in experiences]
 
         except Exception as e:
             logger.error(f"整合经验失败: {e}")
-            return "整合经验时发生错误"
+            return None
+
+        return IntegrationState(
+            summary=summary,
+            experience_ids=experience_ids,
+            version=(state.version if state else 0) + 1,
+            mode=mode.value,
+        )
+
+    def _integrate(
+        self,
+        experiences: List[Experience],
+        mode: ExtractionMode,
+        previous_summary: Optional[str] = None,
+    ) -> str:
+        """调用模型整合经验，失败时抛出异常"""
+        logger.info(f"正在整合 {len(experiences)} 条经验，模式: {mode.value}...")
+
+        # 经验太多时先分组摘要，逐层合并到一次请求放得下
+        experiences = self._reduce_experiences(experiences, mode)
+
+        # 根据模式选择不同的整合策略
+        if mode == ExtractionMode.INCREMENTAL:
+            prompt = self._build_incremental_prompt(experiences, previous_summary)
+        elif mode == ExtractionMode.REVIEW:
+            prompt = self._build_review_prompt(experiences)
+        elif mode == ExtractionMode.FULL_REFRESH:
+            prompt = self._build_full_refresh_prompt(experiences)
+        else:
+            logger.warning(f"未知模式 {mode}，使用默认增量模式")
+            prompt = self._build_incremental_prompt(experiences, previous_summary)
+
+        # 调用AI进行整合
+        response = self.model.chat([user(content=prompt)])
+
+        # 提取响应文本
+        integrated_text = self._extract_response_text(response)
+
+        # 更新Token统计
+        self._update_token_stats(response)
+
+        logger.info("✅ 经验整合完成")
+        return integrated_text
+
+    def _reduce_experiences(
+        self, experiences: List[Experience], mode: ExtractionMode
+    ) -> List[Experience]:
+        """
+        分层归并经验
+
+        经验条数或总 token 数超出一次整合请求的容量时，按预算分组并行摘要，
+        用摘要代替原经验，直到条数不超过该模式的上限。
+
+        Returns:
+            可以直接构建整合提示词的经验列表，顺序与原列表一致
+        """
+        limit = self.INTEGRATION_LIMITS.get(mode, self.INTEGRATION_LIMITS[ExtractionMode.INCREMENTAL])
+        partials = tree_reduce(
+            [exp.content for exp in experiences],
+            self._summarize_group,
+            max_tokens=self.config.integration_max_tokens,
+            max_items=limit,
+            max_workers=self.config.max_workers,
+            cache=self.summary_cache,
+            namespace=f"{self.config.ai_model}:{self.GROUP_SUMMARY_PROMPT_VERSION}",
+        )
+        if len(partials) == len(experiences):
+            return experiences
+
+        logger.info(f"分层归并完成: {len(experiences)} 条经验 -> {len(partials)} 段摘要")
+        reduced = []
+        for partial in partials:
+            covered = experiences[partial.start : partial.end]
+            if len(covered) == 1:
+                reduced.append(covered[0])
+                continue
+            reduced.append(
+                Experience(
+                    id=f"summary_{covered[0].id}_{covered[-1].id}",
+                    record_id=covered[-1].record_id,
+                    content=partial.text,
+                    timestamp=covered[-1].timestamp,
+                    metadata={
+                        "summary_of": [exp.id for exp in covered],
+                        "record_ids": [exp.record_id for exp in covered],
+                    },
+                )
+            )
+        return reduced
+
+    def _summarize_group(self, texts: List[str]) -> str:
+        """把一组经验合并为一段摘要（在线程池中调用，失败时抛出异常）"""
+        response = self.model.chat([user(content=self._build_group_summary_prompt(texts))])
+        self._update_token_stats(response)
+        return self._extract_response_text(response)
+
+    def _build_group_summary_prompt(self, texts: List[str]) -> str:
+        """构建分组摘要的prompt"""
+        experiences_text = "".join(
+            f"\n## 经验{i}:\n{text}\n" for i, text in enumerate(texts, 1)
+        )
+        return f"""请把以下多条面试经验合并为一份要点摘要，供后续与其他摘要再次整合。
+
+要求：
+1. 围绕"聪明度"、"皮实"、"勤奋"三个维度组织
+2. 保留具体的提问示例、追问策略和判断标准，合并重复内容
+3. 不同经验之间的差异和适用场景要保留
+4. 输出长度控制在1500字以内
+
+经验内容：
+{experiences_text}
+
+请输出合并后的要点摘要。"""
 
     def _build_extraction_prompt(
         self, resume: str, jd: str, conversation: str, evaluation: str
@@ -237,7 +531,62 @@ class ExperienceExtractor:
 ### HR评价
 {evaluation}
 
-## 任务要求
+{self._extraction_requirements()}"""
+
+    def _format_record_block(self, record: Record) -> str:
+        """打包提取时单条记录的背景信息"""
+        return f"""
+<record id="{record.id}">
+### 候选人简历
+{record.resume}
+
+### 岗位JD
+{record.jd}
+
+### 面试对话
+{record.conversation}
+
+### HR评价
+{record.evaluation}
+</record>
+"""
+
+    def _build_packed_extraction_prompt(self, records: List[Record]) -> str:
+        """构建打包提取的提示词：任务要求只出现一次，每条记录的输出用标记分隔"""
+        records_text = "".join(self._format_record_block(record) for record in records)
+        return f"""
+以下是多条相互独立的面试记录，每条记录包含在 <record id="..."> 标签中。
+请对每条记录分别提取HR在面试中识别候选人"聪明度"、"皮实"和"勤奋"这三个指标的经验技巧。
+
+## 背景信息
+{records_text}
+{self._extraction_requirements()}
+
+## 输出格式
+
+每条记录的经验单独输出，控制在800字以内，不要合并不同记录的内容。
+每条记录的输出必须以 `=== 记录 <id> 开始 ===` 开头、以 `=== 记录 <id> 结束 ===` 结尾（<id> 为该记录的 id），例如：
+
+=== 记录 12 开始 ===
+（记录 12 的经验）
+=== 记录 12 结束 ===
+"""
+
+    @staticmethod
+    def _parse_packed_response(response_text: str, record_ids: List[int]) -> Dict[int, str]:
+        """按分隔标记拆分打包提取的响应，只保留请求中的记录"""
+        wanted = {str(record_id): record_id for record_id in record_ids}
+        outputs = {}
+        for match in _PACKED_OUTPUT_PATTERN.finditer(response_text):
+            record_id = wanted.get(match.group(1))
+            content = match.group(2).strip()
+            if record_id is not None and content:
+                outputs[record_id] = content
+        return outputs
+
+    def _extraction_requirements(self) -> str:
+        """经验提取的任务要求（单条提取和打包提取共用）"""
+        return """## 任务要求
 
 请分析这次面试中HR是如何通过提问和互动来评估候选人的：
 1. **聪明度** - 逻辑思维、学习能力、问题分析能力
@@ -269,9 +618,11 @@ class ExperienceExtractor:
 请用结构化的方式输出，包含具体的问题示例和判断标准。
 """
 
-    def _build_incremental_prompt(self, experiences: List[Experience]) -> str:
-        """构建增量更新的prompt"""
-        max_experiences = 5
+    def _build_incremental_prompt(
+        self, experiences: List[Experience], previous_summary: Optional[str] = None
+    ) -> str:
+        """构建增量更新的prompt，有上次的整合结果时只合并新经验"""
+        max_experiences = self.INTEGRATION_LIMITS[ExtractionMode.INCREMENTAL]
         max_chars_per_experience = 3000
 
         if len(experiences) > max_experiences:
@@ -284,6 +635,23 @@ class ExperienceExtractor:
                 exp_text = exp_text[:max_chars_per_experience] + "..."
             experiences_text += f"\n## 经验{i}:\n{exp_text}\n"
 
+        if previous_summary:
+            return f"""请将以下新的面试经验融入现有的HR面试指导手册，输出更新后的完整手册。
+
+要求：
+1. 聚焦于"聪明度"、"皮实"、"勤奋"三个核心维度的评估
+2. 保留现有手册中仍然有效的内容，补充新经验中的新技巧和新问题
+3. 新经验与现有内容重复时合并，不要简单追加
+4. 输出长度控制在2000字以内
+
+现有手册：
+{previous_summary}
+
+新经验：
+{experiences_text}
+
+请输出更新后的面试指导手册。"""
+
         return f"""请将以下面试经验进行整合，形成一份简洁的HR面试指导手册。
 
 要求：
@@ -299,7 +667,7 @@ class ExperienceExtractor:
 
     def _build_review_prompt(self, experiences: List[Experience]) -> str:
         """构建温故知新的prompt"""
-        max_experiences = 8
+        max_experiences = self.INTEGRATION_LIMITS[ExtractionMode.REVIEW]
         max_chars_per_experience = 2000
 
         if len(experiences) > max_experiences:
@@ -333,7 +701,7 @@ class ExperienceExtractor:
 
     def _build_full_refresh_prompt(self, experiences: List[Experience]) -> str:
         """构建全量重新总结的prompt"""
-        max_experiences = 10
+        max_experiences = self.INTEGRATION_LIMITS[ExtractionMode.FULL_REFRESH]
         max_chars_per_experience = 1500
 
         if len(experiences) > max_experiences:
@@ -403,8 +771,14 @@ class ExperienceExtractor:
             logger.error(f"提取响应文本失败: {e}")
             return str(response)
 
-    def _update_token_stats(self, response):
-        """从chat response中更新token统计"""
+    def _update_token_stats(self, response) -> TokenStats:
+        """
+        从chat response中统计本次调用的token，并合并到批次统计
+
+        Returns:
+            本次调用的统计，无法获取usage时为空统计
+        """
+        call_stats = TokenStats()
         try:
             usage = None
             if hasattr(response, "usage"):
@@ -429,19 +803,21 @@ class ExperienceExtractor:
 
                 if input_tokens > 0 or output_tokens > 0:
                     cost = self._calculate_cost(input_tokens, output_tokens)
-                    self.token_stats.add_usage(input_tokens, output_tokens, cost)
+                    call_stats.add_usage(input_tokens, output_tokens, cost)
+                    with self._stats_lock:
+                        self.token_stats.merge(call_stats)
 
                     logger.info(
                         f"💰 本次调用: 输入{input_tokens}tokens, 输出{output_tokens}tokens, 成本${cost:.4f}"
                     )
-                    return True
+                    return call_stats
 
             logger.warning("⚠️ 无法从response中获取usage信息")
-            return False
+            return call_stats
 
         except Exception as e:
             logger.error(f"更新token统计失败: {e}")
-            return False
+            return call_stats
 
     def _calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
         """计算API调用成本"""
@@ -5,7 +5,9 @@
 """
 
 import logging
-from typing import List, Dict, Optional
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
 
 from manager.models import (
     ManagerConfig,
@@ -15,16 +17,28 @@ from manager.models import (
     StatisticsResult,
     ExtractionParams,
     ExtractionResult,
+    ExtractionMode,
     ExportFormat,
     ExportType,
     CheckpointInfo,
-    Record,
+    DatasetDelta,
+    DuplicateClusters,
+    RecordView,
 )
 
 from manager.data_loader import DataLoader
 from manager.data_processor import DataProcessor
 from manager.experience_extractor import ExperienceExtractor
 from manager.storage_manager import StorageManager
+from manager.search_index import SearchIndex
+from manager.dedup import (
+    NearDuplicateDetector,
+    SignatureStore,
+    dedup_text_columns,
+    frame_texts,
+)
+from manager.delta import DeltaStore, RowFingerprintBuilder
+from manager.sqlite_store import IMPORT_CHUNK_SIZE, SQLiteStore
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +77,21 @@ class InterviewDataManager:
         self.processor = DataProcessor()
         self.extractor = ExperienceExtractor(self.config)
         self.storage = StorageManager(self.config)
+        self.delta_store = DeltaStore(self.config.columnar_cache_dir)
+        # SQLite 后端：查询、搜索和统计在数据库中完成，不把数据读入内存
+        self.sqlite: Optional[SQLiteStore] = (
+            SQLiteStore(self.config.sqlite_path)
+            if self.config.storage_backend == "sqlite"
+            else None
+        )
+
+        # 搜索索引在第一次搜索时建立，数据重新加载后重建
+        self._search_index: Optional[SearchIndex] = None
+        self._search_index_version = None
+
+        # 近似重复记录的聚类结果，第一次提取/评估时计算，数据重新加载后失效
+        self._duplicates: Optional[DuplicateClusters] = None
+        self._duplicates_ready = False
 
         logger.info("=" * 60)
         logger.info("InterviewDataManager 初始化完成")
@@ -70,18 +99,26 @@ class InterviewDataManager:
 
     # ==================== 数据管理接口 ====================
 
-    def load_data(self, source: Optional[str] = None) -> DataLoadResult:
+    def load_data(
+        self, source: Optional[str] = None, columns: Optional[List[str]] = None
+    ) -> DataLoadResult:
         """
         加载数据
 
         Args:
             source: 数据源路径，如果为None则使用配置中的路径
+            columns: 只加载这些列（走列式缓存时不读取其他列），None 表示全部列
 
         Returns:
             DataLoadResult: 加载结果
         """
         logger.info("🚀 开始加载数据...")
-        result = self.loader.load_from_csv(source)
+        self._duplicates = None
+        self._duplicates_ready = False
+        if self.sqlite is not None:
+            result = self._load_into_sqlite(source)
+        else:
+            result = self.loader.load_from_csv(source, columns=columns)
 
         if result.success:
             logger.info(f"✅ 数据加载成功: {result.total_records} 条记录")
@@ -90,6 +127,67 @@ class InterviewDataManager:
 
         return result
 
+    def _load_into_sqlite(self, source: Optional[str]) -> DataLoadResult:
+        """
+        把数据源导入 SQLite，数据源未变化时直接使用已有数据库
+
+        Args:
+            source: 数据源路径，如果为None则使用配置中的路径
+
+        Returns:
+            DataLoadResult: 加载结果
+        """
+        start_time = time.time()
+        source = source or self.config.data_source
+        csv_path = Path(source)
+        if not csv_path.exists():
+            return DataLoadResult(
+                success=False,
+                total_records=0,
+                valid_records=0,
+                encoding_used="",
+                errors=[f"文件不存在: {source}"],
+            )
+
+        stat = csv_path.stat()
+        fingerprint = (str(csv_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        key_columns = list(self.config.delta_key_columns)
+        if self.sqlite.is_current(fingerprint) and (
+            self.sqlite.get_meta("delta_key_columns") == key_columns
+        ):
+            logger.info(f"✅ 使用已有 SQLite 数据库: {self.sqlite.db_path}")
+        else:
+            encoding = self.loader.detect_encoding(source)
+            try:
+                self.sqlite.import_chunks(
+                    self.loader.iter_valid_chunks(
+                        source, self.config.chunk_size or IMPORT_CHUNK_SIZE, encoding
+                    ),
+                    fingerprint,
+                    encoding,
+                    key_columns,
+                )
+            except (ValueError, UnicodeDecodeError) as e:
+                return DataLoadResult(
+                    success=False,
+                    total_records=0,
+                    valid_records=0,
+                    encoding_used=encoding,
+                    errors=[f"导入 SQLite 失败: {e}"],
+                    load_time=time.time() - start_time,
+                )
+
+        count = self.sqlite.count()
+        return DataLoadResult(
+            success=count > 0,
+            total_records=count,
+            valid_records=count,
+            encoding_used=self.sqlite.get_meta("encoding", ""),
+            columns=self.sqlite.get_meta("columns", []),
+            errors=[] if count > 0 else ["没有有效记录"],
+            load_time=time.time() - start_time,
+        )
+
     def get_overview(self) -> Dict:
         """
         获取数据概览
@@ -97,6 +195,16 @@ class InterviewDataManager:
         Returns:
             包含数据概览信息的字典
         """
+        if self.sqlite is not None:
+            columns = self.sqlite.get_meta("columns", [])
+            positions = self.sqlite.statistics()["positions"] or {}
+            return {
+                "total_records": self.sqlite.count(),
+                "total_columns": len(columns),
+                "columns": columns,
+                "positions": positions.get("job_distribution", {}),
+            }
+
         df = self.loader.get_dataframe()
         if df is None:
             return {"error": "数据未加载"}
@@ -110,6 +218,18 @@ class InterviewDataManager:
         Returns:
             数据摘要字典
         """
+        if self.sqlite is not None:
+            count = self.sqlite.count()
+            columns = self.sqlite.get_meta("columns", [])
+            return {
+                "total_records": count,
+                "valid_records": count,
+                "invalid_records": 0,
+                "total_columns": len(columns),
+                "columns": columns,
+                "encoding_used": self.sqlite.get_meta("encoding"),
+                "storage_backend": "sqlite",
+            }
         return self.loader.get_summary()
 
     # ==================== 查询接口 ====================
@@ -133,6 +253,9 @@ class InterviewDataManager:
         Returns:
             QueryResult: 查询结果
         """
+        if self.sqlite is not None:
+            return self.sqlite.query(filters, limit=limit, offset=offset)
+
         df = self.loader.get_valid_data()
 
         if df.empty:
@@ -150,11 +273,8 @@ class InterviewDataManager:
         # 分页
         paginated_df = df.iloc[offset : offset + limit]
 
-        # 转换为Record对象
-        records = []
-        for idx, row in paginated_df.iterrows():
-            record = Record.from_dataframe_row(idx, row.to_dict())
-            records.append(record)
+        # 转换为共享列数组的记录视图
+        records = RecordView.from_frame(paginated_df)
 
         return QueryResult(
             records=records,
@@ -183,6 +303,9 @@ class InterviewDataManager:
         Returns:
             QueryResult: 搜索结果
         """
+        if self.sqlite is not None:
+            return self.sqlite.search(keyword, fields, filters, limit=limit)
+
         df = self.loader.get_valid_data()
 
         if df.empty:
@@ -193,7 +316,30 @@ class InterviewDataManager:
             keyword=keyword, fields=fields, filters=filters or {}, limit=limit
         )
 
-        return self.processor.search_candidates(df, query)
+        return self.processor.search_candidates(df, query, self._get_search_index(df))
+
+    def _get_search_index(self, df) -> SearchIndex:
+        """
+        获取与有效数据对应的搜索索引
+
+        数据重新加载后重建；有效数据增加时只为新增的行建立索引。
+        """
+        if (
+            self._search_index is None
+            or self._search_index_version != self.loader.data_version
+            or self._search_index.size > len(df)
+        ):
+            self._search_index = SearchIndex.for_frame(df)
+            self._search_index_version = self.loader.data_version
+
+        if self._search_index.size < len(df):
+            start = time.time()
+            self._search_index.add_frame(df.iloc[self._search_index.size :])
+            logger.info(
+                f"搜索索引已更新: {self._search_index.size} 条记录, 耗时 {time.time() - start:.2f}秒"
+            )
+
+        return self._search_index
 
     # ==================== 分析接口 ====================
 
@@ -212,15 +358,26 @@ class InterviewDataManager:
         Returns:
             StatisticsResult: 统计结果
         """
+        if self.sqlite is not None:
+            stats = self.sqlite.statistics()
+            if analysis_type == "position_distribution":
+                return self.processor.position_result(stats["positions"])
+            elif analysis_type == "interview_results":
+                return self.processor.interview_result(stats["interview_results"])
+            return StatisticsResult(
+                metrics={}, summary=f"未知的分析类型: {analysis_type}"
+            )
+
         df = self.loader.get_valid_data()
 
         if df.empty:
             return StatisticsResult(metrics={}, summary="数据为空")
 
+        fingerprint = self.loader.dataset_fingerprint()
         if analysis_type == "position_distribution":
-            return self.processor.analyze_positions(df)
+            return self.processor.analyze_positions(df, fingerprint)
         elif analysis_type == "interview_results":
-            return self.processor.analyze_interview_results(df)
+            return self.processor.analyze_interview_results(df, fingerprint)
         else:
             return StatisticsResult(
                 metrics={}, summary=f"未知的分析类型: {analysis_type}"
@@ -256,6 +413,7 @@ class InterviewDataManager:
         save_individual: bool = True,
         auto_integrate: bool = True,
         batch_size: int = 5,
+        pack_records: bool = False,
     ) -> ExtractionResult:
         """
         提取面试经验
@@ -266,6 +424,7 @@ class InterviewDataManager:
             save_individual: 是否保存单个经验文件
             auto_integrate: 是否自动整合
             batch_size: 批处理大小
+            pack_records: 是否把多条较短的记录打包到一次请求中提取
 
         Returns:
             ExtractionResult: 提取结果
@@ -274,7 +433,9 @@ class InterviewDataManager:
 
         # 如果没有指定记录ID，随机选择
         if record_ids is None:
-            valid_count = len(self.loader.get_valid_data())
+            valid_count = (
+                self.sqlite.count() if self.sqlite is not None else self.loader.valid_count()
+            )
             if valid_count == 0:
                 return ExtractionResult(
                     total_records=0,
@@ -284,14 +445,26 @@ class InterviewDataManager:
                     errors=["没有有效数据"],
                 )
 
-            # 随机选择最多batch_size条记录
+            # 随机选择最多batch_size条记录（重复簇只在代表记录中选择）
             import random
 
-            record_ids = random.sample(range(valid_count), min(batch_size, valid_count))
+            candidates = range(valid_count)
+            duplicates = self.get_duplicates()
+            if duplicates is not None:
+                candidates = [
+                    rid for rid in candidates if duplicates.representative_of(rid) == rid
+                ]
+            record_ids = random.sample(candidates, min(batch_size, len(candidates)))
             logger.info(f"随机选择了 {len(record_ids)} 条记录: {record_ids}")
 
+        # 每个重复簇只提取一条记录
+        record_ids, skipped_duplicates = self.skip_duplicates(record_ids)
+
         # 获取记录
-        records = self.loader.get_records(record_ids)
+        if self.sqlite is not None:
+            records = self.sqlite.get_records(record_ids)
+        else:
+            records = self.loader.get_records(record_ids)
 
         if not records:
             return ExtractionResult(
@@ -309,10 +482,12 @@ class InterviewDataManager:
             save_individual=save_individual,
             auto_integrate=auto_integrate,
             batch_size=batch_size,
+            pack_records=pack_records,
         )
 
         # 提取经验
         result = self.extractor.extract_batch(records, params)
+        result.skipped_duplicates = skipped_duplicates
 
         # 如果需要保存单个经验文件
         if save_individual:
@@ -322,6 +497,8 @@ class InterviewDataManager:
         logger.info(
             f"✅ 经验提取完成: 成功 {result.successful_extractions}/{result.total_records}"
         )
+        if result.saved_calls:
+            logger.info(f"♻️ 跳过 {result.saved_calls} 条重复记录，节省 {result.saved_calls} 次模型调用")
 
         return result
 
@@ -354,10 +531,255 @@ class InterviewDataManager:
             logger.warning("没有找到可整合的经验")
             return "暂无经验可整合"
 
-        # 整合经验
-        integrated = self.extractor.integrate_experiences(experiences, mode)
+        # 只整合部分经验的全量/温故知新整合不影响持久化的滚动摘要
+        if experience_ids and ExtractionMode(mode) != ExtractionMode.INCREMENTAL:
+            return self.extractor.integrate_experiences(experiences, mode)
+
+        # 整合经验：增量模式只把上次的整合结果和新经验发给模型
+        state = self.storage.load_integration_state()
+        new_state = self.extractor.update_integration(experiences, mode, state)
+        if new_state is None:
+            return "整合经验时发生错误"
+        if new_state is not state:
+            self.storage.save_integration_state(new_state)
+
+        return new_state.summary
+
+    # ==================== 近似去重接口 ====================
+
+    def get_duplicates(self) -> Optional[DuplicateClusters]:
+        """
+        近似重复记录的聚类结果
+
+        第一次调用时计算（加载数据时不计算），之后直接返回，数据重新加载后重新计算。
+
+        Returns:
+            DuplicateClusters，未启用去重或数据未加载时返回None
+        """
+        if not self._duplicates_ready:
+            self._duplicates = self.find_duplicates() if self.config.dedup_enabled else None
+            self._duplicates_ready = True
+        return self._duplicates
 
-        return integrated
+    def find_duplicates(self) -> Optional[DuplicateClusters]:
+        """
+        对简历和面试对话做近似去重
+
+        文本分批流式读取：分块模式只从列式表中读取比较的列，SQLite 后端分页查询。
+        签名缓存在列式缓存目录（SQLite 后端在数据库旁边），数据源未变化时不再读取文本。
+        记录ID与 extract_experiences / get_records 使用的一致（有效数据中的位置）。
+        SQLite 后端固定比较简历和各轮对话，不使用 dedup_columns。
+
+        Returns:
+            DuplicateClusters，数据未加载时返回None
+        """
+        start = time.time()
+        detector = NearDuplicateDetector(self.config.dedup_threshold)
+        if self.sqlite is not None:
+            source = self.sqlite.get_meta("source")
+            if source is None:
+                return None
+            store = SignatureStore(self.sqlite.db_path.with_suffix(".minhash.npz"))
+            key = SignatureStore.key(source, "sqlite", detector.signature_key)
+            texts = self.sqlite.iter_record_texts()
+        else:
+            if self.loader.source_fingerprint is None:
+                return None
+            columns = dedup_text_columns(self.loader.get_columns(), self.config.dedup_columns)
+            if not columns:
+                logger.warning("没有可用于近似去重的文本列")
+                return None
+            source_path = self._data_source_path()
+            store = SignatureStore(
+                self.delta_store.cache_dir
+                / f"{source_path.stem}_{DeltaStore.source_key(source_path)}.minhash.npz"
+            )
+            key = SignatureStore.key(
+                self.loader.source_fingerprint,
+                columns,
+                self.loader.valid_count(),
+                detector.signature_key,
+            )
+            # 生成器在计算签名时才读取数据，命中签名缓存时不读取
+            texts = (
+                text
+                for frame in self.loader.iter_valid_frames(columns)
+                for text in frame_texts(frame, columns)
+            )
+
+        signatures = store.load(key) if self.config.enable_cache else None
+        if signatures is None:
+            signatures = detector.signatures(texts)
+            if self.config.enable_cache:
+                store.save(key, signatures)
+        else:
+            logger.info(f"使用缓存的 MinHash 签名: {store.path}")
+
+        clusters = detector.cluster_signatures(signatures)
+        logger.info(f"近似去重耗时 {time.time() - start:.2f}秒")
+        return clusters
+
+    def skip_duplicates(
+        self, record_ids: List[int], labels: bool = False
+    ) -> Tuple[List[int], Dict[int, int]]:
+        """
+        每个重复簇只保留一条记录
+
+        Args:
+            record_ids: 记录ID列表
+            labels: record_ids 是 query() 返回的记录ID（DataFrame 索引）而不是有效数据中的位置
+
+        Returns:
+            (需要处理的记录ID, 跳过的记录ID -> 代替它处理的记录ID)，ID 与传入的一致
+        """
+        duplicates = self.get_duplicates()
+        if duplicates is None or not duplicates.clusters:
+            return list(record_ids), {}
+        if not labels or self.sqlite is not None:
+            return duplicates.split(record_ids)
+
+        positions = self.loader.valid_positions_of(record_ids)
+        # 不在有效数据中的ID保持原样，交给后续流程报错
+        keys = [int(p) if p >= 0 else None for p in positions]
+        to_label = {key: rid for key, rid in zip(keys, record_ids) if key is not None}
+        selected_positions, skipped_positions = duplicates.split(
+            key for key in keys if key is not None
+        )
+        selected_set = set(selected_positions)
+        selected = [rid for key, rid in zip(keys, record_ids) if key is None or key in selected_set]
+        skipped = {to_label[key]: to_label[sub] for key, sub in skipped_positions.items()}
+        return selected, skipped
+
+    # ==================== 增量处理接口 ====================
+
+    def compute_delta(self, stage: str) -> DatasetDelta:
+        """
+        计算当前数据相对某个阶段上次处理完成时的变化
+
+        Args:
+            stage: 处理阶段，如 "extraction"、"evaluation"
+
+        Returns:
+            DatasetDelta: 记录ID与 extract_experiences / get_records 使用的一致
+
+        Raises:
+            RuntimeError: SQLite 数据库中没有行指纹（需要重新导入）
+        """
+        if self.sqlite is not None:
+            if self.sqlite.get_meta("source") is None:
+                logger.warning("数据未加载，无法计算增量")
+                return DatasetDelta(stage=stage)
+            # 行指纹在导入时计算，不需要读取数据
+            fingerprints = self.sqlite.row_fingerprints()
+            if fingerprints is None:
+                raise RuntimeError(
+                    f"SQLite 数据库 {self.sqlite.db_path} 中没有行指纹，请删除后重新加载数据"
+                )
+        elif self.loader.source_fingerprint is None:
+            logger.warning("数据未加载，无法计算增量")
+            return DatasetDelta(stage=stage)
+        else:
+            # 分块模式下逐批读取内存映射的列式表，不物化整个数据集
+            builder = RowFingerprintBuilder(self.config.delta_key_columns)
+            for frame in self.loader.iter_valid_frames():
+                builder.add(frame)
+            fingerprints = builder.finish()
+
+        previous = self.delta_store.load(self._data_source_path(), stage)
+        delta = fingerprints.diff(previous, stage)
+
+        logger.info(
+            f"📊 {stage} 增量: 新增 {len(delta.added)}, 变化 {len(delta.changed)}, "
+            f"删除 {delta.removed}, 共 {delta.total_records} 条"
+        )
+        return delta
+
+    def commit_delta(self, delta: DatasetDelta, failed_ids: Optional[List[int]] = None):
+        """
+        处理完成后提交行指纹
+
+        Args:
+            delta: compute_delta 返回的增量
+            failed_ids: 未成功处理的记录ID，不提交，下次仍会作为待处理记录
+        """
+        if delta.fingerprints is None:
+            return
+
+        fingerprints = delta.fingerprints
+        if failed_ids:
+            fingerprints = fingerprints.without(failed_ids)
+        self.delta_store.commit(self._data_source_path(), delta.stage, fingerprints)
+
+    def extract_delta(
+        self,
+        mode: str = "incremental",
+        save_individual: bool = True,
+        auto_integrate: bool = True,
+        pack_records: bool = False,
+    ) -> ExtractionResult:
+        """
+        只对新增和变化的记录提取经验
+
+        全部处理完成后提交行指纹，提取失败的记录下次会重新提取。
+
+        Args:
+            mode: 提取模式
+            save_individual: 是否保存单个经验文件
+            auto_integrate: 是否自动整合
+            pack_records: 是否把多条较短的记录打包到一次请求中提取
+
+        Returns:
+            ExtractionResult: 提取结果
+        """
+        delta = self.compute_delta("extraction")
+        pending = delta.pending
+
+        if not pending:
+            logger.info("没有新增或变化的记录，跳过经验提取")
+            self.commit_delta(delta)
+            return ExtractionResult(
+                total_records=0,
+                successful_extractions=0,
+                failed_extractions=0,
+                experiences=[],
+            )
+
+        result = self.extract_experiences(
+            record_ids=pending,
+            mode=mode,
+            save_individual=save_individual,
+            auto_integrate=auto_integrate,
+            batch_size=len(pending),
+            pack_records=pack_records,
+        )
+
+        extracted = {experience.record_id for experience in result.experiences}
+        # 跳过的重复记录随代替它的记录一起算作已处理
+        extracted.update(
+            rid for rid, substitute in result.skipped_duplicates.items() if substitute in extracted
+        )
+        self.commit_delta(delta, [rid for rid in pending if rid not in extracted])
+        return result
+
+    def _data_source_path(self) -> Path:
+        if self.sqlite is not None:
+            return Path(self.sqlite.get_meta("source")[0])
+        return Path(self.loader.source_fingerprint[0])
+
+    def position_labels(self, positions: List[int]) -> List[int]:
+        """
+        把有效数据中的位置（增量、get_records 使用的记录ID）转换为 query() 返回的记录ID
+
+        Args:
+            positions: 有效数据中的位置
+
+        Returns:
+            query() 返回的记录ID，顺序与 positions 一致
+        """
+        if self.sqlite is not None:
+            # SQLite 中的记录ID就是有效数据中的位置
+            return list(positions)
+        return [int(label) for label in self.loader.valid_labels(positions)]
 
     # ==================== Checkpoint管理接口 ====================
 
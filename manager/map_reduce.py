@@ -0,0 +1,192 @@
+"""
+分层归并模块
+
+把大量经验文本按 token 预算分组，各组并行生成摘要，再逐层合并摘要，
+直到剩下的文本能放进一次请求。每层的请求并行发送，总延迟随经验数按对数增长；
+各组摘要按组内文本缓存，追加新经验后之前的分组可以直接复用。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from components.cost_estimator import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 一次请求中经验文本的 token 上限（不含提示词本身）
+DEFAULT_MAX_TOKENS = 12000
+
+DEFAULT_CACHE_DIR = "data/cache/integration"
+
+
+class Partial(NamedTuple):
+    """归并结果：文本及其覆盖的原始条目范围 [start, end)"""
+
+    text: str
+    start: int
+    end: int
+
+
+class SummaryCache:
+    """
+    分组摘要缓存
+
+    以命名空间（模型、提示词版本）和组内文本的 sha256 为键，原子写入，
+    多个进程可以共享缓存目录。
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(namespace: str, texts: Sequence[str]) -> str:
+        digest = hashlib.sha256(namespace.encode("utf-8"))
+        for text in texts:
+            digest.update(b"\x1e")
+            digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                text = json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "text": text}, f, ensure_ascii=False)
+        os.replace(tmp_path, entry_path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def pack_batches(texts: Sequence[str], max_tokens: int, max_items: int) -> List[List[int]]:
+    """
+    按顺序把文本分组
+
+    每组的 token 估计之和不超过 max_tokens、条数不超过 max_items；
+    单条就超出预算的文本单独成组。分组只依赖文本本身，末尾追加文本不影响前面的分组。
+
+    Returns:
+        各组文本的下标
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def tree_reduce(
+    texts: Sequence[str],
+    summarize: Callable[[List[str]], str],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    max_items: int = 10,
+    max_workers: int = 4,
+    cache: Optional[SummaryCache] = None,
+    namespace: str = "",
+) -> List[Partial]:
+    """
+    分层归并
+
+    文本总量超出 max_tokens 或条数超过 max_items 时，按预算分组并行调用 summarize，
+    用各组摘要代替原文本，重复直到剩下的文本能放进一次请求。
+
+    Args:
+        texts: 待归并的文本
+        summarize: 把一组文本合并为一段摘要，失败时应抛出异常（失败的摘要不会缓存）
+        max_tokens: 一次请求中文本的 token 上限
+        max_items: 一次请求中的文本条数上限
+        max_workers: 同一层并行的请求数
+        cache: 分组摘要缓存，None 表示不缓存
+        namespace: 缓存命名空间，模型或提示词变化时应随之变化
+
+    Returns:
+        能放进一次请求的文本，按原顺序排列，并标明各自覆盖的原始条目范围
+    """
+    current = [Partial(text, i, i + 1) for i, text in enumerate(texts)]
+    level = 0
+
+    def fits(items: List[Partial]) -> bool:
+        return (
+            len(items) <= max_items
+            and sum(estimate_tokens(item.text) for item in items) <= max_tokens
+        )
+
+    while len(current) > 1 and not fits(current):
+        batches = pack_batches([item.text for item in current], max_tokens, max_items)
+        if len(batches) == len(current):
+            # 每条都单独超出预算，两两合并，保证每一层条数都在减少
+            batches = [list(range(i, min(i + 2, len(current)))) for i in range(0, len(current), 2)]
+
+        merged: List[Optional[Partial]] = [None] * len(batches)
+        pending = []
+        for i, batch in enumerate(batches):
+            group = [current[j] for j in batch]
+            span = (group[0].start, group[-1].end)
+            if len(group) == 1:
+                merged[i] = group[0]
+                continue
+            group_texts = [item.text for item in group]
+            key = SummaryCache.key(namespace, group_texts) if cache else None
+            cached = cache.get(key) if cache else None
+            if cached is not None:
+                merged[i] = Partial(cached, *span)
+            else:
+                pending.append((i, group_texts, key, span))
+
+        level += 1
+        logger.info(
+            f"分层归并第 {level} 层: {len(current)} 条 -> {len(batches)} 组，"
+            f"需要请求 {len(pending)} 组，缓存命中 {len(batches) - len(pending) - sum(len(b) == 1 for b in batches)} 组"
+        )
+
+        if pending:
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(max_workers, len(pending))), thread_name_prefix="reduce"
+            ) as pool:
+                summaries = list(pool.map(lambda item: summarize(item[1]), pending))
+            for (i, _, key, span), summary in zip(pending, summaries):
+                merged[i] = Partial(summary, *span)
+                if cache:
+                    cache.put(key, summary)
+
+        current = merged
+
+    return current
@@ -5,7 +5,7 @@
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Sequence, Tuple, Union
 from datetime import datetime
 from enum import Enum
 
@@ -75,16 +75,7 @@ class Record:
             evaluation=str(row_data.get("First Round Interview Evaluation", "")),
             position=row_data.get("Job Title"),
             metadata={
-                k: v
-                for k, v in row_data.items()
-                if k
-                not in [
-                    "Candidate Resume",
-                    "Job Description",
-                    "First Round Interview Dialogue",
-                    "First Round Interview Evaluation",
-                    "Job Title",
-                ]
+                k: v for k, v in row_data.items() if k not in RECORD_CORE_COLUMNS
             },
         )
 
@@ -93,6 +84,126 @@ class Record:
         return bool(self.resume and self.jd and self.conversation and self.evaluation)
 
 
+# Record 字段 -> 数据列
+RECORD_TEXT_COLUMNS = {
+    "resume": "Candidate Resume",
+    "jd": "Job Description",
+    "conversation": "First Round Interview Dialogue",
+    "evaluation": "First Round Interview Evaluation",
+}
+RECORD_POSITION_COLUMN = "Job Title"
+RECORD_CORE_COLUMNS = frozenset(RECORD_TEXT_COLUMNS.values()) | {RECORD_POSITION_COLUMN}
+
+
+class RecordView:
+    """
+    面试记录视图
+
+    与 Record 接口相同，但不复制数据：多个视图共享同一组列数组，
+    各自只保存行号，字段在访问时才从列中取值，metadata 在首次访问时才组装。
+    适合分页浏览、搜索结果等大量创建记录的场景。
+    """
+
+    __slots__ = ("id", "_columns", "_row", "_metadata")
+
+    def __init__(self, record_id: int, columns: Dict[str, Sequence], row: int):
+        """
+        Args:
+            record_id: 记录ID
+            columns: 列名 -> 列数组（多个视图共享）
+            row: 在列数组中的行号
+        """
+        self.id = record_id
+        self._columns = columns
+        self._row = row
+        self._metadata = None
+
+    @classmethod
+    def from_frame(
+        cls, df, ids: Optional[Iterable[int]] = None
+    ) -> List["RecordView"]:
+        """
+        批量创建视图
+
+        每列只取一次底层数组，之后每条记录只是一个行号。
+
+        Args:
+            df: 数据DataFrame
+            ids: 记录ID，默认使用 DataFrame 的索引
+
+        Returns:
+            RecordView 列表
+        """
+        columns = {col: df[col].to_numpy() for col in df.columns}
+        if ids is None:
+            ids = df.index.tolist()
+        return [cls(record_id, columns, row) for row, record_id in enumerate(ids)]
+
+    def _text(self, column: str) -> str:
+        values = self._columns.get(column)
+        if values is None:
+            return ""
+        return str(values[self._row])
+
+    @property
+    def resume(self) -> str:
+        return self._text(RECORD_TEXT_COLUMNS["resume"])
+
+    @property
+    def jd(self) -> str:
+        return self._text(RECORD_TEXT_COLUMNS["jd"])
+
+    @property
+    def conversation(self) -> str:
+        return self._text(RECORD_TEXT_COLUMNS["conversation"])
+
+    @property
+    def evaluation(self) -> str:
+        return self._text(RECORD_TEXT_COLUMNS["evaluation"])
+
+    @property
+    def position(self) -> Optional[str]:
+        values = self._columns.get(RECORD_POSITION_COLUMN)
+        return None if values is None else values[self._row]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {
+                col: values[self._row]
+                for col, values in self._columns.items()
+                if col not in RECORD_CORE_COLUMNS
+            }
+        return self._metadata
+
+    def get(self, column: str, default: Any = None) -> Any:
+        """按列名取值"""
+        values = self._columns.get(column)
+        return default if values is None else values[self._row]
+
+    def is_valid(self) -> bool:
+        """检查记录是否包含完整信息"""
+        return bool(self.resume and self.jd and self.conversation and self.evaluation)
+
+    def to_record(self) -> Record:
+        """转换为独立的 Record 对象"""
+        return Record(
+            id=self.id,
+            resume=self.resume,
+            jd=self.jd,
+            conversation=self.conversation,
+            evaluation=self.evaluation,
+            position=self.position,
+            metadata=dict(self.metadata),
+        )
+
+    def __repr__(self) -> str:
+        return f"RecordView(id={self.id!r}, position={self.position!r})"
+
+
+RecordLike = Union[Record, RecordView]
+
+
 @dataclass
 class Experience:
     """提取的面试经验数据模型"""
@@ -128,6 +239,38 @@ class Experience:
         )
 
 
+@dataclass
+class IntegrationState:
+    """持久化的经验整合状态（滚动摘要）"""
+
+    summary: str  # 当前的整合结果
+    experience_ids: List[str] = field(default_factory=list)  # 已整合进 summary 的经验ID
+    version: int = 0  # 每次更新递增
+    mode: str = "incremental"  # 最近一次更新使用的整合模式
+    updated_at: datetime = field(default_factory=datetime.now)  # 最近一次更新时间
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {
+            "summary": self.summary,
+            "experience_ids": self.experience_ids,
+            "version": self.version,
+            "mode": self.mode,
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IntegrationState":
+        """从字典创建IntegrationState对象"""
+        return cls(
+            summary=data["summary"],
+            experience_ids=data.get("experience_ids", []),
+            version=data.get("version", 0),
+            mode=data.get("mode", "incremental"),
+            updated_at=datetime.fromisoformat(data["updated_at"]),
+        )
+
+
 @dataclass
 class ExtractionParams:
     """经验提取参数"""
@@ -138,6 +281,7 @@ class ExtractionParams:
     auto_integrate: bool = True  # 是否自动整合
     prompt_template: Optional[str] = None  # 自定义提示词模板
     batch_size: int = 5  # 批处理大小
+    pack_records: bool = False  # 把多条较短的记录打包到一次请求中提取
 
     def __post_init__(self):
         """确保mode是ExtractionMode枚举"""
@@ -161,6 +305,13 @@ class TokenStats:
         self.total_cost += cost
         self.api_calls += 1
 
+    def merge(self, other: "TokenStats"):
+        """合并另一份统计（如单次调用的统计并入批次统计）"""
+        self.total_input_tokens += other.total_input_tokens
+        self.total_output_tokens += other.total_output_tokens
+        self.total_cost += other.total_cost
+        self.api_calls += other.api_calls
+
     def to_dict(self) -> Dict:
         """转换为字典"""
         return {
@@ -186,7 +337,7 @@ class SearchQuery:
 class QueryResult:
     """查询结果"""
 
-    records: List[Record]  # 记录列表
+    records: List[RecordLike]  # 记录列表
     total: int  # 总记录数
     page: int  # 当前页码
     page_size: int  # 每页大小
@@ -221,6 +372,93 @@ class StatisticsResult:
         }
 
 
+@dataclass
+class DatasetDelta:
+    """数据集相对上次处理的变化"""
+
+    stage: str  # 处理阶段（如 "extraction"、"evaluation"），各阶段分别记录进度
+    added: List[int] = field(default_factory=list)  # 新增记录ID
+    changed: List[int] = field(default_factory=list)  # 内容变化的记录ID
+    removed: int = 0  # 已删除的记录数
+    total_records: int = 0  # 当前有效记录数
+    fingerprints: Any = None  # 当前数据的行指纹，处理完成后提交
+
+    @property
+    def pending(self) -> List[int]:
+        """需要处理的记录ID（新增和变化）"""
+        return sorted(self.added + self.changed)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.added and not self.changed and not self.removed
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {
+            "stage": self.stage,
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": self.removed,
+            "unchanged": self.total_records - len(self.added) - len(self.changed),
+            "total_records": self.total_records,
+        }
+
+
+@dataclass
+class DuplicateClusters:
+    """近似重复记录的聚类结果"""
+
+    clusters: List[List[int]] = field(default_factory=list)  # 包含两条及以上记录的簇，每簇记录ID升序
+    total_records: int = 0  # 参与检测的记录数
+    threshold: float = 0.0  # 判定为重复的相似度阈值
+
+    def __post_init__(self):
+        # 记录ID -> 所在簇的代表记录（簇内最小的ID）
+        self._representative: Dict[int, int] = {
+            record_id: cluster[0] for cluster in self.clusters for record_id in cluster
+        }
+
+    @property
+    def duplicate_count(self) -> int:
+        """可以跳过的记录数（每簇只处理一条）"""
+        return sum(len(cluster) - 1 for cluster in self.clusters)
+
+    def representative_of(self, record_id: int) -> int:
+        """记录所在簇的代表记录，不属于任何簇时返回自身"""
+        return self._representative.get(record_id, record_id)
+
+    def split(self, record_ids: Iterable[int]) -> Tuple[List[int], Dict[int, int]]:
+        """
+        把一批记录分为需要处理的记录和可以跳过的重复记录
+
+        每个簇只保留这批记录中最先出现的一条，代表记录不在这批记录中时也是如此。
+
+        Returns:
+            (需要处理的记录ID, 跳过的记录ID -> 代替它处理的记录ID)
+        """
+        selected: List[int] = []
+        skipped: Dict[int, int] = {}
+        chosen: Dict[int, int] = {}
+        for record_id in record_ids:
+            cluster_key = self.representative_of(record_id)
+            if cluster_key in chosen:
+                skipped[record_id] = chosen[cluster_key]
+            else:
+                chosen[cluster_key] = record_id
+                selected.append(record_id)
+        return selected, skipped
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {
+            "total_records": self.total_records,
+            "clusters": len(self.clusters),
+            "duplicate_records": self.duplicate_count,
+            "threshold": self.threshold,
+            "largest_cluster": max((len(cluster) for cluster in self.clusters), default=0),
+        }
+
+
 @dataclass
 class ExtractionResult:
     """经验提取结果"""
@@ -233,6 +471,12 @@ class ExtractionResult:
     token_stats: TokenStats = field(default_factory=TokenStats)  # Token统计
     errors: List[str] = field(default_factory=list)  # 错误信息列表
     timestamp: datetime = field(default_factory=datetime.now)  # 提取时间
+    skipped_duplicates: Dict[int, int] = field(default_factory=dict)  # 跳过的重复记录ID -> 代替它提取的记录ID
+
+    @property
+    def saved_calls(self) -> int:
+        """因跳过重复记录而省下的模型调用次数"""
+        return len(self.skipped_duplicates)
 
     def to_dict(self) -> Dict:
         """转换为字典"""
@@ -240,6 +484,8 @@ class ExtractionResult:
             "total_records": self.total_records,
             "successful_extractions": self.successful_extractions,
             "failed_extractions": self.failed_extractions,
+            "skipped_duplicates": self.skipped_duplicates,
+            "saved_calls": self.saved_calls,
             "experiences": [exp.to_dict() for exp in self.experiences],
             "integrated_experience": self.integrated_experience,
             "token_stats": self.token_stats.to_dict(),
@@ -306,15 +552,43 @@ class ManagerConfig:
     batch_size: int = 10
     max_workers: int = 4
     timeout: int = 300  # API调用超时时间（秒）
+    integration_max_tokens: int = 12000  # 经验整合时一次请求中经验文本的 token 上限，超出时分层归并
+    pack_max_tokens: int = 16000  # 打包提取时一次请求的输入 token 上限，单条超出的记录单独提取
 
     # 缓存配置
     enable_cache: bool = True
     cache_ttl: int = 3600  # 缓存过期时间（秒）
+    columnar_cache_dir: str = "data/cache/columnar"  # 清洗后数据的列式缓存目录（需要 pyarrow）
+    integration_cache_dir: str = "data/cache/integration"  # 经验整合的分组摘要缓存目录
+
+    # 分块读取配置（数据集大于内存时使用）
+    chunk_size: Optional[int] = None  # 每块读取的行数，None 表示一次读入
+    chunk_dtypes: Optional[Dict[str, str]] = None  # 分块读取时各列的类型，None 表示全部按字符串读取
+
+    # 内存配置
+    compact_dtypes: bool = True  # 加载后把列转换为更省内存的类型（分类、Arrow 字符串、可空小整数）
+
+    # 存储后端配置
+    storage_backend: str = "pandas"  # "pandas"（内存 DataFrame）或 "sqlite"（嵌入式数据库，适合大规模归档）
+    sqlite_path: str = "data/interviews.db"  # SQLite 数据库文件
+
+    # 增量处理配置
+    delta_key_columns: List[str] = field(
+        default_factory=lambda: ["Candidate Resume", "Job Title"]
+    )  # 识别同一条记录的列，其余列变化视为记录内容变化
+
+    # 近似去重配置（经验提取和批量评估时每个重复簇只处理一条记录）
+    dedup_enabled: bool = True
+    dedup_threshold: float = 0.9  # 估计的 Jaccard 相似度不低于该值视为重复
+    dedup_columns: Optional[List[str]] = None  # 参与比较的文本列，None 表示简历和各轮面试对话
 
     # 日志配置
     log_level: str = "INFO"
     log_file: Optional[str] = None
 
+    # 监控配置
+    status_file: Optional[str] = None  # 批处理进度状态文件（JSON），供外部进程轮询
+
     def validate(self) -> ValidationResult:
         """验证配置"""
         errors = []
@@ -332,6 +606,21 @@ class ManagerConfig:
         if self.cache_ttl < 0:
             errors.append("cache_ttl不能为负数")
 
+        if self.pack_max_tokens <= 0:
+            errors.append("pack_max_tokens必须大于0")
+
+        if self.integration_max_tokens <= 0:
+            errors.append("integration_max_tokens必须大于0")
+
+        if self.chunk_size is not None and self.chunk_size <= 0:
+            errors.append("chunk_size必须大于0")
+
+        if self.storage_backend not in ("pandas", "sqlite"):
+            errors.append("storage_backend必须是 pandas 或 sqlite")
+
+        if not 0 < self.dedup_threshold <= 1:
+            errors.append("dedup_threshold必须在 (0, 1] 之间")
+
         is_valid = len(errors) == 0
 
         return ValidationResult(
@@ -356,6 +645,14 @@ class DataLoadResult:
     errors: List[str] = field(default_factory=list)  # 错误信息
     warnings: List[str] = field(default_factory=list)  # 警告信息
     load_time: float = 0.0  # 加载耗时（秒）
+    memory_report: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # 各列类型转换前后的内存占用
+
+    @property
+    def memory_saved(self) -> int:
+        """类型压缩节省的内存（字节）"""
+        return sum(
+            item["before"] - item["after"] for item in self.memory_report.values()
+        )
 
     def to_dict(self) -> Dict:
         """转换为字典"""
@@ -368,4 +665,5 @@ class DataLoadResult:
             "errors": self.errors,
             "warnings": self.warnings,
             "load_time": self.load_time,
+            "memory_report": self.memory_report,
         }
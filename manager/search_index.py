@@ -0,0 +1,328 @@
+"""
+全文检索模块
+
+为简历、JD、岗位、各轮面试对话和评价等文本列建立倒排索引。中文按相邻两字切分（bigram），
+英文和数字按单词切分，查询时只检查候选文档，不再逐行扫描全部文本。
+匹配语义与逐行扫描（str.contains）一致：查询词是原文的子串即命中，
+英文词会匹配包含它的单词（如 "py" 命中 "python"）。
+"""
+
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from manager.models import RECORD_POSITION_COLUMN, RECORD_TEXT_COLUMNS
+
+# 中日韩统一表意文字（含扩展A区和兼容区）
+_CJK_CHARS = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_CJK_PATTERN = re.compile(f"[{_CJK_CHARS}]")
+_TOKEN_PATTERN = re.compile(f"[{_CJK_CHARS}]+|[0-9a-z]+")
+_LATIN_PATTERN = re.compile("[0-9a-z]+")
+
+# 查询语法：带引号的短语或普通词
+_QUERY_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+_OR_KEYWORDS = {"OR", "|"}
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """
+    切分文本
+
+    中文连续片段产生相邻两字的组合，单个汉字保持原样；英文和数字按单词切分并转小写。
+    """
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        run = match.group()
+        if _CJK_PATTERN.match(run):
+            if len(run) == 1:
+                yield run
+            else:
+                for i in range(len(run) - 1):
+                    yield run[i : i + 2]
+        else:
+            yield run
+
+
+class _Term:
+    """查询中的一个词或短语"""
+
+    __slots__ = ("text", "tokens", "verify")
+
+    def __init__(self, text: str, phrase: bool):
+        self.text = text.lower()
+        self.tokens = list(dict.fromkeys(tokenize(text)))
+        # 词本身不是单个索引项时，需要在候选文档原文中确认连续出现
+        self.verify = phrase or self.tokens != [self.text]
+
+
+def parse_query(query: str) -> List[List[_Term]]:
+    """
+    解析查询
+
+    空格分隔的词之间是 AND，OR 或 | 分隔不同的组，双引号括起来的是短语。
+
+    Returns:
+        各组的词列表，任意一组全部命中即匹配
+    """
+    groups: List[List[_Term]] = [[]]
+    for match in _QUERY_PATTERN.finditer(query):
+        phrase, word = match.groups()
+        if word in _OR_KEYWORDS:
+            groups.append([])
+            continue
+        term = _Term(phrase if phrase is not None else word, phrase is not None)
+        if term.tokens:
+            groups[-1].append(term)
+    return [group for group in groups if group]
+
+
+class SearchIndex:
+    """
+    面试记录倒排索引
+
+    功能:
+    - 按字段分别建立索引，每个词项保存文档ID数组和词频数组
+    - 支持 AND / OR / 短语查询
+    - 英文词按子串匹配词表中的单词，结果与逐行扫描一致
+    - 按字段权重、词频和逆文档频率排序
+    - 新数据到达时增量添加，文档ID按添加顺序递增
+    """
+
+    # 各字段的排序权重，未列出的列权重为 1.0
+    FIELD_WEIGHTS = {
+        RECORD_TEXT_COLUMNS["resume"]: 3.0,
+        RECORD_TEXT_COLUMNS["jd"]: 2.0,
+        RECORD_POSITION_COLUMN: 2.0,
+        RECORD_TEXT_COLUMNS["evaluation"]: 1.5,
+        "Second Round Interview Evaluation": 1.5,
+        "Final Round Interview Evaluation": 1.5,
+        RECORD_TEXT_COLUMNS["conversation"]: 1.0,
+        "Second Round Interview Dialogue": 1.0,
+        "Final Round Interview Dialogue": 1.0,
+    }
+
+    def __init__(self, fields: Optional[Sequence[str]] = None):
+        """
+        初始化索引
+
+        Args:
+            fields: 要索引的列，None 表示 FIELD_WEIGHTS 中的列（简历、JD、岗位、各轮对话和评价）
+        """
+        self.fields = list(fields or self.FIELD_WEIGHTS)
+        # 字段 -> 词项 -> (文档ID数组, 词频数组)
+        self._postings: Dict[str, Dict[str, Tuple[array, array]]] = {
+            field: {} for field in self.fields
+        }
+        # 字段 -> 原文引用，用于短语确认
+        self._texts: Dict[str, List[str]] = {field: [] for field in self.fields}
+        # 字段 -> 英文查询词 -> 包含它的全部单词合并后的倒排表，添加文档后清空
+        self._expanded: Dict[str, Dict[str, Optional[Tuple[array, array]]]] = {
+            field: {} for field in self.fields
+        }
+        self.size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_frame(cls, df) -> "SearchIndex":
+        """索引 df 的全部文本列（与不指定字段时逐行扫描的列一致）"""
+        return cls(list(df.select_dtypes(include=["object", "string", "category"]).columns))
+
+    def add(self, columns: Dict[str, Sequence]) -> int:
+        """
+        增量添加文档
+
+        Args:
+            columns: 列名 -> 文本数组，各数组长度相同，缺少的列视为空文本
+
+        Returns:
+            第一个新文档的ID
+        """
+        lengths = {len(values) for values in columns.values()}
+        count = lengths.pop() if lengths else 0
+
+        with self._lock:
+            start = self.size
+            for field in self.fields:
+                values = columns.get(field)
+                postings = self._postings[field]
+                texts = self._texts[field]
+                for offset in range(count):
+                    text = values[offset] if values is not None else ""
+                    if not isinstance(text, str):
+                        text = ""
+                    texts.append(text)
+                    doc_id = start + offset
+                    for token, tf in Counter(tokenize(text)).items():
+                        entry = postings.get(token)
+                        if entry is None:
+                            entry = postings[token] = (array("I"), array("I"))
+                        entry[0].append(doc_id)
+                        entry[1].append(tf)
+                self._expanded[field].clear()
+            self.size = start + count
+        return start
+
+    def add_frame(self, df) -> int:
+        """从 DataFrame 增量添加文档，行顺序即文档ID顺序"""
+        return self.add({field: df[field].to_numpy() for field in self.fields if field in df.columns})
+
+    def resolve_fields(self, fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+        """
+        把查询字段转换为索引字段
+
+        支持列名和 Record 字段名（如 "resume"）。
+
+        Returns:
+            索引字段列表，包含未索引的字段时返回None
+        """
+        if not fields:
+            return list(self.fields)
+        resolved = []
+        for field in fields:
+            column = RECORD_TEXT_COLUMNS.get(field, field)
+            if column not in self._postings:
+                return None
+            resolved.append(column)
+        return resolved
+
+    def search(
+        self, query: str, fields: Optional[Iterable[str]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        搜索
+
+        Args:
+            query: 查询字符串
+            fields: 搜索字段，None 表示全部索引字段
+
+        Returns:
+            按得分从高到低排列的 (文档ID, 得分)
+        """
+        search_fields = self.resolve_fields(fields)
+        if search_fields is None:
+            raise KeyError(f"字段未建立索引: {fields}")
+
+        scores: Dict[int, float] = {}
+        with self._lock:
+            for group in parse_query(query):
+                group_scores = self._match_group(group, search_fields)
+                for doc_id, score in group_scores.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def _match_group(self, group: List[_Term], fields: List[str]) -> Dict[int, float]:
+        """一组词全部命中的文档及得分"""
+        result: Optional[Dict[int, float]] = None
+        for term in group:
+            term_scores = self._match_term(term, fields)
+            if result is None:
+                result = term_scores
+            else:
+                result = {
+                    doc_id: score + term_scores[doc_id]
+                    for doc_id, score in result.items()
+                    if doc_id in term_scores
+                }
+            if not result:
+                return {}
+        return result or {}
+
+    def _match_term(self, term: _Term, fields: List[str]) -> Dict[int, float]:
+        """命中一个词的文档及得分（任意字段命中即可）"""
+        per_field: List[Tuple[str, Dict[int, int]]] = []
+        matched: Set[int] = set()
+        for field in fields:
+            frequencies = self._term_frequencies(term, field)
+            if frequencies:
+                per_field.append((field, frequencies))
+                matched.update(frequencies)
+
+        if not matched:
+            return {}
+
+        idf = math.log(1 + self.size / len(matched))
+        scores: Dict[int, float] = {}
+        for field, frequencies in per_field:
+            weight = self.FIELD_WEIGHTS.get(field, 1.0) * idf
+            for doc_id, tf in frequencies.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * (1 + math.log(tf))
+        return scores
+
+    def _term_frequencies(self, term: _Term, field: str) -> Dict[int, int]:
+        """一个字段中包含该词的文档 -> 近似词频（各词项词频的最小值）"""
+        postings = self._postings[field]
+        entries = []
+        for token in term.tokens:
+            if len(token) == 1 and _CJK_PATTERN.match(token):
+                # 单个汉字大多只出现在与相邻字组成的 bigram 中
+                entry = self._single_char_entry(postings, token)
+            elif _LATIN_PATTERN.fullmatch(token):
+                entry = self._latin_entry(field, token)
+            else:
+                entry = postings.get(token)
+            if entry is None:
+                return {}
+            entries.append(entry)
+
+        # 从最短的倒排表开始求交集
+        entries.sort(key=lambda entry: len(entry[0]))
+        frequencies = dict(zip(entries[0][0], entries[0][1]))
+        for docs, tfs in entries[1:]:
+            if not frequencies:
+                return {}
+            frequencies = {
+                doc_id: min(tf, frequencies[doc_id])
+                for doc_id, tf in zip(docs, tfs)
+                if doc_id in frequencies
+            }
+
+        if term.verify and frequencies:
+            texts = self._texts[field]
+            frequencies = {
+                doc_id: tf
+                for doc_id, tf in frequencies.items()
+                if term.text in texts[doc_id].lower()
+            }
+        return frequencies
+
+    def _single_char_entry(
+        self, postings: Dict[str, Tuple[array, array]], char: str
+    ) -> Optional[Tuple[array, array]]:
+        """合并包含该汉字的所有 bigram 的倒排表"""
+        return self._merge_entries(postings, char)
+
+    def _latin_entry(self, field: str, word: str) -> Optional[Tuple[array, array]]:
+        """
+        合并包含该英文词的所有单词的倒排表（调用方持有锁）
+
+        逐行扫描按子串匹配，"py" 也应命中 "python"；词表远小于文档数，扫描词表代价很小。
+        """
+        expanded = self._expanded[field]
+        if word not in expanded:
+            expanded[word] = self._merge_entries(self._postings[field], word)
+        return expanded[word]
+
+    @staticmethod
+    def _merge_entries(
+        postings: Dict[str, Tuple[array, array]], part: str
+    ) -> Optional[Tuple[array, array]]:
+        """合并包含 part 的所有词项的倒排表，词频相加"""
+        merged: Dict[int, int] = {}
+        for token, (docs, tfs) in postings.items():
+            if part in token:
+                for doc_id, tf in zip(docs, tfs):
+                    merged[doc_id] = merged.get(doc_id, 0) + tf
+        if not merged:
+            return None
+        doc_ids = sorted(merged)
+        return array("I", doc_ids), array("I", (merged[doc_id] for doc_id in doc_ids))
+
+    def stats(self) -> Dict[str, int]:
+        """索引规模"""
+        return {
+            "documents": self.size,
+            **{f"terms:{field}": len(postings) for field, postings in self._postings.items()},
+        }
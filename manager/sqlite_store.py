@@ -0,0 +1,775 @@
+"""
+SQLite 存储模块
+
+把面试记录、各轮对话和评估结果保存在嵌入式 SQLite 数据库中，
+查询、搜索、分页和统计都在 SQL 中完成，打开大规模归档时不需要把数据读入内存。
+"""
+
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from manager.delta import RowFingerprintBuilder, RowFingerprints
+from manager.models import (
+    RECORD_POSITION_COLUMN,
+    RECORD_TEXT_COLUMNS,
+    QueryResult,
+    Record,
+)
+from manager.search_index import parse_query
+
+logger = logging.getLogger(__name__)
+
+# 面试轮次，对应 "<轮次> Interview Dialogue" / "<轮次> Interview Evaluation" / "<轮次> Result" 列
+ROUNDS = ["First Round", "Second Round", "Final Round"]
+
+# 从 CSV 导入时每块的行数（未配置 chunk_size 时）
+IMPORT_CHUNK_SIZE = 10000
+
+# trigram 分词器只能索引至少 3 个字符的词，更短的词改用 LIKE
+FTS_MIN_CHARS = 3
+
+# 数据库结构版本，结构或行指纹的计算方式变化后已有数据库会重新导入
+SCHEMA_VERSION = 4
+
+# 全文索引列 -> 排序权重（与 SearchIndex.FIELD_WEIGHTS 一致）
+# dialogue / evaluation 包含各轮内容，other 包含各轮面试结果和其他文本列，
+# 不指定字段时的搜索范围与 pandas 后端（全部文本列）一致
+FTS_COLUMNS = {
+    "resume": 3.0,
+    "jd": 2.0,
+    "position": 2.0,
+    "dialogue": 1.0,
+    "evaluation": 1.5,
+    "other": 1.0,
+}
+
+# 查询字段（列名或 Record 字段名）-> 全文索引列
+_FIELD_ALIASES = {
+    "resume": "resume",
+    RECORD_TEXT_COLUMNS["resume"]: "resume",
+    "jd": "jd",
+    RECORD_TEXT_COLUMNS["jd"]: "jd",
+    "position": "position",
+    RECORD_POSITION_COLUMN: "position",
+    "conversation": "dialogue",
+    "dialogue": "dialogue",
+    "evaluation": "evaluation",
+    **{f"{round_name} Interview Dialogue": "dialogue" for round_name in ROUNDS},
+    **{f"{round_name} Interview Evaluation": "evaluation" for round_name in ROUNDS},
+    **{f"{round_name} Result": "other" for round_name in ROUNDS},
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    position TEXT,
+    intelligence REAL,
+    resume TEXT NOT NULL,
+    jd TEXT NOT NULL,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS dialogues (
+    record_id INTEGER NOT NULL REFERENCES records(id),
+    round TEXT NOT NULL,
+    dialogue TEXT,
+    evaluation TEXT,
+    result TEXT,
+    PRIMARY KEY (record_id, round)
+);
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_id INTEGER NOT NULL REFERENCES records(id),
+    round TEXT NOT NULL,
+    result TEXT NOT NULL,
+    evaluated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS row_fingerprints (
+    record_id INTEGER PRIMARY KEY REFERENCES records(id),
+    key INTEGER NOT NULL,
+    content INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_position ON records(position);
+CREATE INDEX IF NOT EXISTS idx_dialogues_round_result ON dialogues(round, result);
+CREATE INDEX IF NOT EXISTS idx_evaluations_record ON evaluations(record_id, round);
+"""
+
+# 无内容（contentless）全文索引，列顺序即 bm25 权重顺序
+_FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+    f"{', '.join(FTS_COLUMNS)}, tokenize='trigram', content='')"
+)
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _fts_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SQLiteStore:
+    """
+    SQLite 面试数据存储
+
+    功能:
+    - 从 CSV 分块导入，数据源未变化时直接打开已有数据库
+    - 岗位、轮次、面试结果建有索引，简历/JD/对话/评价建有 FTS5 trigram 全文索引
+    - query / search / statistics 的过滤、分页和聚合都在 SQL 中完成
+    - 导入时计算每条记录的行指纹，增量处理不需要把数据读入内存
+    - 保存评估结果
+    """
+
+    def __init__(self, db_path: str):
+        """
+        初始化存储
+
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(_FTS_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ==================== 导入 ====================
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def _set_meta(self, values: Dict[str, Any]):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()],
+        )
+
+    def is_current(self, source_fingerprint: Tuple) -> bool:
+        """数据库是否由当前数据源按当前结构导入"""
+        return (
+            self.get_meta("schema_version") == SCHEMA_VERSION
+            and self.get_meta("source") == list(source_fingerprint)
+        )
+
+    def import_chunks(
+        self,
+        chunks: Iterable,
+        source_fingerprint: Tuple,
+        encoding: str = "",
+        key_columns: Optional[List[str]] = None,
+    ) -> int:
+        """
+        重新导入数据
+
+        在一个事务中清空旧数据并逐块写入，中途失败时保留原数据库内容。
+
+        Args:
+            chunks: 清洗后的有效行 DataFrame 序列
+            source_fingerprint: 数据源文件指纹 (路径, 大小, 修改时间)
+            encoding: 数据源编码
+            key_columns: 行指纹中识别同一条记录的列，None 表示全部列
+
+        Returns:
+            导入的记录数
+        """
+        start = time.time()
+        count = 0
+        columns: List[str] = []
+        intelligence_column = None
+        result_columns: List[str] = []
+        key_columns = list(key_columns or [])
+        fingerprints = RowFingerprintBuilder(key_columns)
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                for table in ("row_fingerprints", "evaluations", "dialogues", "records", "meta"):
+                    self._conn.execute(f"DELETE FROM {table}")
+                # 无内容（contentless）全文索引不支持 DELETE，重建（旧版本数据库的索引列也可能不同）
+                self._conn.execute("DROP TABLE IF EXISTS records_fts")
+                self._conn.execute(_FTS_SCHEMA)
+
+                for chunk in chunks:
+                    if not columns:
+                        columns = list(chunk.columns)
+                        intelligence_column = next(
+                            (col for col in columns if "Intelligence" in col), None
+                        )
+                        result_columns = [col for col in columns if "Result" in col]
+                    self._insert_chunk(chunk, count, intelligence_column)
+                    fingerprints.add(chunk)
+                    count += len(chunk)
+
+                # 出现序号依赖全部数据，全部数据块写入后再保存行指纹
+                rows = fingerprints.finish()
+                self._conn.executemany(
+                    "INSERT INTO row_fingerprints (record_id, key, content) VALUES (?, ?, ?)",
+                    zip(
+                        range(len(rows)),
+                        rows.keys.view(np.int64).tolist(),
+                        rows.contents.view(np.int64).tolist(),
+                    ),
+                )
+
+                self._set_meta(
+                    {
+                        "schema_version": SCHEMA_VERSION,
+                        "source": list(source_fingerprint),
+                        "encoding": encoding,
+                        "columns": columns,
+                        "intelligence_column": intelligence_column,
+                        "result_columns": result_columns,
+                        "records": count,
+                        "delta_key_columns": key_columns,
+                    }
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._conn.execute("PRAGMA optimize")
+
+        logger.info(f"SQLite 导入完成: {count} 条记录, 耗时 {time.time() - start:.2f}秒")
+        return count
+
+    def _insert_chunk(self, chunk, first_id: int, intelligence_column: Optional[str]):
+        round_columns = {
+            col
+            for round_name in ROUNDS
+            for col in (
+                f"{round_name} Interview Dialogue",
+                f"{round_name} Interview Evaluation",
+                f"{round_name} Result",
+            )
+        }
+        core_columns = set(RECORD_TEXT_COLUMNS.values()) | {RECORD_POSITION_COLUMN}
+        extra_columns = [
+            col
+            for col in chunk.columns
+            if col not in round_columns and col not in core_columns and col != intelligence_column
+        ]
+
+        records, dialogues, fts_rows = [], [], []
+        for offset, row in enumerate(chunk.to_dict("records")):
+            record_id = first_id + offset
+            values = {k: (None if _is_missing(v) else v) for k, v in row.items()}
+
+            intelligence = None
+            if intelligence_column:
+                try:
+                    intelligence = float(values.get(intelligence_column))
+                except (TypeError, ValueError):
+                    intelligence = None
+
+            records.append(
+                (
+                    record_id,
+                    values.get(RECORD_POSITION_COLUMN),
+                    intelligence,
+                    str(values.get(RECORD_TEXT_COLUMNS["resume"]) or ""),
+                    str(values.get(RECORD_TEXT_COLUMNS["jd"]) or ""),
+                    json.dumps(
+                        {col: values.get(col) for col in extra_columns},
+                        ensure_ascii=False,
+                        default=str,
+                    ),
+                )
+            )
+
+            round_dialogues, round_evaluations = [], []
+            # 各轮面试结果和其他文本列
+            other_texts = [
+                value for value in (values.get(col) for col in extra_columns) if isinstance(value, str)
+            ]
+            for round_name in ROUNDS:
+                dialogue = values.get(f"{round_name} Interview Dialogue")
+                evaluation = values.get(f"{round_name} Interview Evaluation")
+                result = values.get(f"{round_name} Result")
+                if dialogue is None and evaluation is None and result is None:
+                    continue
+                dialogues.append((record_id, round_name, dialogue, evaluation, result))
+                round_dialogues.append(str(dialogue or ""))
+                round_evaluations.append(str(evaluation or ""))
+                if result is not None:
+                    other_texts.append(str(result))
+
+            fts_rows.append(
+                (
+                    record_id,
+                    records[-1][3],
+                    records[-1][4],
+                    str(records[-1][1] or ""),
+                    "\n".join(round_dialogues),
+                    "\n".join(round_evaluations),
+                    "\n".join(other_texts),
+                )
+            )
+
+        self._conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?)", records)
+        self._conn.executemany(
+            "INSERT INTO dialogues (record_id, round, dialogue, evaluation, result) VALUES (?, ?, ?, ?, ?)",
+            dialogues,
+        )
+        self._conn.executemany(
+            f"INSERT INTO records_fts (rowid, {', '.join(FTS_COLUMNS)}) VALUES (?, {', '.join('?' * len(FTS_COLUMNS))})",
+            fts_rows,
+        )
+
+    # ==================== 读取 ====================
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def get_records(self, record_ids: Optional[List[int]] = None) -> List[Record]:
+        """
+        按ID读取记录
+
+        Args:
+            record_ids: 记录ID列表，None 表示全部（大数据库请分页查询）
+
+        Returns:
+            Record列表，顺序与 record_ids 一致
+        """
+        with self._lock:
+            if record_ids is None:
+                rows = self._conn.execute("SELECT * FROM records ORDER BY id").fetchall()
+            else:
+                rows = []
+                for start in range(0, len(record_ids), 500):
+                    batch = list(record_ids[start : start + 500])
+                    placeholders = ",".join("?" * len(batch))
+                    rows.extend(
+                        self._conn.execute(
+                            f"SELECT * FROM records WHERE id IN ({placeholders})", batch
+                        ).fetchall()
+                    )
+            records = self._build_records(rows)
+
+        if record_ids is None:
+            return records
+        by_id = {record.id: record for record in records}
+        missing = [rid for rid in record_ids if rid not in by_id]
+        if missing:
+            logger.warning(f"记录ID {missing} 超出范围")
+        return [by_id[rid] for rid in record_ids if rid in by_id]
+
+    def iter_record_texts(self, page_size: int = 1000) -> Iterator[str]:
+        """
+        按ID顺序分页读取每条记录的简历和各轮面试对话文本（近似去重使用）
+
+        每页单独查询，只在查询期间持有锁，不把全部文本读入内存。
+        导入时记录ID从 0 连续编号，第 i 个文本即记录 i 的文本。
+
+        Args:
+            page_size: 每页的记录数
+
+        Yields:
+            文本
+        """
+        last_id = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    """
+                    SELECT r.id, r.resume || char(10) || COALESCE(
+                        (SELECT group_concat(d.dialogue, char(10)) FROM dialogues d WHERE d.record_id = r.id),
+                        ''
+                    ) AS text
+                    FROM records r WHERE r.id > ? ORDER BY r.id LIMIT ?
+                    """,
+                    (last_id, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row["text"]
+            last_id = rows[-1]["id"]
+
+    def row_fingerprints(self) -> Optional[RowFingerprints]:
+        """
+        导入时计算的行指纹（记录ID顺序）
+
+        Returns:
+            RowFingerprints，尚未导入数据时返回None
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, content FROM row_fingerprints ORDER BY record_id"
+            ).fetchall()
+        if not rows and self.count() > 0:
+            return None
+        keys = np.array([row["key"] for row in rows], dtype=np.int64).view(np.uint64)
+        contents = np.array([row["content"] for row in rows], dtype=np.int64).view(np.uint64)
+        return RowFingerprints(keys, contents)
+
+    def _build_records(self, rows: List[sqlite3.Row]) -> List[Record]:
+        """把 records 行和对应的各轮对话组装为 Record（调用方持有锁）"""
+        if not rows:
+            return []
+
+        ids = [row["id"] for row in rows]
+        rounds: Dict[int, List[sqlite3.Row]] = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for dialogue in self._conn.execute(
+                f"SELECT * FROM dialogues WHERE record_id IN ({placeholders})", batch
+            ):
+                rounds.setdefault(dialogue["record_id"], []).append(dialogue)
+
+        intelligence_row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'intelligence_column'"
+        ).fetchone()
+        intelligence_column = json.loads(intelligence_row["value"]) if intelligence_row else None
+
+        records = []
+        for row in rows:
+            data = json.loads(row["extra"])
+            data[RECORD_TEXT_COLUMNS["resume"]] = row["resume"]
+            data[RECORD_TEXT_COLUMNS["jd"]] = row["jd"]
+            data[RECORD_POSITION_COLUMN] = row["position"]
+            if intelligence_column:
+                data[intelligence_column] = row["intelligence"]
+            for dialogue in rounds.get(row["id"], []):
+                round_name = dialogue["round"]
+                data[f"{round_name} Interview Dialogue"] = dialogue["dialogue"]
+                data[f"{round_name} Interview Evaluation"] = dialogue["evaluation"]
+                data[f"{round_name} Result"] = dialogue["result"]
+            records.append(Record.from_dataframe_row(row["id"], data))
+        return records
+
+    # ==================== 查询 ====================
+
+    def _filter_sql(self, filters: Optional[Dict]) -> Tuple[List[str], List[Any]]:
+        """把过滤条件转换为 WHERE 子句"""
+        clauses, params = [], []
+        intelligence_column = self.get_meta("intelligence_column")
+        for column, value in (filters or {}).items():
+            if column in (RECORD_POSITION_COLUMN, "position"):
+                clauses.append("r.position = ?")
+                params.append(value)
+            elif intelligence_column and column == intelligence_column:
+                clauses.append("r.intelligence = ?")
+                params.append(value)
+            elif column.endswith(" Result") and column[: -len(" Result")] in ROUNDS:
+                clauses.append(
+                    "EXISTS (SELECT 1 FROM dialogues d WHERE d.record_id = r.id AND d.round = ? AND d.result = ?)"
+                )
+                params.extend([column[: -len(" Result")], value])
+            else:
+                clauses.append("json_extract(r.extra, ?) = ?")
+                params.extend([f'$."{column}"', value])
+        return clauses, params
+
+    def query(self, filters: Optional[Dict] = None, limit: int = 10, offset: int = 0) -> QueryResult:
+        """
+        按条件分页查询
+
+        Args:
+            filters: 过滤条件，如 {"Job Title": "产品经理"}
+            limit: 每页数量
+            offset: 偏移量
+
+        Returns:
+            QueryResult
+        """
+        clauses, params = self._filter_sql(filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM records r {where}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT r.* FROM records r {where} ORDER BY r.id LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+            records = self._build_records(rows)
+
+        return QueryResult(
+            records=records,
+            total=total,
+            page=offset // limit + 1 if limit > 0 else 1,
+            page_size=limit,
+            filters_applied=filters or {},
+        )
+
+    def search(
+        self,
+        keyword: str,
+        fields: Optional[List[str]] = None,
+        filters: Optional[Dict] = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> QueryResult:
+        """
+        全文搜索
+
+        查询语法与 SearchIndex 相同：空格分隔的词为 AND，OR 或 | 分隔不同的组，
+        双引号括起短语。至少 3 个字符的词走 FTS5 trigram 索引，更短的词用 LIKE。
+
+        Args:
+            keyword: 搜索关键词
+            fields: 搜索字段（列名或 "resume" 等字段名），None 表示全部
+            filters: 额外的过滤条件
+            limit: 每页数量
+            offset: 偏移量
+
+        Returns:
+            QueryResult，全部使用全文索引时按相关度排序，否则按记录ID排序
+        """
+        columns = self._resolve_fields(fields)
+        groups = parse_query(keyword)
+
+        group_clauses, params = [], []
+        match_groups = []
+        pure_fts = True
+        for group in groups:
+            fts_terms = [term.text for term in group if len(term.text) >= FTS_MIN_CHARS]
+            like_terms = [term.text for term in group if len(term.text) < FTS_MIN_CHARS]
+            parts = []
+            if fts_terms:
+                expression = " AND ".join(_fts_phrase(text) for text in fts_terms)
+                if len(columns) < len(FTS_COLUMNS):
+                    expression = f"{{{' '.join(columns)}}} : ({expression})"
+                parts.append("r.id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)")
+                params.append(expression)
+                match_groups.append(f"({expression})")
+            for text in like_terms:
+                pure_fts = False
+                clause = self._like_clause(columns)
+                parts.append(clause)
+                params.extend([_like_pattern(text)] * clause.count("?"))
+            group_clauses.append("(" + " AND ".join(parts) + ")")
+
+        if not group_clauses:
+            return QueryResult(records=[], total=0, page=1, page_size=limit, filters_applied=filters or {})
+
+        filter_clauses, filter_params = self._filter_sql(filters)
+        where = " AND ".join(["(" + " OR ".join(group_clauses) + ")"] + filter_clauses)
+        params = params + filter_params
+
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM records r WHERE {where}", params
+            ).fetchone()[0]
+
+            if pure_fts:
+                weights = ", ".join(str(weight) for weight in FTS_COLUMNS.values())
+                rows = self._conn.execute(
+                    f"""
+                    SELECT r.* FROM records r
+                    JOIN (
+                        SELECT rowid, bm25(records_fts, {weights}) AS score
+                        FROM records_fts WHERE records_fts MATCH ?
+                    ) s ON s.rowid = r.id
+                    WHERE {where}
+                    ORDER BY s.score, r.id LIMIT ? OFFSET ?
+                    """,
+                    [" OR ".join(match_groups)] + params + [limit, offset],
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT r.* FROM records r WHERE {where} ORDER BY r.id LIMIT ? OFFSET ?",
+                    params + [limit, offset],
+                ).fetchall()
+            records = self._build_records(rows)
+
+        return QueryResult(
+            records=records,
+            total=total,
+            page=offset // limit + 1 if limit > 0 else 1,
+            page_size=limit,
+            filters_applied=filters or {},
+        )
+
+    @staticmethod
+    def _resolve_fields(fields: Optional[List[str]]) -> List[str]:
+        if not fields:
+            return list(FTS_COLUMNS)
+        columns = []
+        for field in fields:
+            column = _FIELD_ALIASES.get(field)
+            if column is None:
+                logger.warning(f"字段 {field} 没有全文索引，忽略")
+            elif column not in columns:
+                columns.append(column)
+        return columns or list(FTS_COLUMNS)
+
+    @staticmethod
+    def _like_clause(columns: List[str]) -> str:
+        """短词的 LIKE 条件，范围与全文索引列的内容一致（每个占位符都是同一个模式）"""
+        parts = [
+            f"r.{col} LIKE ? ESCAPE '\\'" for col in columns if col in ("resume", "jd", "position")
+        ]
+        dialogue_parts = [
+            f"d.{col} LIKE ? ESCAPE '\\'" for col in columns if col in ("dialogue", "evaluation")
+        ]
+        if "other" in columns:
+            dialogue_parts.append("d.result LIKE ? ESCAPE '\\'")
+            parts.append(
+                "EXISTS (SELECT 1 FROM json_each(r.extra) j "
+                "WHERE j.type = 'text' AND j.value LIKE ? ESCAPE '\\')"
+            )
+        if dialogue_parts:
+            parts.append(
+                "EXISTS (SELECT 1 FROM dialogues d WHERE d.record_id = r.id AND ("
+                + " OR ".join(dialogue_parts)
+                + "))"
+            )
+        return "(" + " OR ".join(parts) + ")"
+
+    # ==================== 统计 ====================
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        在 SQL 中计算统计指标
+
+        Returns:
+            与 StatisticsEngine.compute 相同结构的字典
+        """
+        columns = self.get_meta("columns", [])
+        intelligence_column = self.get_meta("intelligence_column")
+        result_columns = self.get_meta("result_columns", [])
+
+        with self._lock:
+            # 与 pandas 后端一致：全空的结果列在清洗时会被删除，不参与统计
+            rounds_with_results = {
+                row["round"]
+                for row in self._conn.execute(
+                    "SELECT DISTINCT round FROM dialogues WHERE result IS NOT NULL"
+                )
+            }
+            result_columns = [
+                col for col in result_columns if col[: -len(" Result")] in rounds_with_results
+            ][:3]
+
+            positions = None
+            if RECORD_POSITION_COLUMN in columns:
+                job_rows = self._conn.execute(
+                    """
+                    SELECT position, COUNT(*) AS n, AVG(intelligence) AS mean,
+                           SUM(intelligence * intelligence) AS sq, COUNT(intelligence) AS k
+                    FROM records WHERE position IS NOT NULL
+                    GROUP BY position ORDER BY position
+                    """
+                ).fetchall()
+                job_counts = sorted(
+                    ((row["position"], row["n"]) for row in job_rows),
+                    key=lambda item: -item[1],
+                )
+                positions = {
+                    "job_distribution": dict(job_counts),
+                    "total_job": len(job_counts),
+                    "total_candidates": sum(count for _, count in job_counts),
+                }
+                if intelligence_column:
+                    positions["average_intelligence"] = {
+                        "mean": {row["position"]: _round(row["mean"], 2) for row in job_rows},
+                        "std": {row["position"]: _round(_sample_std(row), 2) for row in job_rows},
+                    }
+                if result_columns:
+                    pass_rates = {}
+                    for col in result_columns:
+                        rate_rows = self._conn.execute(
+                            """
+                            SELECT r.position, SUM(COALESCE(d.result LIKE '%通过%', 0)) * 100.0 / COUNT(*) AS rate
+                            FROM records r
+                            LEFT JOIN dialogues d ON d.record_id = r.id AND d.round = ?
+                            WHERE r.position IS NOT NULL
+                            GROUP BY r.position ORDER BY r.position
+                            """,
+                            (col[: -len(" Result")],),
+                        ).fetchall()
+                        pass_rates[col] = {row["position"]: _round(row["rate"], 1) for row in rate_rows}
+                    positions["pass_rates"] = pass_rates
+
+            interview_results = {}
+            for i, col in enumerate(result_columns):
+                round_name = col[: -len(" Result")]
+                value_rows = self._conn.execute(
+                    """
+                    SELECT result, COUNT(*) AS n FROM dialogues
+                    WHERE round = ? AND result IS NOT NULL
+                    GROUP BY result ORDER BY n DESC
+                    """,
+                    (round_name,),
+                ).fetchall()
+                counts = {str(row["result"]): row["n"] for row in value_rows}
+                total = sum(counts.values())
+                pass_count = sum(n for value, n in counts.items() if "通过" in value)
+                interview_results[f"第{i + 1}轮面试"] = {
+                    "统计": dict(sorted(counts.items(), key=lambda item: -item[1])),
+                    "通过率": f"{(pass_count / total * 100):.1f}%" if total > 0 else "0%",
+                    "总人数": total,
+                }
+
+        return {"positions": positions, "interview_results": interview_results}
+
+    # ==================== 评估结果 ====================
+
+    def save_evaluation(self, record_id: int, round_name: str, result: Dict[str, Any]):
+        """保存一次评估结果"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO evaluations (record_id, round, result, evaluated_at) VALUES (?, ?, ?, ?)",
+                (
+                    record_id,
+                    round_name,
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    result.get("evaluated_at") or time.strftime("%Y-%m-%dT%H:%M:%S"),
+                ),
+            )
+            self._conn.commit()
+
+    def get_evaluations(self, record_id: int, round_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """读取一条记录的评估结果，按时间先后排列"""
+        sql = "SELECT result FROM evaluations WHERE record_id = ?"
+        params: List[Any] = [record_id]
+        if round_name:
+            sql += " AND round = ?"
+            params.append(round_name)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", params).fetchall()
+        return [json.loads(row["result"]) for row in rows]
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _round(value: Optional[float], digits: int) -> float:
+    return float("nan") if value is None else round(value, digits)
+
+
+def _sample_std(row: sqlite3.Row) -> Optional[float]:
+    k = row["k"]
+    if not k or k < 2:
+        return None
+    variance = (row["sq"] - k * row["mean"] ** 2) / (k - 1)
+    return math.sqrt(max(variance, 0.0))
@@ -0,0 +1,174 @@
+"""
+统计引擎模块
+
+把岗位、聪明度和各轮面试结果列规范化为分类/布尔数组，
+一次分组计算出全部岗位统计，并按数据集指纹缓存结果。
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class StatisticsEngine:
+    """
+    统计引擎
+
+    功能:
+    - 结果列只规范化一次：转为分类类型，"通过"按类别判断后映射回每一行
+    - 岗位分布、聪明度均值/标准差、各轮通过率在同一次分组中计算
+    - 计算结果按数据集指纹缓存，同一份数据重复查询直接返回
+    """
+
+    # 判断面试通过的关键词
+    PASS_KEYWORD = "通过"
+
+    # 最多统计的面试结果列（轮次）数
+    MAX_RESULT_COLUMNS = 3
+
+    # 数据集指纹 -> 统计结果，同一进程内的 CLI 和 Streamlit 页面共享
+    MEMO_SIZE = 8
+    _memo: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+    _memo_lock = threading.Lock()
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        初始化并规范化数据
+
+        Args:
+            df: 有效数据DataFrame
+        """
+        self.df = df
+        self.job_col = self._find_column("Job Title")
+        self.intelligence_col = self._find_column("Intelligence")
+        self.result_cols = [col for col in df.columns if "Result" in col][
+            : self.MAX_RESULT_COLUMNS
+        ]
+
+        self.jobs = df[self.job_col].astype("category") if self.job_col else None
+        self.intelligence = (
+            pd.to_numeric(df[self.intelligence_col], errors="coerce").astype("float64")
+            if self.intelligence_col
+            else None
+        )
+
+        # 结果列 -> (分类后的文本, 是否通过, 是否非空)
+        self.results: Dict[str, tuple] = {}
+        for col in self.result_cols:
+            # 只对非空值分类，缺失值的分类编码为 -1，不计入分布，也不算通过
+            present = df[col].notna()
+            values = df[col][present].astype(str).reindex(df.index).astype("category")
+            categories = values.cat.categories
+            passed_categories = np.asarray(
+                categories.str.contains(self.PASS_KEYWORD, regex=False), dtype=bool
+            )
+            codes = values.cat.codes.to_numpy()
+            passed = (
+                (codes >= 0) & passed_categories[np.maximum(codes, 0)]
+                if len(categories)
+                else np.zeros(len(df), bool)
+            )
+            self.results[col] = (values, passed, present.to_numpy())
+
+    def _find_column(self, keyword: str) -> Optional[str]:
+        for col in self.df.columns:
+            if keyword in col:
+                return col
+        return None
+
+    @classmethod
+    def compute(cls, df: pd.DataFrame, fingerprint: Optional[Hashable] = None) -> Dict[str, Any]:
+        """
+        计算全部统计指标
+
+        Args:
+            df: 有效数据DataFrame
+            fingerprint: 数据集指纹，提供时按指纹缓存结果
+
+        Returns:
+            {"positions": 岗位统计或None（没有岗位列）, "interview_results": 各轮结果统计}
+        """
+        if fingerprint is not None:
+            with cls._memo_lock:
+                cached = cls._memo.get(fingerprint)
+                if cached is not None:
+                    cls._memo.move_to_end(fingerprint)
+                    return cached
+
+        engine = cls(df)
+        stats = {
+            "positions": engine.position_metrics(),
+            "interview_results": engine.interview_metrics(),
+        }
+
+        if fingerprint is not None:
+            with cls._memo_lock:
+                cls._memo[fingerprint] = stats
+                while len(cls._memo) > cls.MEMO_SIZE:
+                    cls._memo.popitem(last=False)
+        return stats
+
+    def position_metrics(self) -> Optional[Dict[str, Any]]:
+        """岗位分布、聪明度和通过率，在一次分组中完成"""
+        if self.jobs is None:
+            return None
+
+        work = {"job": self.jobs}
+        aggregations = {}
+        if self.intelligence is not None:
+            work["intelligence"] = self.intelligence.to_numpy()
+            aggregations["mean"] = ("intelligence", "mean")
+            aggregations["std"] = ("intelligence", "std")
+        for i, col in enumerate(self.result_cols):
+            work[f"passed_{i}"] = self.results[col][1]
+            aggregations[f"passed_{i}"] = (f"passed_{i}", "sum")
+
+        grouped = pd.DataFrame(work).groupby("job", observed=True)
+        sizes = grouped.size()
+        aggregated = grouped.agg(**aggregations) if aggregations else None
+
+        job_counts = sizes.sort_values(ascending=False, kind="stable")
+        metrics: Dict[str, Any] = {
+            "job_distribution": {job: int(count) for job, count in job_counts.items()},
+            "total_job": len(job_counts),
+            "total_candidates": int(job_counts.sum()),
+        }
+
+        if self.intelligence is not None:
+            metrics["average_intelligence"] = aggregated[["mean", "std"]].round(2).to_dict()
+
+        if self.result_cols:
+            pass_rates = {}
+            for i, col in enumerate(self.result_cols):
+                pass_rate = (aggregated[f"passed_{i}"] / sizes * 100).round(1)
+                pass_rates[col] = pass_rate.to_dict()
+            metrics["pass_rates"] = pass_rates
+
+        return metrics
+
+    def interview_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """各轮面试结果分布和通过率"""
+        metrics = {}
+        for i, col in enumerate(self.result_cols):
+            values, passed, present = self.results[col]
+            counts = values.value_counts()
+            total = int(present.sum())
+            pass_count = int(passed.sum())
+
+            metrics[f"第{i + 1}轮面试"] = {
+                "统计": {str(k): int(v) for k, v in counts.items() if v > 0},
+                "通过率": f"{(pass_count / total * 100):.1f}%" if total > 0 else "0%",
+                "总人数": total,
+            }
+        return metrics
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._memo_lock:
+            cls._memo.clear()
@@ -6,6 +6,7 @@
 
 import json
 import logging
+import os
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 from datetime import datetime
@@ -19,6 +20,7 @@ from manager.models import (
     ExportFormat,
     ExportType,
     ExtractionResult,
+    IntegrationState,
 )
 
 logger = logging.getLogger(__name__)
@@ -31,6 +33,7 @@ class StorageManager:
     功能:
     - Checkpoint管理
     - 经验文件管理
+    - 经验整合状态（滚动摘要）
     - 报告导出
     - 版本控制
     """
@@ -308,6 +311,61 @@ class StorageManager:
 
         return deleted_count
 
+    # ==================== 经验整合状态 ====================
+
+    def _integration_state_file(self, name: str) -> Path:
+        return self.experience_dir / f"integration_state_{name}.json"
+
+    def load_integration_state(self, name: str = "default") -> Optional[IntegrationState]:
+        """
+        加载经验整合状态
+
+        Args:
+            name: 状态名称（不同的整合目标分别保存）
+
+        Returns:
+            IntegrationState，不存在或读取失败时返回None
+        """
+        state_file = self._integration_state_file(name)
+        if not state_file.exists():
+            return None
+
+        try:
+            with open(state_file, "r", encoding="utf-8") as f:
+                state = IntegrationState.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"读取整合状态失败 {state_file}: {e}")
+            return None
+
+        logger.info(
+            f"📁 已加载整合状态: 第 {state.version} 版，包含 {len(state.experience_ids)} 条经验"
+        )
+        return state
+
+    def save_integration_state(self, state: IntegrationState, name: str = "default") -> str:
+        """
+        保存经验整合状态（原子写入）
+
+        Args:
+            state: 整合状态
+            name: 状态名称
+
+        Returns:
+            保存的文件路径
+        """
+        state_file = self._integration_state_file(name)
+        tmp_file = state_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(state.to_dict(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, state_file)
+        except Exception as e:
+            logger.error(f"保存整合状态失败: {e}")
+            raise
+
+        logger.info(f"💾 整合状态已保存: 第 {state.version} 版")
+        return str(state_file)
+
     # ==================== 报告导出 ====================
 
     def export_report(
@@ -484,6 +542,10 @@ class StorageManager:
             record_ids = set(filters["record_ids"])
             filtered = [exp for exp in filtered if exp.record_id in record_ids]
 
+        if "experience_ids" in filters:
+            experience_ids = set(filters["experience_ids"])
+            filtered = [exp for exp in filtered if exp.id in experience_ids]
+
         if "date_range" in filters:
             date_range = filters["date_range"]
             if ":" in date_range:
@@ -23,6 +23,17 @@ import hashlib
 import os
 from pathlib import Path
 
+from components.cost_estimator import CostEstimator, estimate_tokens
+from components.progress import ProgressTracker
+from components.transcript import Transcript, INTERVIEWER, CANDIDATE
+
+# 预估（dry run）使用的提示词/输出规模（tokens）
+TOPIC_CLEANING_OVERHEAD_TOKENS = 400
+TOPIC_EVAL_OVERHEAD_TOKENS = 1200
+TOPIC_EVAL_OUTPUT_TOKENS = 2500
+# 尚未清洗的对话按此主题数预估（主题划分提示词要求 10 个以内）
+DEFAULT_TOPIC_COUNT = 8
+
 class ConversationEvaluator:
     """对话评估器 - 清洗和评估已有面试记录"""
 
@@ -293,55 +304,11 @@ class ConversationEvaluator:
         """
         print_message("\n使用规则解析方法...")
 
-        cleaned = []
-
-        # 按行分割
-        lines = raw_dialogue.split("\n")
-
-        current_speaker = None
-        current_content = []
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # 匹配说话人模式：Name(timestamp): content
-            match = re.match(r"^([^(]+)\([^)]+\):\s*(.+)$", line)
-
-            if match:
-                speaker_name = match.group(1).strip()
-                content = match.group(2).strip()
-
-                # 判断是面试官还是候选人（简单规则：英文名为面试官）
-                if re.match(r"^[A-Za-z\s]+$", speaker_name):
-                    role = "interviewer"
-                else:
-                    role = "candidate"
-
-                # 如果是新的说话人，保存之前的内容
-                if current_speaker and current_speaker != role:
-                    if current_content:
-                        cleaned.append(
-                            {
-                                "role": current_speaker,
-                                "content": " ".join(current_content),
-                            }
-                        )
-                    current_content = []
-
-                current_speaker = role
-                current_content.append(content)
-            else:
-                # 延续上一个说话人的内容
-                if current_content:
-                    current_content.append(line)
-
-        # 保存最后一个说话人的内容
-        if current_speaker and current_content:
-            cleaned.append(
-                {"role": current_speaker, "content": " ".join(current_content)}
-            )
+        # 同一段原始对话只解析一次，之后从缓存读取
+        transcript = Transcript.cached_parse(raw_dialogue)
+        cleaned = (
+            transcript.with_roles(INTERVIEWER, CANDIDATE).merge_consecutive().to_messages()
+        )
 
         print_message(f"✓ 规则解析完成，共 {len(cleaned)} 轮对话")
         return cleaned
@@ -549,9 +516,6 @@ class ConversationEvaluator:
             print_message(f"⚠️ 记录中没有 {round_name} 的对话数据")
             return {"error": f"记录中没有 {round_name} 的对话数据"}
 
-        # 清洗对话
-        cleaned_dialogue = self.clean_conversation(raw_dialogue, mode="topic")
-
         # 准备候选人信息
         candidate_info = {
             "name": f"候选人_{record_id}",
@@ -561,9 +525,9 @@ class ConversationEvaluator:
 
         jd = record.jd
 
-        # 评估对话
+        # 评估对话（清洗在内部完成，命中主题清洗缓存时不再调用模型）
         result = self.evaluate_conversation_with_mode(
-            cleaned_dialogue, candidate_info, jd, mode="topic"
+            raw_dialogue, candidate_info, jd, mode="topic"
         )
 
         print(result)
@@ -574,7 +538,7 @@ class ConversationEvaluator:
                 "record_id": record_id,
                 "round": round_name,
                 "job_title": record.position or "N/A",
-                "cleaned_dialogue": cleaned_dialogue,
+                "cleaned_dialogue": self.load_cleaned_dialogue(raw_dialogue, "topic"),
                 "original_dialogue": raw_dialogue,
             }
         )
@@ -586,6 +550,9 @@ class ConversationEvaluator:
         record_ids: Optional[List[int]] = None,
         round_name: str = "First Round",
         max_records: int = 10,
+        dry_run: bool = False,
+        delta: bool = False,
+        dedup: bool = True,
     ) -> List[Dict]:
         """
         批量评估多条记录
@@ -594,9 +561,13 @@ class ConversationEvaluator:
             record_ids: 记录 ID 列表，None 表示评估所有
             round_name: 轮次名称
             max_records: 最大评估记录数
+            dry_run: 只预估请求数、tokens、成本和耗时，不调用模型
+            delta: 只评估上次批量评估之后新增或变化的记录（忽略 record_ids），
+                评估完成后提交行指纹，失败的记录下次重新评估
+            dedup: 近似重复的记录只评估一条，其余记录复用它的评估结果
 
         Returns:
-            评估结果列表
+            评估结果列表；dry_run 时返回包含预估摘要的单元素列表
         """
         print_message("\n🔄 批量评估开始...")
 
@@ -604,22 +575,81 @@ class ConversationEvaluator:
         query_result = self.manager.query(limit=1000000)
         total_records = query_result.total
 
-        if record_ids is None:
+        dataset_delta = None
+        delta_positions = {}
+        if delta:
+            dataset_delta = self.manager.compute_delta("evaluation")
+            # 增量中的记录ID是有效数据中的位置，query 返回的记录以索引为ID
+            pending = dataset_delta.pending[:max_records]
+            record_ids = self.manager.position_labels(pending)
+            delta_positions = dict(zip(record_ids, pending))
+            print_message(
+                f"📊 增量评估: 新增 {len(dataset_delta.added)}, 变化 {len(dataset_delta.changed)}, "
+                f"本次评估 {len(record_ids)} 条"
+            )
+        elif record_ids is None:
             record_ids = list(range(min(max_records, total_records)))
         else:
             record_ids = record_ids[:max_records]
 
+        all_record_ids = record_ids
+        skipped_duplicates = {}
+        if dedup:
+            record_ids, skipped_duplicates = self.manager.skip_duplicates(record_ids, labels=True)
+            if skipped_duplicates:
+                print_message(
+                    f"♻️ {len(skipped_duplicates)} 条记录与其他记录近似重复，复用评估结果，"
+                    f"节省 {len(skipped_duplicates)} 次评估"
+                )
+
+        if dry_run:
+            return [self.estimate_batch(query_result.records, record_ids, round_name)]
+
         results = []
 
-        for i, record_id in enumerate(record_ids, 1):
-            print_message(f"\n进度: {i}/{len(record_ids)}")
+        progress = ProgressTracker(
+            len(record_ids),
+            label="batch_evaluate",
+            status_path=self.manager.config.status_file,
+            printer=print_message,
+        )
+        model, agent_model = self.model, self.eval_agent.model
+        self.model = progress.instrument(model)
+        self.eval_agent.model = progress.instrument(agent_model)
 
-            try:
-                result = self.evaluate_record_by_id(record_id, round_name)
-                results.append(result)
-            except Exception as e:
-                print_message(f"❌ 记录 {record_id} 评估失败: {str(e)}")
-                results.append({"record_id": record_id, "error": str(e)})
+        try:
+            for record_id in record_ids:
+                progress.start(str(record_id), "evaluate")
+
+                try:
+                    result = self.evaluate_record_by_id(record_id, round_name)
+                    results.append(result)
+                    progress.finish(str(record_id), error=result.get("error"))
+                except Exception as e:
+                    print_message(f"❌ 记录 {record_id} 评估失败: {str(e)}")
+                    results.append({"record_id": record_id, "error": str(e)})
+                    progress.finish(str(record_id), error=str(e))
+        finally:
+            self.model, self.eval_agent.model = model, agent_model
+
+        if skipped_duplicates:
+            # 每条评估的记录对应一个结果（失败的结果不一定带 record_id）
+            by_id = dict(zip(record_ids, results))
+            for record_id, substitute in skipped_duplicates.items():
+                source = by_id.get(substitute, {"error": f"记录 {substitute} 没有评估结果"})
+                by_id[record_id] = {**source, "record_id": record_id, "duplicate_of": substitute}
+            results = [by_id[record_id] for record_id in all_record_ids if record_id in by_id]
+
+        if dataset_delta is not None:
+            succeeded = {
+                delta_positions[r["record_id"]]
+                for r in results
+                if "error" not in r and r.get("record_id") in delta_positions
+            }
+            self.manager.commit_delta(
+                dataset_delta,
+                [p for p in dataset_delta.pending if p not in succeeded],
+            )
 
         print_message(
             f"\n✓ 批量评估完成，成功 {sum(1 for r in results if 'error' not in r)}/{len(results)}"
@@ -627,6 +657,89 @@ class ConversationEvaluator:
 
         return results
 
+    def estimate_batch(
+        self,
+        records: List,
+        record_ids: List[int],
+        round_name: str = "First Round",
+        concurrency: Optional[int] = None,
+    ) -> Dict:
+        """
+        预估批量评估的请求数、tokens、成本和耗时（不调用模型）
+
+        已有清洗缓存的对话跳过主题划分，并按缓存中的实际主题逐个计算评估提示词；
+        没有缓存的对话按 DEFAULT_TOPIC_COUNT 个主题平均切分预估。
+
+        Args:
+            records: 已加载的记录列表
+            record_ids: 要评估的记录 ID 列表
+            round_name: 轮次名称
+            concurrency: 预估耗时使用的并发数，默认取 ManagerConfig.max_workers
+
+        Returns:
+            预估摘要字典
+        """
+        estimator = CostEstimator(
+            model_id=self.manager.config.ai_model,
+            concurrency=concurrency or self.manager.config.max_workers,
+        )
+        records_by_id = {r.id: r for r in records}
+        criteria_tokens = estimate_tokens(self.eval_agent.evaluation_criteria)
+
+        for record_id in record_ids:
+            record = records_by_id.get(record_id)
+            if record is None:
+                continue
+
+            if round_name == "First Round":
+                raw_dialogue = record.conversation
+            else:
+                raw_dialogue = record.metadata.get(f"{round_name} Interview Dialogue", "")
+            if not isinstance(raw_dialogue, str) or not raw_dialogue.strip():
+                continue
+
+            eval_base_tokens = (
+                criteria_tokens
+                + estimate_tokens(record.jd)
+                + TOPIC_EVAL_OVERHEAD_TOKENS
+            )
+
+            topics = None
+            if self.exist_cache(raw_dialogue, "topic"):
+                estimator.add_skipped("topic_cleaning")
+                topics = self.load_cleaned_dialogue(raw_dialogue, "topic")
+            else:
+                dialogue_tokens = estimate_tokens(raw_dialogue)
+                estimator.add_request(
+                    "topic_cleaning",
+                    dialogue_tokens + TOPIC_CLEANING_OVERHEAD_TOKENS,
+                    dialogue_tokens,
+                )
+
+            if isinstance(topics, list) and topics:
+                for topic in topics:
+                    dialogue = topic.get("dialogue", []) if isinstance(topic, dict) else []
+                    if isinstance(dialogue, list):
+                        dialogue_text = self.eval_agent._format_topic_dialogue_for_evaluation(dialogue)
+                    else:
+                        dialogue_text = str(dialogue)
+                    estimator.add_request(
+                        "topic_evaluation",
+                        eval_base_tokens + estimate_tokens(dialogue_text),
+                        TOPIC_EVAL_OUTPUT_TOKENS,
+                    )
+            else:
+                per_topic = estimate_tokens(raw_dialogue) // DEFAULT_TOPIC_COUNT
+                estimator.add_request(
+                    "topic_evaluation",
+                    eval_base_tokens + per_topic,
+                    TOPIC_EVAL_OUTPUT_TOKENS,
+                    count=DEFAULT_TOPIC_COUNT,
+                )
+
+        print_message("\n" + estimator.format_report())
+        return estimator.summary()
+
     def evaluate_all_rounds(self, record_id: int) -> Dict:
         """
         评估一条记录的所有轮次
@@ -29,7 +29,9 @@ class ExperienceExtractor:
         self.csv_path = csv_path
         config = ManagerConfig(data_source=csv_path)
         self.manager = InterviewDataManager(config)
-        self.exp_agent = ExperienceAgent()
+        self.exp_agent = ExperienceAgent(
+            enable_cache=config.enable_cache, cache_dir=config.integration_cache_dir
+        )
 
         # 加载数据
         print_message(f"📂 加载数据: {csv_path}")
@@ -0,0 +1,481 @@
+"""
+本地评估服务
+
+常驻进程，预热评估 Agent、模型客户端、评估标准和面试数据，通过本地 HTTP 接口
+接收任务（评估面试、运行模拟、提取经验）。任务按优先级排队：交互式任务排在
+已排队的批量任务之前。正在执行的任务不会被中断，批量评估按单个面试拆成任务
+提交，交互式任务在两个面试之间插入执行。
+
+用法:
+    # 启动服务
+    python service.py serve --port 8765 --workers 2
+
+    # 提交任务（只依赖标准库，不加载模型和数据）
+    python service.py evaluate --name zhangsan_rm_transcript_1
+    python service.py simulate --jd rm_jd --resume zhangsan_resume
+    python service.py extract --record-ids 1 2 3
+    python service.py status <job_id>
+
+    # 现有命令行也可以转发到服务
+    python evaluator.py --name zhangsan_rm_transcript_1 --server http://127.0.0.1:8765
+    python simulator.py --jd rm_jd --resume zhangsan_resume --server http://127.0.0.1:8765
+
+接口:
+    GET  /health          服务状态与队列统计
+    POST /jobs            提交任务 {"type", "params", "priority"}
+    GET  /jobs            最近的任务列表
+    GET  /jobs/<id>       任务状态与结果
+"""
+
+import argparse
+import itertools
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from components.job_client import DEFAULT_SERVICE_URL, PRIORITIES, JobClient
+
+JOB_TYPES = ("evaluate", "simulate", "extract")
+
+# 与 evaluator.py 的命令行默认值保持一致
+EVALUATE_DEFAULTS = {
+    "path": "data/resources/conversations/",
+    "step": "all",
+    "force": False,
+    "force_topic": False,
+    "force_report": False,
+    "temp": False,
+}
+
+
+@dataclass
+class Job:
+    """服务中的一个任务"""
+
+    id: str
+    type: str
+    params: Dict[str, Any]
+    priority: str = "interactive"
+    status: str = "queued"  # queued | running | done | failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "params": self.params,
+            "priority": self.priority,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": round((self.started_at or time.time()) - self.submitted_at, 2),
+            "run_seconds": (
+                round((self.finished_at or time.time()) - self.started_at, 2)
+                if self.started_at else None
+            ),
+        }
+
+
+class JobService:
+    """
+    常驻任务服务
+
+    职责:
+    - 维护按优先级排序的任务队列
+    - 每个工作线程持有一个预热的 EvalAgent（评估标准只读取一次）
+    - 按数据源缓存已加载的 InterviewDataManager
+    """
+
+    def __init__(self, workers: int = 1, max_finished_jobs: int = 1000):
+        # 重量级依赖只在服务进程中导入
+        from components.data_manager import DataManager
+
+        self.workers = workers
+        self.max_finished_jobs = max_finished_jobs
+        self.data_manager = DataManager()
+
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._local = threading.local()
+        self._managers: Dict[Optional[str], Any] = {}
+        self._managers_lock = threading.Lock()
+        # 每个数据源一把加载锁，加载数据时不持有 _managers_lock
+        self._manager_load_locks: Dict[Optional[str], threading.Lock] = {}
+        self._threads = []
+        self._agent_count = 0
+        self._started_at = time.time()
+
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "evaluate": self._run_evaluate,
+            "simulate": self._run_simulate,
+            "extract": self._run_extract,
+        }
+
+    # ==================== 生命周期 ====================
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            # 哨兵排在所有任务之后
+            self._queue.put((float("inf"), next(self._sequence), None))
+        for thread in self._threads:
+            thread.join()
+
+    # ==================== 任务接口 ====================
+
+    def submit(self, job_type: str, params: Dict[str, Any], priority: str = "interactive") -> Job:
+        if job_type not in self._handlers:
+            raise ValueError(f"未知任务类型: {job_type}，可选: {', '.join(JOB_TYPES)}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"未知优先级: {priority}，可选: {', '.join(PRIORITIES)}")
+
+        job = Job(id=uuid.uuid4().hex[:12], type=job_type, params=params or {}, priority=priority)
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+            self._prune_finished()
+        self._queue.put((PRIORITIES[priority], next(self._sequence), job.id))
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def list_jobs(self, limit: int = 50) -> list:
+        with self._jobs_lock:
+            jobs = list(self._jobs.values())[-limit:]
+            return [job.to_dict() for job in jobs]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._jobs_lock:
+            counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        with self._managers_lock:
+            warm_agents = self._agent_count
+            loaded_datasets = [source or "default" for source in self._managers]
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "uptime_seconds": round(time.time() - self._started_at, 1),
+            "jobs": counts,
+            "warm_agents": warm_agents,
+            "loaded_datasets": loaded_datasets,
+        }
+
+    def _prune_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("done", "failed")]
+        for job_id in finished[: max(len(finished) - self.max_finished_jobs, 0)]:
+            del self._jobs[job_id]
+
+    # ==================== 执行 ====================
+
+    def _worker(self):
+        while True:
+            _, _, job_id = self._queue.get()
+            if job_id is None:
+                return
+
+            with self._jobs_lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+
+            try:
+                result = self._handlers[job.type](job.params)
+                status, error = "done", None
+            except Exception as e:
+                traceback.print_exc()
+                result, status, error = None, "failed", str(e)
+
+            with self._jobs_lock:
+                job.result = result
+                job.error = error
+                job.status = status
+                job.finished_at = time.time()
+            print(f"[service] {job.type} {job.id} {status} ({job.finished_at - job.started_at:.1f}s)")
+
+    def _eval_agent(self):
+        """当前工作线程的预热 EvalAgent"""
+        agent = getattr(self._local, "eval_agent", None)
+        if agent is None:
+            from agents.eval_agent import EvalAgent
+
+            agent = EvalAgent()
+            self._local.eval_agent = agent
+            with self._managers_lock:
+                self._agent_count += 1
+        # 每轮评估结果只属于一次面试
+        agent.round_evaluations = []
+        return agent
+
+    def _interview_manager(self, data_source: Optional[str]):
+        """
+        按数据源缓存已加载数据的 InterviewDataManager
+
+        同一数据源只加载一次；加载在该数据源自己的锁内进行，
+        不阻塞其他数据源的任务和工作线程的 Agent 预热。加载失败不缓存，下次任务重试。
+        """
+        with self._managers_lock:
+            entry = self._managers.get(data_source)
+            if entry is not None:
+                return entry
+            load_lock = self._manager_load_locks.setdefault(data_source, threading.Lock())
+
+        with load_lock:
+            with self._managers_lock:
+                entry = self._managers.get(data_source)
+            if entry is not None:
+                return entry
+
+            from manager.interview_data_manager import InterviewDataManager
+            from manager.models import ManagerConfig
+
+            config = ManagerConfig(data_source=data_source) if data_source else ManagerConfig()
+            manager = InterviewDataManager(config)
+            load_result = manager.load_data()
+            if not load_result.success:
+                raise RuntimeError(f"数据加载失败: {load_result.errors}")
+            entry = (manager, threading.Lock())
+            with self._managers_lock:
+                self._managers[data_source] = entry
+        return entry
+
+    def _run_evaluate(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        import evaluator
+
+        if not params.get("name"):
+            raise ValueError("evaluate 任务需要 name 参数")
+        args = argparse.Namespace(**{**EVALUATE_DEFAULTS, **params})
+        ok = evaluator.process_interview(args.name, args, self.data_manager, agent=self._eval_agent())
+        if not ok:
+            raise RuntimeError(f"评估失败: {args.name}")
+        return {"name": args.name}
+
+    def _run_simulate(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        import simulator
+        from simulation.interview_simulator import InterviewSimulator
+
+        if not params.get("jd") or not params.get("resume"):
+            raise ValueError("simulate 任务需要 jd 和 resume 参数")
+
+        jd_content = simulator.load_jd(params["jd"])
+        resume_content = simulator.load_resume(params["resume"])
+        transcript_content = None
+        if params.get("transcript"):
+            transcript_content = simulator.load_transcript(params["transcript"])
+
+        model_kwargs = {
+            key: params[key] for key in ("interviewer_model", "candidate_model") if params.get(key)
+        }
+        sim = InterviewSimulator(
+            jd=jd_content, resume=resume_content, transcript=transcript_content, **model_kwargs
+        )
+        result = sim.run(max_turns=params.get("max_turns", 20), verbose=not params.get("quiet", True))
+
+        output_dir = params.get("output_dir", "data/generated/simulations")
+        if params.get("temp"):
+            output_dir = "data/generated/temp"
+        save_path = sim.save(
+            output_dir=output_dir,
+            name=simulator.parse_name_from_resume(params["resume"]),
+            jd_name=simulator.parse_jd_short_name(params["jd"]),
+        )
+        return {"save_path": save_path, "metadata": result["metadata"]}
+
+    def _run_extract(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        manager, lock = self._interview_manager(params.get("data_source"))
+        with lock:
+            result = manager.extract_experiences(
+                record_ids=params.get("record_ids"),
+                mode=params.get("mode", "incremental"),
+                save_individual=params.get("save_individual", True),
+                auto_integrate=params.get("auto_integrate", True),
+                batch_size=params.get("batch_size", 5),
+                pack_records=params.get("pack_records", False),
+            )
+        return {
+            "total_records": result.total_records,
+            "successful_extractions": result.successful_extractions,
+            "failed_extractions": result.failed_extractions,
+            "experience_ids": [exp.id for exp in result.experiences],
+            "token_stats": result.token_stats.to_dict(),
+            "errors": result.errors,
+        }
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """JobService 的 HTTP 接口"""
+
+    service: JobService = None
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/health":
+            self._send_json(200, self.service.stats())
+        elif path == "/jobs":
+            self._send_json(200, self.service.list_jobs())
+        elif path.startswith("/jobs/"):
+            job = self.service.get(path[len("/jobs/"):])
+            if job is None:
+                self._send_json(404, {"error": "job not found"})
+            else:
+                self._send_json(200, job)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+            job = self.service.submit(
+                body.get("type"), body.get("params") or {}, body.get("priority", "interactive")
+            )
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(202, {"id": job.id, "status": job.status})
+
+    def log_message(self, format, *args):
+        # 轮询请求过多，只保留任务日志
+        pass
+
+
+def serve(host: str, port: int, workers: int):
+    service = JobService(workers=workers)
+    service.start()
+
+    handler = type("BoundServiceRequestHandler", (ServiceRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"评估服务已启动: http://{host}:{port} (工作线程 {workers})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n正在停止服务...")
+    finally:
+        server.server_close()
+        service.stop()
+
+
+def print_job(job: Dict[str, Any]):
+    print(json.dumps(job, ensure_ascii=False, indent=2, default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="本地评估服务",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--server", default=DEFAULT_SERVICE_URL, help="服务地址（提交任务时使用）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="启动服务")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认只接受本机连接）")
+    serve_parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    serve_parser.add_argument("--workers", type=int, default=1, help="工作线程数")
+
+    priority_help = f"任务优先级: {', '.join(PRIORITIES)}"
+
+    eval_parser = subparsers.add_parser("evaluate", help="提交评估任务")
+    eval_parser.add_argument("--name", required=True, help="Transcript 名称（不含扩展名）")
+    eval_parser.add_argument("--path", default=EVALUATE_DEFAULTS["path"], help="Transcript 目录")
+    eval_parser.add_argument("--step", choices=["all", "topic", "report"], default="all")
+    eval_parser.add_argument("--force", action="store_true")
+    eval_parser.add_argument("--temp", action="store_true")
+    eval_parser.add_argument("--priority", default="interactive", help=priority_help)
+
+    sim_parser = subparsers.add_parser("simulate", help="提交模拟任务")
+    sim_parser.add_argument("--jd", required=True)
+    sim_parser.add_argument("--resume", required=True)
+    sim_parser.add_argument("--transcript")
+    sim_parser.add_argument("--max-turns", type=int, default=20)
+    sim_parser.add_argument("--temp", action="store_true")
+    sim_parser.add_argument("--priority", default="interactive", help=priority_help)
+
+    extract_parser = subparsers.add_parser("extract", help="提交经验提取任务")
+    extract_parser.add_argument("--record-ids", type=int, nargs="*", help="记录ID，不指定则随机选择")
+    extract_parser.add_argument("--mode", default="incremental")
+    extract_parser.add_argument("--data-source", help="CSV 数据源")
+    extract_parser.add_argument("--priority", default="batch", help=priority_help)
+
+    status_parser = subparsers.add_parser("status", help="查询任务状态")
+    status_parser.add_argument("job_id", nargs="?", help="任务ID，不指定则显示服务状态")
+
+    for sub in (eval_parser, sim_parser, extract_parser):
+        sub.add_argument("--no-wait", action="store_true", help="提交后立即返回任务ID")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers)
+        return
+
+    client = JobClient(args.server)
+    try:
+        if args.command == "status":
+            print_job(client.get(args.job_id) if args.job_id else client.health())
+            return
+
+        if args.command == "evaluate":
+            params = {"name": args.name, "path": args.path, "step": args.step,
+                      "force": args.force, "temp": args.temp}
+        elif args.command == "simulate":
+            params = {"jd": args.jd, "resume": args.resume, "transcript": args.transcript,
+                      "max_turns": args.max_turns, "temp": args.temp}
+        else:
+            params = {"record_ids": args.record_ids, "mode": args.mode, "data_source": args.data_source}
+
+        job_id = client.submit(args.command, params, args.priority)
+        print(f"任务已提交: {job_id}")
+        if args.no_wait:
+            return
+        job = client.wait(job_id)
+        print_job(job)
+        if job["status"] != "done":
+            sys.exit(1)
+    except OSError as e:
+        print(f"错误: 无法连接评估服务 {args.server}: {e}")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
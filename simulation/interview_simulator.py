@@ -12,6 +12,7 @@ from typing import Dict, Any, List, Optional
 
 from agents.interviewer_agent import InterviewerAgent
 from agents.candidate_agent import CandidateAgent
+from components.transcript import Transcript, INTERVIEWER, CANDIDATE
 
 
 class InterviewSimulator:
@@ -53,8 +54,8 @@ class InterviewSimulator:
         self.interviewer = InterviewerAgent(model=interviewer_model)
         self.candidate = CandidateAgent(model=candidate_model)
         
-        # 对话历史（统一格式）
-        self.conversation: List[Dict[str, str]] = []
+        # 对话历史（统一格式，Turn 可按 {"role", "content"} 读取）
+        self.conversation = Transcript()
         
         # 分别存储两个 Agent 视角的消息历史（用于 debug）
         self.interviewer_messages: List[Dict[str, str]] = []
@@ -147,8 +148,7 @@ class InterviewSimulator:
     
     def _add_message(self, role: str, content: str):
         """添加消息到历史记录"""
-        msg = {"role": role, "content": content}
-        self.conversation.append(msg)
+        self.conversation.append(role, content)
         
         # 同时记录到各自的视角历史
         if role == "interviewer":
@@ -173,7 +173,7 @@ class InterviewSimulator:
     def _build_result(self) -> Dict[str, Any]:
         """构建返回结果"""
         return {
-            "conversation": self.conversation,
+            "conversation": self.conversation.to_messages(),
             "interviewer_context": {
                 "system_prompt_info": {
                     "jd": self.jd[:200] + "..." if len(self.jd) > 200 else self.jd,
@@ -206,32 +206,11 @@ class InterviewSimulator:
         Returns:
             格式化的文本字符串
         """
-        lines = []
-        # 假设每条消息间隔约 30 秒（模拟时间）
-        time_offset = 0
-        
-        for msg in conversation:
-            role = msg.get("role", "unknown")
-            content = msg.get("content", "")
-            
-            # 格式化时间 HH:MM:SS
-            hours = time_offset // 3600
-            minutes = (time_offset % 3600) // 60
-            seconds = time_offset % 60
-            time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            
-            # 确定显示名称
-            if role == "interviewer":
-                display_name = "面试官"
-            else:
-                display_name = name
-            
-            lines.append(f"{display_name}({time_str}): {content.replace(chr(10), ' ').replace(chr(13), '')}")
-            
-            # 根据内容长度估算时间偏移（每 100 字约 30 秒）
-            time_offset += max(30, len(content) // 100 * 30 + 30)
-        
-        return "\n".join(lines)
+        # 按内容长度估算模拟时间（每 100 字约 30 秒）
+        transcript = Transcript.from_messages(
+            conversation, names={INTERVIEWER: "面试官", CANDIDATE: name}, estimate_times=True
+        )
+        return transcript.to_text()
     
     def _conversation_to_markdown(
         self, 
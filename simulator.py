@@ -10,19 +10,24 @@
     
     # 指定最大轮数
     python simulator.py --jd rm_jd --resume zhangsan_resume --max-turns 10
+
+    # 交给常驻评估服务运行（见 service.py）
+    python simulator.py --jd rm_jd --resume zhangsan_resume --server http://127.0.0.1:8765
 """
 
 import argparse
 import os
 import sys
 
-from simulation.interview_simulator import InterviewSimulator
-from components.file_parser import FileParser
+# InterviewSimulator（模型客户端）和 FileParser（pdfplumber）在使用处导入，
+# --server 转发任务时只加载 job_client
+from components.job_client import JobClient
 
 
 def load_jd(jd_name: str, resource_path: str = "data/resources/jd") -> str:
     """加载 JD 文件"""
     txt_file = os.path.join(resource_path, f"{jd_name}.txt")
+    from components.file_parser import FileParser
     parser = FileParser()
     
     if os.path.exists(txt_file):
@@ -36,6 +41,7 @@ def load_resume(resume_name: str, resource_path: str = "data/resources/candidate
     """加载简历文件"""
     md_file = os.path.join(resource_path, f"{resume_name}.md")
     pdf_file = os.path.join(resource_path, f"{resume_name}.pdf")
+    from components.file_parser import FileParser
     parser = FileParser()
     
     if os.path.exists(md_file):
@@ -52,6 +58,7 @@ def load_transcript(transcript_name: str, resource_path: str = "data/resources/c
     """加载 Transcript 文件"""
     pdf_file = os.path.join(resource_path, f"{transcript_name}.pdf")
     txt_file = os.path.join(resource_path, f"{transcript_name}.txt")
+    from components.file_parser import FileParser
     parser = FileParser()
     
     if os.path.exists(pdf_file):
@@ -81,6 +88,37 @@ def parse_jd_short_name(jd_name: str) -> str:
     return jd_name
 
 
+def run_remote(args):
+    """提交模拟任务到常驻服务并等待结果"""
+    client = JobClient(args.server)
+    params = {
+        "jd": args.jd,
+        "resume": args.resume,
+        "transcript": args.transcript,
+        "max_turns": args.max_turns,
+        "output_dir": args.output_dir,
+        "temp": args.temp,
+        "quiet": args.quiet,
+        "interviewer_model": args.interviewer_model,
+        "candidate_model": args.candidate_model,
+    }
+    try:
+        job = client.run("simulate", params, priority="interactive")
+    except OSError as e:
+        print(f"错误: 无法连接评估服务 {args.server}: {e}")
+        sys.exit(1)
+
+    if job["status"] != "done":
+        print(f"错误: {job['error']}")
+        sys.exit(1)
+
+    result = job["result"]
+    print(f"\n模拟完成！")
+    print(f"  - 总轮数: {result['metadata']['total_turns']}")
+    print(f"  - 面试官主动结束: {'是' if result['metadata']['ended_by_interviewer'] else '否'}")
+    print(f"  - 结果保存: {result['save_path']}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="面试模拟启动器",
@@ -106,7 +144,13 @@ def main():
         help="候选人使用的模型"
     )
     
+    parser.add_argument("--server", help="交给常驻评估服务运行（如 http://127.0.0.1:8765）")
+    
     args = parser.parse_args()
+
+    if args.server:
+        run_remote(args)
+        return
     
     # 加载资源
     try:
@@ -125,6 +169,7 @@ def main():
     jd_short_name = parse_jd_short_name(args.jd)
     
     # 创建模拟器
+    from simulation.interview_simulator import InterviewSimulator
     simulator = InterviewSimulator(
         jd=jd_content,
         resume=resume_content,
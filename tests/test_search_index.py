@@ -0,0 +1,118 @@
+"""SearchIndex 的查询语法和匹配语义"""
+
+import pytest
+
+from manager.search_index import SearchIndex, parse_query, tokenize
+
+RESUME = "Candidate Resume"
+JD = "Job Description"
+JOB = "Job Title"
+
+DOCS = {
+    RESUME: [
+        "熟悉 Python 和 JavaScript，做过推荐系统",
+        "五年 Java 后端经验，负责支付系统",
+        "擅长数据分析，使用 SQL 和 pandas",
+        "产品经理，负责用户增长",
+    ],
+    JD: [
+        "招聘后端开发",
+        "招聘后端开发，要求 Java",
+        "招聘数据分析师",
+        "招聘产品经理",
+    ],
+    JOB: ["后端开发", "后端开发", "数据分析", "产品经理"],
+}
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex([RESUME, JD, JOB])
+    index.add(DOCS)
+    return index
+
+
+def hits(index, query, fields=None):
+    return sorted(doc_id for doc_id, _ in index.search(query, fields))
+
+
+def test_tokenize_cjk_bigrams_and_latin_words():
+    assert list(tokenize("产品经理 Python3")) == ["产品", "品经", "经理", "python3"]
+    assert list(tokenize("简")) == ["简"]
+
+
+def test_parse_query_groups_and_phrases():
+    groups = parse_query('后端 "java 后端" OR 数据')
+    assert [[term.text for term in group] for group in groups] == [["后端", "java 后端"], ["数据"]]
+    assert groups[0][1].verify
+
+
+def test_and_requires_every_term(index):
+    assert hits(index, "后端 支付") == [1]
+
+
+def test_or_unions_groups(index):
+    assert hits(index, "推荐 OR 增长") == [0, 3]
+    assert hits(index, "推荐 | 增长") == [0, 3]
+
+
+def test_phrase_must_appear_contiguously(index):
+    assert hits(index, '"java 后端"') == [1]
+    assert hits(index, '"后端 java"') == []
+
+
+def test_cjk_substring_and_single_character(index):
+    assert hits(index, "数据分析") == [2]
+    assert hits(index, "析") == [2]
+    # 岗位列也建有索引
+    assert hits(index, "产品经理", [JOB]) == [3]
+
+
+def test_latin_terms_match_as_substrings(index):
+    # 与 str.contains 一致："py" 命中 Python，"java" 命中 JavaScript
+    assert hits(index, "py") == [0]
+    assert hits(index, "java") == [0, 1]
+    assert hits(index, "JAVA") == [0, 1]
+    assert hits(index, "script") == [0]
+    assert hits(index, "javax") == []
+
+
+def test_fields_restrict_search(index):
+    assert hits(index, "java", ["resume"]) == [0, 1]
+    assert hits(index, "java", [JD]) == [1]
+    assert index.resolve_fields(["Unknown Column"]) is None
+
+
+def test_resume_matches_rank_above_jd_matches(index):
+    ranked = [doc_id for doc_id, _ in index.search("产品经理")]
+    assert ranked[0] == 3
+
+
+def test_incremental_add_extends_postings_and_latin_expansion(index):
+    assert hits(index, "rust") == []
+    # 先查询一次，展开结果会被缓存，新增文档后必须失效
+    assert hits(index, "py") == [0]
+
+    first = index.add({RESUME: ["熟悉 Rust 和 PyTorch"], JD: ["招聘算法工程师"]})
+
+    assert first == 4
+    assert index.size == 5
+    assert hits(index, "rust") == [4]
+    assert hits(index, "py") == [0, 4]
+    # 缺少的列按空文本处理
+    assert hits(index, "后端开发", [JOB]) == [0, 1]
+
+
+def test_for_frame_indexes_all_text_columns():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame(
+        {
+            RESUME: ["熟悉 Go"],
+            JOB: pd.Series(["产品经理"], dtype="category"),
+            "Required Intelligence": [90],
+        }
+    )
+    index = SearchIndex.for_frame(df)
+    index.add_frame(df)
+    assert index.fields == [RESUME, JOB]
+    assert hits(index, "产品经理") == [0]
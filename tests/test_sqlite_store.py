@@ -0,0 +1,176 @@
+"""SQLiteStore 的导入、搜索、过滤、分页，以及与 pandas 后端的一致性"""
+
+import math
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from manager.data_loader import DataLoader  # noqa: E402
+from manager.delta import RowFingerprints  # noqa: E402
+from manager.models import ManagerConfig  # noqa: E402
+from manager.sqlite_store import SQLiteStore  # noqa: E402
+from manager.statistics_engine import StatisticsEngine  # noqa: E402
+
+KEY_COLUMNS = ["Candidate Resume", "Job Title"]
+
+ROWS = [
+    # 岗位, 聪明度, 简历, JD, 一面对话, 一面评价, 一面结果, 二面对话, 二面结果, 来源
+    ("后端开发", 90, "熟悉 Python 和 Go", "招聘后端", "问：讲讲 Python 项目", "逻辑清晰", "通过", "二面聊 Rust", "通过", "内推"),
+    ("后端开发", 80, "五年 Java 经验", "招聘后端，要求 Java", "问：JVM 调优", "表达一般", "未通过", None, None, "官网"),
+    ("产品经理", 85, "负责用户增长", "招聘产品经理", "问：如何定义指标", "思路清楚", "通过", "二面聊规划", "未通过", "内推"),
+    ("产品经理", 70, "做过 B 端产品", "招聘产品经理", "问：竞品分析", "经验不足", "未通过", None, None, "猎头"),
+    ("数据分析", 95, "擅长 SQL 和 pandas", "招聘数据分析师", "问：py 脚本怎么写", "基础扎实", "通过", None, None, "官网"),
+    # 缺少 JD，不是有效记录
+    ("数据分析", 60, "应届生", None, "问：自我介绍", "一般", "未通过", None, None, "官网"),
+]
+
+COLUMNS = [
+    "Job Title",
+    "Required Intelligence",
+    "Candidate Resume",
+    "Job Description",
+    "First Round Interview Dialogue",
+    "First Round Interview Evaluation",
+    "First Round Result",
+    "Second Round Interview Dialogue",
+    "Second Round Result",
+    "Source",
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "interviews.csv"
+    pd.DataFrame(ROWS, columns=COLUMNS).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def loader(tmp_path):
+    return DataLoader(ManagerConfig(enable_cache=False, columnar_cache_dir=str(tmp_path / "cache")))
+
+
+@pytest.fixture
+def store(tmp_path, csv_path, loader):
+    store = SQLiteStore(str(tmp_path / "interviews.db"))
+    fingerprint = DataLoader._file_fingerprint(csv_path)
+    store.import_chunks(
+        loader.iter_valid_chunks(str(csv_path), chunksize=2),
+        fingerprint,
+        "utf-8",
+        KEY_COLUMNS,
+    )
+    yield store
+    store.close()
+
+
+def ids(result):
+    return [record.id for record in result.records]
+
+
+def test_import_skips_invalid_rows_and_numbers_records_from_zero(store, csv_path):
+    assert store.count() == 5
+    assert [record.id for record in store.get_records([4, 0])] == [4, 0]
+    assert store.get_records([0])[0].metadata["Source"] == "内推"
+    assert store.is_current(DataLoader._file_fingerprint(csv_path))
+
+
+def test_long_terms_use_fts_and_rank_by_relevance(store):
+    result = store.search("python")
+    assert ids(result) == [0]
+    assert result.total == 1
+
+
+def test_short_terms_fall_back_to_like_substring(store):
+    # 少于 3 个字符的词走 LIKE，仍按子串匹配（"py" 命中 Python 和 "py 脚本"）
+    assert sorted(ids(store.search("py"))) == [0, 4]
+    assert ids(store.search("Go")) == [0]
+
+
+def test_mixed_fts_and_like_terms_are_anded(store):
+    assert ids(store.search("后端 py")) == [0]
+    assert sorted(ids(store.search("python OR 增长"))) == [0, 2]
+    assert ids(store.search('"JVM 调优"')) == [1]
+
+
+def test_search_covers_position_results_and_extra_columns(store):
+    assert sorted(ids(store.search("产品经理", fields=["Job Title"]))) == [2, 3]
+    assert sorted(ids(store.search("猎头"))) == [3]
+    assert sorted(ids(store.search("二面"))) == [0, 2]
+
+
+def test_search_fields_restrict_columns(store):
+    assert sorted(ids(store.search("java"))) == [1]
+    assert ids(store.search("招聘后端", fields=["resume"])) == []
+    assert sorted(ids(store.search("招聘后端", fields=["jd"]))) == [0, 1]
+
+
+def test_query_filters(store):
+    assert ids(store.query({"Job Title": "产品经理"})) == [2, 3]
+    assert ids(store.query({"First Round Result": "通过"})) == [0, 2, 4]
+    assert ids(store.query({"Second Round Result": "未通过"})) == [2]
+    assert ids(store.query({"Source": "官网"})) == [1, 4]
+    assert ids(store.query({"Job Title": "后端开发", "First Round Result": "通过"})) == [0]
+
+
+def test_query_and_search_pagination(store):
+    page = store.query(limit=2, offset=2)
+    assert ids(page) == [2, 3]
+    assert page.total == 5
+    assert page.page == 2
+
+    page = store.search("招聘", limit=2, offset=4)
+    assert len(page.records) == 1
+    assert page.total == 5
+
+
+def _assert_same(actual, expected):
+    if isinstance(expected, dict):
+        assert set(actual) == set(expected)
+        for key in expected:
+            _assert_same(actual[key], expected[key])
+    elif isinstance(expected, float) and math.isnan(expected):
+        assert isinstance(actual, float) and math.isnan(actual)
+    else:
+        assert actual == pytest.approx(expected)
+
+
+def test_statistics_match_pandas_engine(store, csv_path, loader):
+    result = loader.load_from_csv(str(csv_path))
+    assert result.success
+    expected = StatisticsEngine.compute(loader.get_valid_data())
+
+    _assert_same(store.statistics(), expected)
+
+
+def test_statistics_leave_missing_results_out_of_the_distribution(store):
+    interview_results = store.statistics()["interview_results"]
+
+    assert interview_results["第1轮面试"]["统计"] == {"通过": 3, "未通过": 2}
+    assert interview_results["第1轮面试"]["总人数"] == 5
+    # 二面只有两条结果，其余三条缺失，不计入分布和总人数
+    assert interview_results["第2轮面试"]["统计"] == {"通过": 1, "未通过": 1}
+    assert interview_results["第2轮面试"]["总人数"] == 2
+
+
+def test_row_fingerprints_match_pandas_computation(store, csv_path, loader):
+    chunks = list(loader.iter_valid_chunks(str(csv_path), chunksize=2))
+    expected = RowFingerprints.compute(pd.concat(chunks, ignore_index=True), KEY_COLUMNS)
+
+    fingerprints = store.row_fingerprints()
+
+    assert (fingerprints.keys == expected.keys).all()
+    assert (fingerprints.contents == expected.contents).all()
+    assert fingerprints.diff(fingerprints, "extraction").pending == []
+
+
+def test_row_fingerprints_do_not_depend_on_dtypes(store, csv_path, loader):
+    # 整表读取会压缩类型（如 Int8），分块读取全部是字符串；切换后端不应把记录视为变化
+    assert loader.load_from_csv(str(csv_path)).success
+    compacted = RowFingerprints.compute(loader.get_valid_data(), KEY_COLUMNS)
+
+    delta = compacted.diff(store.row_fingerprints(), "extraction")
+
+    assert delta.pending == []
+    assert delta.removed == 0
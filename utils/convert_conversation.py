@@ -1,22 +1,48 @@
 """
 Conversation JSON 转换脚本（支持 TXT 和 Markdown 格式）
 
-用法:
+用法（在项目根目录运行，也可以用 python utils/convert_conversation.py）:
     # 转换为 TXT 格式
-    python convert_conversation.py conversation.json --format txt
+    python -m utils.convert_conversation conversation.json --format txt
     
     # 转换为 Markdown 格式
-    python convert_conversation.py conversation.json --format md
+    python -m utils.convert_conversation conversation.json --format md
     
-    # 指定输出文件和名称
-    python convert_conversation.py conversation.json output.md --format md --name 张三
+    # 指定输出文件和名称（已存在的输出文件会被覆盖）
+    python -m utils.convert_conversation conversation.json -o output.md --format md --name 张三
+
+    # 批量转换到指定目录
+    python -m utils.convert_conversation a.json b.json c.json --format md --output-dir out/
+
+    # 清洗原始 transcript 文本（合并断行，每个发言一行）
+    python -m utils.convert_conversation raw_transcript.txt
 """
 
 import argparse
 import json
 import os
 import sys
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator
+
+if not __package__:
+    # 直接以脚本运行（python utils/convert_conversation.py）时，把项目根目录加入模块搜索路径
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.transcript import Transcript, iter_clean_transcript, INTERVIEWER, CANDIDATE
+
+
+def iter_txt_lines(
+    conversation: Iterable[Dict[str, str]],
+    candidate_name: str = "候选人",
+    interviewer_name: str = "面试官"
+) -> Iterator[str]:
+    """
+    逐行生成 TXT 格式的对话记录。
+    
+    格式: name(time):content（每人一行，无换行）
+    """
+    names = {INTERVIEWER: interviewer_name, CANDIDATE: candidate_name}
+    return Transcript.from_messages(conversation, names=names, estimate_times=True).iter_text_lines()
 
 
 def conversation_to_txt(
@@ -29,59 +55,29 @@ def conversation_to_txt(
     
     格式: name(time):content（每人一行，无换行）
     """
-    lines = []
-    time_offset = 0
-    
-    for msg in conversation:
-        role = msg.get("role", "unknown")
-        content = msg.get("content", "")
-        
-        # 格式化时间 HH:MM:SS
-        hours = time_offset // 3600
-        minutes = (time_offset % 3600) // 60
-        seconds = time_offset % 60
-        time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        
-        # 确定显示名称
-        if role == "interviewer":
-            display_name = interviewer_name
-        elif role == "candidate":
-            display_name = candidate_name
-        else:
-            display_name = role
-        
-        # 移除换行，确保每人说话只占一行
-        content_single_line = content.replace('\n', ' ').replace('\r', '')
-        lines.append(f"{display_name}({time_str}): {content_single_line}")
-        
-        # 根据内容长度估算时间偏移
-        time_offset += max(30, len(content) // 100 * 30 + 30)
-    
-    return "\n".join(lines)
+    return "\n".join(iter_txt_lines(conversation, candidate_name, interviewer_name))
 
 
-def conversation_to_markdown(
+def iter_markdown_lines(
     conversation: List[Dict[str, str]], 
     candidate_name: str = "候选人",
     interviewer_name: str = "面试官",
     title: str = "模拟面试记录"
-) -> str:
+) -> Iterator[str]:
     """
-    将对话记录转换为 Markdown 格式（可视化友好）。
+    逐行生成 Markdown 格式的对话记录（可视化友好）。
     
     使用引用块区分面试官和候选人，保留原始格式。
     """
-    lines = []
-    
     # 标题
-    lines.append(f"# {title}")
-    lines.append("")
-    lines.append(f"**面试官**: {interviewer_name}")
-    lines.append(f"**候选人**: {candidate_name}")
-    lines.append(f"**对话轮次**: {len(conversation)}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+    yield f"# {title}"
+    yield ""
+    yield f"**面试官**: {interviewer_name}"
+    yield f"**候选人**: {candidate_name}"
+    yield f"**对话轮次**: {len(conversation)}"
+    yield ""
+    yield "---"
+    yield ""
     
     turn = 0
     for i, msg in enumerate(conversation):
@@ -91,35 +87,106 @@ def conversation_to_markdown(
         # 每轮对话（面试官问题开始）标记轮次
         if role == "interviewer":
             turn += 1
-            lines.append(f"## 第 {turn} 轮")
-            lines.append("")
+            yield f"## 第 {turn} 轮"
+            yield ""
         
         # 确定显示名称和样式
         if role == "interviewer":
             display_name = f"🎤 **{interviewer_name}**"
             # 面试官使用普通格式
-            lines.append(display_name)
-            lines.append("")
-            lines.append(content)
+            yield display_name
+            yield ""
+            yield content
         elif role == "candidate":
             display_name = f"💬 **{candidate_name}**"
             # 候选人使用引用块
-            lines.append(display_name)
-            lines.append("")
+            yield display_name
+            yield ""
             # 将内容转换为引用格式
-            quoted_content = "\n".join([f"> {line}" for line in content.split("\n")])
-            lines.append(quoted_content)
+            for line in content.split("\n"):
+                yield f"> {line}"
         else:
-            lines.append(f"**{role}**: {content}")
+            yield f"**{role}**: {content}"
         
-        lines.append("")
+        yield ""
     
     # 结尾
-    lines.append("---")
-    lines.append("")
-    lines.append("*面试记录结束*")
+    yield "---"
+    yield ""
+    yield "*面试记录结束*"
+
+
+def conversation_to_markdown(
+    conversation: List[Dict[str, str]], 
+    candidate_name: str = "候选人",
+    interviewer_name: str = "面试官",
+    title: str = "模拟面试记录"
+) -> str:
+    """
+    将对话记录转换为 Markdown 格式（可视化友好）。
     
-    return "\n".join(lines)
+    使用引用块区分面试官和候选人，保留原始格式。
+    """
+    return "\n".join(iter_markdown_lines(conversation, candidate_name, interviewer_name, title))
+
+
+def write_lines(output_path: str, lines: Iterable[str]) -> int:
+    """逐行写入文件（行之间用换行分隔），返回写入的行数"""
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for line in lines:
+            if count:
+                f.write("\n")
+            f.write(line)
+            count += 1
+    return count
+
+
+def default_output_path(input_path: str, fmt: str, output_dir: str = None) -> str:
+    """根据输入文件和格式生成输出路径"""
+    base_name, input_ext = os.path.splitext(input_path)
+    if input_ext.lower() == ".txt":
+        # 原始 transcript 清洗后不覆盖原文件
+        output_path = f"{base_name}_clean.txt"
+    else:
+        output_path = f"{base_name}{'.md' if fmt == 'md' else '.txt'}"
+    if output_dir:
+        output_path = os.path.join(output_dir, os.path.basename(output_path))
+    return output_path
+
+
+def convert_file(input_path: str, output_path: str, args) -> str:
+    """转换单个文件，返回结果描述"""
+    if input_path.lower().endswith(".txt"):
+        # 原始 transcript 文本：流式清洗，内存只保留当前发言
+        with open(input_path, "r", encoding="utf-8") as f:
+            turns = write_lines(output_path, iter_clean_transcript(f))
+        return f"{turns} 条发言"
+
+    with open(input_path, "r", encoding="utf-8") as f:
+        conversation = json.load(f)
+
+    # 验证格式
+    if not isinstance(conversation, list):
+        raise ValueError("JSON 应该是一个数组")
+
+    if args.format == "md":
+        lines = iter_markdown_lines(
+            conversation, 
+            candidate_name=args.name,
+            interviewer_name=args.interviewer,
+            title=args.title
+        )
+    else:
+        lines = iter_txt_lines(
+            conversation, 
+            candidate_name=args.name,
+            interviewer_name=args.interviewer
+        )
+    write_lines(output_path, lines)
+    return f"{len(conversation)} 条消息"
+
+
 
 
 def main():
@@ -129,8 +196,10 @@ def main():
         epilog=__doc__
     )
     
-    parser.add_argument("input", help="输入的 conversation.json 文件路径")
-    parser.add_argument("output", nargs="?", help="输出文件路径（默认根据格式自动生成）")
+    parser.add_argument("inputs", nargs="+",
+                        help="输入文件（conversation.json 或原始 transcript .txt），可以有多个")
+    parser.add_argument("--output", "-o", help="输出文件（只有一个输入时可用，默认根据输入文件名生成）")
+    parser.add_argument("--output-dir", "-d", help="批量转换的输出目录（默认与输入文件同目录）")
     parser.add_argument("--format", "-f", choices=["txt", "md"], default="txt",
                         help="输出格式: txt 或 md（默认: txt）")
     parser.add_argument("--name", default="候选人", help="候选人名称（默认：候选人）")
@@ -138,56 +207,39 @@ def main():
     parser.add_argument("--title", default="模拟面试记录", help="Markdown 标题（默认：模拟面试记录）")
     
     args = parser.parse_args()
+
+    inputs = args.inputs
+    if args.output and len(inputs) > 1:
+        parser.error("--output 只能用于单个输入文件，批量转换请使用 --output-dir")
     
     # 检查输入文件
-    if not os.path.exists(args.input):
-        print(f"错误: 输入文件不存在: {args.input}")
-        sys.exit(1)
-    
-    # 确定输出路径
-    if args.output:
-        output_path = args.output
-    else:
-        base_name = os.path.splitext(args.input)[0]
-        ext = ".md" if args.format == "md" else ".txt"
-        output_path = f"{base_name}{ext}"
-    
-    # 读取 JSON
-    try:
-        with open(args.input, "r", encoding="utf-8") as f:
-            conversation = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"错误: JSON 解析失败: {e}")
+    missing = [path for path in inputs if not os.path.exists(path)]
+    if missing:
+        print(f"错误: 输入文件不存在: {', '.join(missing)}")
+        if len(inputs) == 2 and missing == inputs[1:]:
+            print("提示: 指定输出文件请使用 --output/-o")
         sys.exit(1)
-    
-    # 验证格式
-    if not isinstance(conversation, list):
-        print("错误: JSON 应该是一个数组")
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = 0
+    for input_path in inputs:
+        output_path = args.output or default_output_path(input_path, args.format, args.output_dir)
+        try:
+            summary = convert_file(input_path, output_path, args)
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"错误: {input_path} 转换失败: {e}")
+            failed += 1
+            continue
+
+        print(f"转换完成！")
+        print(f"  格式: {args.format.upper()}")
+        print(f"  输入: {input_path} ({summary})")
+        print(f"  输出: {output_path}")
+
+    if failed:
         sys.exit(1)
-    
-    # 转换
-    if args.format == "md":
-        output_content = conversation_to_markdown(
-            conversation, 
-            candidate_name=args.name,
-            interviewer_name=args.interviewer,
-            title=args.title
-        )
-    else:
-        output_content = conversation_to_txt(
-            conversation, 
-            candidate_name=args.name,
-            interviewer_name=args.interviewer
-        )
-    
-    # 写入输出
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(output_content)
-    
-    print(f"转换完成！")
-    print(f"  格式: {args.format.upper()}")
-    print(f"  输入: {args.input} ({len(conversation)} 条消息)")
-    print(f"  输出: {output_path}")
 
 
 if __name__ == "__main__":